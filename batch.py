@@ -0,0 +1,242 @@
+"""
+Sports Video AI Summarizer - Batch Mode
+Processes a directory, glob pattern or JSONL manifest of videos with a pool of workers.
+Whisper models come from the shared model pool (one replica per worker, within the pool's
+memory budget), so while one video is being transcribed the others are waiting on the
+AI model or being cut by FFmpeg.
+"""
+import os
+import sys
+import glob
+import json
+import hashlib
+import time
+import argparse
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from src import model_pool
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".flv")
+
+
+def collect_jobs(inputs, output_dir, use_audio_analysis=True):
+    """
+    Expand the batch inputs into a job list
+
+    Args:
+        inputs: Directories, glob patterns, video files or .jsonl manifests.
+                Manifest lines look like {"video": "a.mp4", "output": "out/a", "no_audio": false}
+        output_dir: Default output directory
+        use_audio_analysis: Default for jobs that don't override it
+
+    Returns:
+        List of job dictionaries; malformed manifest lines become jobs with status "invalid"
+    """
+    jobs = []
+    seen = set()
+
+    def add(video, output=None, audio=use_audio_analysis):
+        # Overlapping inputs (e.g. a directory and a glob inside it) list a video only once
+        key = (os.path.abspath(video), output or output_dir)
+        if key in seen:
+            return
+        seen.add(key)
+        jobs.append({
+            "video": video,
+            "output": output or output_dir,
+            "use_audio_analysis": audio,
+            "status": "pending"
+        })
+
+    for item in inputs:
+        if item.lower().endswith(".jsonl") and os.path.isfile(item):
+            with open(item, "r", encoding="utf-8") as f:
+                for line_no, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        entry = None
+                    error = manifest_error(entry)
+                    if error:
+                        print(f"[WARNING] {item}:{line_no} {error}, skipped")
+                        jobs.append({"video": f"{item}:{line_no}", "output": None, "use_audio_analysis": None,
+                                     "status": "invalid", "error": error})
+                        continue
+                    add(entry["video"], entry.get("output"), not entry.get("no_audio", not use_audio_analysis))
+        elif os.path.isdir(item):
+            for name in sorted(os.listdir(item)):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    add(os.path.join(item, name))
+        elif os.path.isfile(item):
+            add(item)
+        else:
+            matches = sorted(glob.glob(item))
+            if not matches:
+                print(f"[WARNING] No videos match: {item}")
+            for path in matches:
+                if os.path.isfile(path):
+                    add(path)
+
+    make_output_names_unique(jobs)
+    return jobs
+
+
+def manifest_error(entry):
+    """Why a parsed manifest line cannot become a job (None if it can)"""
+    if not isinstance(entry, dict):
+        return "is not a JSON object"
+    if not isinstance(entry.get("video"), str) or not entry["video"]:
+        return 'has no "video" path'
+    if entry.get("output") is not None and not isinstance(entry["output"], str):
+        return '"output" is not a path'
+    return None
+
+
+def make_output_names_unique(jobs):
+    """
+    Outputs are named after the video file name without its extension, so a/game.mp4, b/game.mp4
+    and a/game.mkv sharing an output directory would overwrite each other; such jobs get a
+    subdirectory derived from the full video path
+    """
+    groups = {}
+    for job in jobs:
+        if job["status"] != "pending":
+            continue
+        stem = os.path.splitext(os.path.basename(job["video"]))[0]
+        groups.setdefault((os.path.normcase(os.path.abspath(job["output"])), os.path.normcase(stem)), []).append(job)
+
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        for job in group:
+            video = os.path.abspath(job["video"])
+            parent = os.path.basename(os.path.dirname(video)) or "root"
+            suffix = hashlib.sha1(video.encode("utf-8")).hexdigest()[:8]
+            job["output"] = os.path.join(job["output"], f"{parent}-{suffix}")
+            print(f"[WARNING] Several videos share the output name {os.path.splitext(os.path.basename(video))[0]}; "
+                  f"{job['video']} writes to {job['output']}")
+
+
+class BatchRunner:
+    def __init__(self, jobs, workers=2, report_path="batch_report.json",
+                 use_cache=config.USE_CACHE, cache_dir=config.CACHE_DIR):
+        """
+        Initialize the batch runner
+
+        Args:
+            jobs: Job list from collect_jobs
+            workers: Number of videos processed at the same time
+            report_path: JSON status report, rewritten whenever a job changes state
+            use_cache: Reuse cached stage results
+            cache_dir: Cache directory
+        """
+        self.jobs = jobs
+        self.workers = max(1, workers)
+        self.report_path = report_path
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+
+        # Allow up to one loaded Whisper model per worker
+        model_pool.get_pool(max_replicas=self.workers)
+
+    def _run_job(self, job):
+        from main import main as process_video
+
+        self._update(job, status="running", started_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+        start = time.time()
+        try:
+            outputs = process_video(
+                video_path=job["video"],
+                output_dir=job["output"],
+                use_audio_analysis=job["use_audio_analysis"],
+                use_cache=self.use_cache,
+                cache_dir=self.cache_dir
+            )
+            if outputs:
+                self._update(job, status="done", outputs=outputs)
+            else:
+                self._update(job, status="no_output", error="Video missing or no highlights detected")
+        except Exception as e:
+            self._update(job, status="failed", error=str(e), traceback=traceback.format_exc())
+        finally:
+            self._update(job, duration_seconds=round(time.time() - start, 1),
+                         finished_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+
+    def _update(self, job, **fields):
+        with self._lock:
+            job.update(fields)
+            self._write_report()
+
+    def _write_report(self):
+        counts = {}
+        for job in self.jobs:
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+
+        report = {"total": len(self.jobs), "counts": counts, "jobs": self.jobs}
+        tmp_path = self.report_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.report_path)
+
+    def run(self):
+        """
+        Process every job
+
+        Returns:
+            Number of jobs that did not finish successfully
+        """
+        with self._lock:
+            self._write_report()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch") as pool:
+            list(pool.map(self._run_job, [job for job in self.jobs if job["status"] == "pending"]))
+
+        failed = [job for job in self.jobs if job["status"] != "done"]
+        print("\n" + "=" * 70)
+        print(f"Batch finished: {len(self.jobs) - len(failed)}/{len(self.jobs)} videos succeeded")
+        for job in failed:
+            print(f"  [{job['status']}] {job['video']}: {job.get('error', '')}")
+        print(f"Status report: {self.report_path}")
+        print("=" * 70)
+        return len(failed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sports Video AI Summarizer - Batch Mode")
+    parser.add_argument("inputs", nargs="+", help="Video directories, glob patterns, video files or .jsonl manifests")
+    parser.add_argument("-o", "--output", default="output", help="Output directory (default: output)")
+    parser.add_argument("-w", "--workers", type=int, default=2, help="Videos processed in parallel (default: 2)")
+    parser.add_argument("--report", default="batch_report.json", help="Status report path (default: batch_report.json)")
+    parser.add_argument("--no-audio", action="store_true", help="Without using audio analysis")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every stage instead of reusing cached results")
+    parser.add_argument("--cache-dir", default=config.CACHE_DIR, help=f"Cache directory (default: {config.CACHE_DIR})")
+
+    args = parser.parse_args()
+
+    # Check API Key
+    if config.CLAUDE_API_KEY == "your-api-key-here":
+        print("[ERROR] Please set CLAUDE_API_KEY in config.py first.")
+        sys.exit(1)
+
+    jobs = collect_jobs(args.inputs, args.output, use_audio_analysis=not args.no_audio)
+    pending = [job for job in jobs if job["status"] == "pending"]
+    if not pending:
+        print("[ERROR] No videos to process")
+        sys.exit(1)
+
+    print(f"Found {len(pending)} videos, processing with {args.workers} workers")
+    runner = BatchRunner(
+        jobs,
+        workers=args.workers,
+        report_path=args.report,
+        use_cache=config.USE_CACHE and not args.no_cache,
+        cache_dir=args.cache_dir
+    )
+    sys.exit(1 if runner.run() else 0)
@@ -0,0 +1,179 @@
+"""
+Fake LLM Server -
+A local stand-in for the Claude (/v1/messages), OpenAI-compatible (/v1/chat/completions) and
+Gemini (models/...:streamGenerateContent / :generateContent) endpoints, plain or streamed
+(SSE), so the analysis stage can be benchmarked offline and
+without API costs. It answers with a highlight for every excited line of the synthetic
+transcript, after a configurable latency.
+
+Standalone: python -m benchmarks.fake_llm --port 8765 --latency 0.5
+"""
+import re
+import json
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+EXCITED_LINE = re.compile(r"\[(\d+:\d\d) - (\d+:\d\d)\] What a goal")
+
+
+def fake_answer(prompt):
+    """JSON highlight list for the excited lines of a synthetic transcript"""
+    highlights = []
+    for start, end in EXCITED_LINE.findall(prompt):
+        if highlights and highlights[-1]["end_time"] == start:
+            highlights[-1]["end_time"] = end
+            continue
+        highlights.append({
+            "start_time": start,
+            "end_time": end,
+            "type": "goal",
+            "description": f"Crowd erupts at {start}",
+            "score": 8
+        })
+    return json.dumps(highlights, indent=1)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    chunk_chars = 24
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        gemini = ":streamGenerateContent" in self.path or ":generateContent" in self.path
+        if gemini:
+            prompt = "".join(part.get("text", "") for content in request.get("contents", [])
+                             for part in content.get("parts", []))
+        else:
+            messages = request.get("messages", [])
+            prompt = "".join(m.get("content", "") for m in messages if isinstance(m.get("content"), str))
+        answer = fake_answer(prompt)
+        input_tokens, output_tokens = len(prompt) // 4, len(answer) // 4
+        time.sleep(self.latency)
+
+        if gemini:
+            self._gemini(answer, input_tokens, output_tokens)
+            return
+
+        openai = "chat/completions" in self.path
+        if not request.get("stream"):
+            if openai:
+                body = {"choices": [{"message": {"role": "assistant", "content": answer}}],
+                        "usage": {"prompt_tokens": input_tokens, "completion_tokens": output_tokens}}
+            else:
+                body = {"content": [{"type": "text", "text": answer}],
+                        "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens}}
+            self._json(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pieces = [answer[i:i + self.chunk_chars] for i in range(0, len(answer), self.chunk_chars)]
+        if openai:
+            for piece in pieces:
+                self._event({"choices": [{"delta": {"content": piece}}]})
+            self._event({"choices": [], "usage": {"prompt_tokens": input_tokens, "completion_tokens": output_tokens}})
+            self._chunk(b"data: [DONE]\n\n")
+        else:
+            self._event({"type": "message_start", "message": {"usage": {"input_tokens": input_tokens}}})
+            for piece in pieces:
+                self._event({"type": "content_block_delta", "delta": {"type": "text_delta", "text": piece}})
+            self._event({"type": "message_delta", "usage": {"output_tokens": output_tokens}})
+            self._event({"type": "message_stop"})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _gemini(self, answer, input_tokens, output_tokens):
+        # Streamed when alt=sse is in the query; without it streamGenerateContent answers with a
+        # JSON array of partial responses and generateContent with a single response
+        pieces = [answer[i:i + self.chunk_chars] for i in range(0, len(answer), self.chunk_chars)]
+        parts = [{"candidates": [{"content": {"role": "model", "parts": [{"text": piece}]}}]} for piece in pieces]
+        if not parts:
+            parts = [{"candidates": [{"content": {"role": "model", "parts": [{"text": ""}]}}]}]
+        parts[-1]["usageMetadata"] = {"promptTokenCount": input_tokens, "candidatesTokenCount": output_tokens}
+
+        if "alt=sse" not in self.path:
+            if ":streamGenerateContent" in self.path:
+                self._json(parts)
+            else:
+                self._json({"candidates": [{"content": {"role": "model", "parts": [{"text": answer}]}}],
+                            "usageMetadata": parts[-1]["usageMetadata"]})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for part in parts:
+            self._event(part)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _json(self, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, data):
+        self.wfile.write(b"%x\r\n" % len(data) + data + b"\r\n")
+
+    def _event(self, payload):
+        self._chunk(("data: " + json.dumps(payload) + "\n\n").encode("utf-8"))
+
+
+class FakeLLMServer:
+    """Fake API server on a background thread; use as a context manager"""
+
+    def __init__(self, port=0, latency=0.0):
+        """
+        Args:
+            port: Port to listen on (0 = any free port)
+            latency: Seconds to wait before answering each request
+        """
+        handler = type("Handler", (_Handler,), {"latency": latency})
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake LLM server for offline benchmarks")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each answer (default: 0)")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args.port, args.latency)
+    print(f"Fake LLM server listening on {server.url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
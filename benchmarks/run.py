@@ -0,0 +1,312 @@
+"""
+Benchmark Harness -
+Measures each pipeline stage on synthetic videos of several lengths, offline and on CPU only.
+Every (stage, length) pair runs in a fresh process so its peak memory is its own, under the same
+MetricsRecorder used by main.py. The AI model is replaced by a local fake server
+(benchmarks/fake_llm.py). Results are stored per commit in benchmarks/results/ so two commits
+can be compared.
+
+Usage:
+    python -m benchmarks.run                          # default lengths and stages
+    python -m benchmarks.run --durations 60 600 --stages audio_peaks fusion
+    python -m benchmarks.run --compare <commit or results file>
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import multiprocessing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks import synthetic
+from benchmarks.fake_llm import FakeLLMServer
+
+DATA_DIR = os.path.join(ROOT, "benchmarks", ".data")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+DEFAULT_DURATIONS = [60, 300, 900]
+
+
+class SkipStage(Exception):
+    """The stage cannot run in this environment (e.g. an optional dependency is missing)"""
+
+
+# ---------- Stages ----------
+# Each stage gets the context dictionary and may return extra fields for its result record.
+
+def stage_audio_extract(ctx):
+    from src.audio_extract import extract_audio
+    extract_audio(ctx["video"], os.path.join(ctx["work_dir"], "audio.wav"))
+
+
+def _shared_wav(ctx):
+    from src.audio_extract import extract_audio
+    path = os.path.join(DATA_DIR, f"synthetic_{ctx['duration']}s.wav")
+    if not os.path.exists(path):
+        extract_audio(ctx["video"], path)
+    return path
+
+
+def _burst_recall(peaks, duration):
+    from src.fusion import peak_interval
+    bursts = synthetic.burst_times(duration)
+    times = [interval[2] for interval in filter(None, (peak_interval(p) for p in peaks))]
+    found = sum(1 for b in bursts if any(b - 3 <= t <= b + synthetic.BURST_SECONDS + 3 for t in times))
+    return round(found / len(bursts), 3) if bursts else None
+
+
+def stage_audio_peaks(ctx):
+    from src.excitement import ExcitementAnalyzer
+    wav_path = _shared_wav(ctx)
+    peaks = ExcitementAnalyzer(threshold=ctx["config"].AUDIO_PEAK_THRESHOLD).detect_peaks(wav_path)
+    return {"peaks": len(peaks), "burst_recall": _burst_recall(peaks, ctx["duration"])}
+
+
+def stage_audio_peaks_librosa(ctx):
+    try:
+        from src.audio_analyzer import AudioAnalyzer
+    except ImportError as e:
+        raise SkipStage(str(e))
+    peaks = AudioAnalyzer(threshold=ctx["config"].AUDIO_PEAK_THRESHOLD).detect_peaks(_shared_wav(ctx))
+    return {"peaks": len(peaks), "burst_recall": _burst_recall(peaks, ctx["duration"])}
+
+
+def stage_transcribe(ctx):
+    try:
+        from src.whisper_backends import create_transcriber
+        transcriber = create_transcriber(ctx["whisper_model"], backend=ctx["whisper_backend"])
+    except ImportError as e:
+        raise SkipStage(str(e))
+    except Exception as e:
+        # Typically the model is not downloaded and there is no network
+        raise SkipStage(f"Whisper model unavailable: {e}")
+    from src.chunked_transcribe import transcribe_audio
+    result = transcribe_audio(transcriber, _shared_wav(ctx), language=ctx["config"].WHISPER_LANGUAGE)
+    return {"segments": len(result.get("segments", [])),
+            "backend": ctx["whisper_backend"] or ctx["config"].WHISPER_BACKEND}
+
+
+def stage_analyze(ctx):
+    config = ctx["config"]
+    config.API_BASE = ctx["llm_url"]
+    config.API_KEY = "benchmark"
+    from src.pooled_analyzer import PooledAnalyzer
+    from src.windowed_analysis import WindowedAnalyzer
+
+    full_text = synthetic.make_transcript(ctx["duration"])
+    analyzer = WindowedAnalyzer(
+        lambda: PooledAnalyzer(api_key="benchmark", model_type="claude", api_base=ctx["llm_url"]),
+        max_tokens=config.LLM_WINDOW_TOKENS,
+        overlap_tokens=config.LLM_WINDOW_OVERLAP_TOKENS,
+        max_concurrency=config.LLM_MAX_CONCURRENCY,
+        max_retries=0
+    )
+    highlights = analyzer.analyze_highlights(full_text)
+    usage = analyzer.usage or {}
+    return {"highlights": len(highlights), "requests": usage.get("requests"),
+            "input_tokens": usage.get("input_tokens")}
+
+
+def stage_fusion(ctx):
+    from src.excitement import ExcitementAnalyzer
+    from src.fusion import fuse_highlights
+    track = ExcitementAnalyzer(threshold=ctx["config"].AUDIO_PEAK_THRESHOLD).detect_peaks(_shared_wav(ctx))
+    highlights = synthetic.make_highlights(ctx["duration"], every=5)
+    start = time.perf_counter()
+    fuse_highlights(track, highlights)
+    fuse_highlights(list(track.peaks), highlights)
+    return {"highlights": len(highlights), "fusion_seconds": round(time.perf_counter() - start, 4)}
+
+
+def stage_edit(ctx):
+    from src.fast_editor import FastVideoEditor
+    highlights = synthetic.make_highlights(ctx["duration"])
+    output = os.path.join(ctx["work_dir"], "highlights.mp4")
+    editor = FastVideoEditor(buffer_seconds=ctx["config"].HIGHLIGHT_BUFFER)
+    # _create skips the moviepy fallback: a failure here is a benchmark error, not a slow path
+    if not editor._create(ctx["video"], highlights, output, []):
+        raise RuntimeError("No highlight reel produced")
+    return {"clips": len(highlights), "output_mb": round(os.path.getsize(output) / 2 ** 20, 2)}
+
+
+STAGES = {
+    "audio_extract": stage_audio_extract,
+    "audio_peaks": stage_audio_peaks,
+    "audio_peaks_librosa": stage_audio_peaks_librosa,
+    "transcribe": stage_transcribe,
+    "analyze": stage_analyze,
+    "fusion": stage_fusion,
+    "edit": stage_edit,
+}
+
+
+# ---------- Runner ----------
+
+def _child(stage, ctx, queue, verbose):
+    if not verbose:
+        sys.stdout = open(os.devnull, "w")
+    import config
+    from src.metrics import MetricsRecorder
+    ctx["config"] = config
+
+    recorder = MetricsRecorder(f"benchmark_{stage}")
+    record = {"stage": stage}
+    try:
+        with recorder.stage(stage) as record:
+            extra = STAGES[stage](ctx) or {}
+        record.update(extra)
+        record["status"] = "ok"
+    except SkipStage as e:
+        record = {"stage": stage, "status": "skipped", "reason": str(e)}
+    except Exception as e:
+        record = {"stage": stage, "status": "error", "reason": f"{type(e).__name__}: {e}"}
+    queue.put(record)
+
+
+def run_stage(stage, ctx, verbose=False, timeout=3600):
+    """
+    Run one stage in a fresh process
+
+    Returns:
+        Result record (stage metrics plus stage-specific fields)
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_child, args=(stage, dict(ctx), queue, verbose))
+    process.start()
+    try:
+        record = queue.get(timeout=timeout)
+    except Exception:
+        record = {"stage": stage, "status": "error", "reason": "timed out or crashed"}
+    process.join(5)
+    if process.is_alive():
+        process.kill()
+    record["duration"] = ctx["duration"]
+    if record.get("status") == "ok" and record.get("wall_seconds"):
+        record["realtime_factor"] = round(ctx["duration"] / record["wall_seconds"], 1)
+    return record
+
+
+def git_revision():
+    """(commit hash, working tree has uncommitted changes)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def run_benchmarks(durations, stages, whisper_model="tiny", llm_latency=0.0, verbose=False, whisper_backend=None):
+    """
+    Run the selected stages on synthetic videos of each length
+
+    Returns:
+        Results dictionary (see save_results)
+    """
+    commit, dirty = git_revision()
+    results = []
+    with FakeLLMServer(latency=llm_latency) as server:
+        for duration in durations:
+            video = synthetic.make_video(os.path.join(DATA_DIR, f"synthetic_{duration}s.mp4"), duration)
+            work_dir = os.path.join(DATA_DIR, f"work_{duration}s")
+            os.makedirs(work_dir, exist_ok=True)
+            ctx = {"video": video, "duration": duration, "work_dir": work_dir,
+                   "llm_url": server.url, "whisper_model": whisper_model, "whisper_backend": whisper_backend}
+            for stage in stages:
+                record = run_stage(stage, ctx, verbose)
+                results.append(record)
+                print(format_record(record))
+
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                    "cpu_count": os.cpu_count()},
+        "results": results
+    }
+
+
+def format_record(record):
+    if record.get("status") != "ok":
+        return f"{record['stage']:<20} {record['duration']:>6}s  {record.get('status')}: {record.get('reason', '')}"
+    peak = record.get("peak_rss_mb")
+    return (f"{record['stage']:<20} {record['duration']:>6}s  {record['wall_seconds']:>8.2f}s wall  "
+            f"{record.get('realtime_factor', 0):>8.1f}x realtime  "
+            + (f"{peak:>7.0f} MB peak" if peak is not None else ""))
+
+
+def save_results(data):
+    """
+    Store results as benchmarks/results/<commit>.json (suffix -dirty for uncommitted changes)
+
+    Returns:
+        Results path
+    """
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    name = data["commit"][:12] + ("-dirty" if data["dirty"] else "")
+    path = os.path.join(RESULTS_DIR, f"{name}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    return path
+
+
+def load_results(reference):
+    """Load stored results by path or by (a prefix of) the commit hash"""
+    if os.path.exists(reference):
+        path = reference
+    else:
+        names = sorted(n for n in os.listdir(RESULTS_DIR) if n.startswith(reference[:12])) if os.path.isdir(RESULTS_DIR) else []
+        if not names:
+            raise FileNotFoundError(f"No stored results for {reference}")
+        path = os.path.join(RESULTS_DIR, names[0])
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline, current):
+    """Print wall time and peak memory of current relative to baseline"""
+    print(f"\nCompared with {baseline['commit'][:12]}{'-dirty' if baseline.get('dirty') else ''}:")
+    before = {(r["stage"], r["duration"]): r for r in baseline["results"] if r.get("status") == "ok"}
+    for record in current["results"]:
+        old = before.get((record["stage"], record["duration"]))
+        if record.get("status") != "ok" or old is None:
+            continue
+        wall = record["wall_seconds"] / old["wall_seconds"] if old["wall_seconds"] else float("nan")
+        line = f"{record['stage']:<20} {record['duration']:>6}s  wall x{wall:.2f}"
+        if record.get("peak_rss_mb") and old.get("peak_rss_mb"):
+            line += f"  memory x{record['peak_rss_mb'] / old['peak_rss_mb']:.2f}"
+        if wall > 1.2:
+            line += "  <-- slower"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sports Video AI Summarizer - Benchmarks")
+    parser.add_argument("--durations", type=int, nargs="+", default=DEFAULT_DURATIONS,
+                        help=f"Synthetic video lengths in seconds (default: {' '.join(map(str, DEFAULT_DURATIONS))})")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES),
+                        help="Stages to benchmark (default: all)")
+    parser.add_argument("--whisper-model", default="tiny", help="Whisper model for the transcribe stage (default: tiny)")
+    parser.add_argument("--whisper-backend", choices=["openai", "faster-whisper"],
+                        help="Whisper backend for the transcribe stage (default: config.WHISPER_BACKEND)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Fake LLM answer latency in seconds (default: 0)")
+    parser.add_argument("--compare", help="Commit hash or results file to compare against")
+    parser.add_argument("--no-save", action="store_true", help="Do not store the results")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show the stages' own output")
+    args = parser.parse_args()
+
+    data = run_benchmarks(args.durations, args.stages, args.whisper_model, args.llm_latency, args.verbose,
+                          args.whisper_backend)
+    if not args.no_save:
+        print(f"\nResults saved: {save_results(data)}")
+    if args.compare:
+        compare(load_results(args.compare), data)
@@ -0,0 +1,107 @@
+"""
+Startup Budget -
+Measures the import time of the command-line entry points in fresh interpreters
+(python -X importtime) and fails when one exceeds the budget or imports a heavy dependency
+before it is needed. Short invocations such as `python main.py --help` should not pay for
+Whisper (torch), moviepy or librosa.
+
+Usage:
+    python -m benchmarks.startup                 # exit status 1 if a budget is exceeded
+    python -m benchmarks.startup --budget 0.3 -v
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_BUDGET_SECONDS = 0.5  # Total import time allowed per entry point
+HEAVY_MODULES = ("whisper", "torch", "faster_whisper", "ctranslate2", "moviepy", "librosa", "scipy", "anthropic")
+
+# Commands that must return quickly; ui.py is left out (it needs a display)
+ENTRY_POINTS = [
+    ["main.py", "--help"],
+    ["batch.py", "--help"],
+    ["live.py", "--help"],
+    ["rescore.py", "--help"],
+    ["service.py", "--help"],
+    ["model_selector.py", "list"],
+]
+
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output
+
+    Returns:
+        List of (module, cumulative seconds, nesting level)
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # Header line
+        level = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        imports.append((name.strip(), int(cumulative) / 1e6, level))
+    return imports
+
+
+def measure(command):
+    """
+    Run one entry point with import timing
+
+    Returns:
+        Result record: total import seconds, slowest top-level imports, heavy modules loaded
+    """
+    process = subprocess.run([sys.executable, "-X", "importtime"] + command, cwd=ROOT,
+                             capture_output=True, text=True, timeout=120)
+    imports = parse_importtime(process.stderr)
+    top_level = [(name, seconds) for name, seconds, level in imports if level == 0]
+    heavy = sorted({name.split(".")[0] for name, _, _ in imports if name.split(".")[0] in HEAVY_MODULES})
+    return {
+        "command": " ".join(command),
+        "returncode": process.returncode,
+        "import_seconds": round(sum(seconds for _, seconds in top_level), 3),
+        "slowest": sorted(top_level, key=lambda item: item[1], reverse=True)[:5],
+        "heavy_modules": heavy
+    }
+
+
+def check(budget=IMPORT_BUDGET_SECONDS, verbose=False):
+    """
+    Measure every entry point against the budget
+
+    Returns:
+        Number of entry points over budget, loading heavy modules or failing
+    """
+    failures = 0
+    for command in ENTRY_POINTS:
+        record = measure(command)
+        problems = []
+        if record["returncode"] != 0:
+            problems.append(f"exit status {record['returncode']}")
+        if record["import_seconds"] > budget:
+            problems.append(f"over the {budget:.2f}s budget")
+        if record["heavy_modules"]:
+            problems.append(f"imports {', '.join(record['heavy_modules'])}")
+        failures += bool(problems)
+
+        print(f"{record['command']:<28} {record['import_seconds']:>6.3f}s imports  "
+              + ("FAIL: " + "; ".join(problems) if problems else "ok"))
+        if verbose or problems:
+            for name, seconds in record["slowest"]:
+                print(f"    {seconds:>6.3f}s  {name}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sports Video AI Summarizer - Startup Budget")
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET_SECONDS,
+                        help=f"Import time allowed per entry point in seconds (default: {IMPORT_BUDGET_SECONDS})")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show the slowest imports of every entry point")
+    args = parser.parse_args()
+
+    sys.exit(1 if check(args.budget, args.verbose) else 0)
@@ -0,0 +1,100 @@
+"""
+Synthetic Inputs -
+Test videos generated with FFmpeg's lavfi sources, so benchmarks need no footage and no network:
+a moving test pattern, a "commentator" stand-in (a pitch-wobbling tone with a 4 Hz syllable
+rhythm and pauses) and pink-noise crowd bursts at known times. Also builds transcripts and
+highlight lists of matching size for the stages downstream of Whisper.
+"""
+import os
+
+from src.ffmpeg_tools import run_ffmpeg
+
+BURST_EVERY = 60  # Seconds between crowd bursts
+BURST_SECONDS = 8  # Length of each burst
+SAMPLE_RATE = 16000
+
+SPEECH_EXPR = (
+    "0.25*sin(2*PI*(160+50*sin(2*PI*0.3*t))*t)"
+    "*(0.6+0.4*sin(2*PI*4*t))"
+    "*gt(sin(2*PI*0.2*t),-0.3)"
+)
+
+
+def burst_times(duration):
+    """Start times of the crowd bursts in a synthetic video"""
+    first = BURST_EVERY / 2
+    times = []
+    t = first
+    while t + BURST_SECONDS <= duration:
+        times.append(t)
+        t += BURST_EVERY
+    return times
+
+
+def make_video(path, duration, width=320, height=180, fps=25):
+    """
+    Generate a synthetic game video (skipped if it already exists)
+
+    Args:
+        path: Output .mp4 path
+        duration: Seconds
+        width, height, fps: Video format
+
+    Returns:
+        path
+    """
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    half, end = BURST_EVERY / 2, BURST_EVERY / 2 + BURST_SECONDS
+    crowd_volume = f"if(between(mod(t,{BURST_EVERY}),{half},{end}),1,0.03)"
+    tmp_path = path + ".part.mp4"
+    run_ffmpeg([
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={duration}",
+        "-f", "lavfi", "-i", f"aevalsrc='{SPEECH_EXPR}':s={SAMPLE_RATE}:d={duration}",
+        "-f", "lavfi", "-i", f"anoisesrc=color=pink:amplitude=0.6:sample_rate={SAMPLE_RATE}:duration={duration}",
+        "-filter_complex", f"[2:a]volume='{crowd_volume}':eval=frame[crowd];[1:a][crowd]amix=inputs=2:normalize=0[a]",
+        "-map", "0:v", "-map", "[a]",
+        "-c:v", "libx264", "-preset", "ultrafast", "-g", str(fps * 2),
+        "-c:a", "aac", "-b:a", "96k", "-shortest", tmp_path
+    ], "FFmpeg synthetic video")
+    os.replace(tmp_path, path)
+    return path
+
+
+def _timestamp(seconds):
+    return f"{int(seconds) // 60:02d}:{int(seconds) % 60:02d}"
+
+
+def make_transcript(duration, seconds_per_line=4):
+    """
+    Timestamped transcript text in the VideoTranscriber.get_full_text layout
+
+    Returns:
+        Text with one "[MM:SS - MM:SS] ..." line per segment
+    """
+    lines = []
+    t = 0
+    index = 0
+    while t < duration:
+        end = min(t + seconds_per_line, duration)
+        excited = any(b <= t < b + BURST_SECONDS for b in burst_times(duration))
+        words = "What a goal! The crowd is on its feet!" if excited else f"Passing in midfield, possession number {index}."
+        lines.append(f"[{_timestamp(t)} - {_timestamp(end)}] {words}")
+        t = end
+        index += 1
+    return "\n".join(lines)
+
+
+def make_highlights(duration, every=30):
+    """Highlight list with one moment every `every` seconds (scores cycle from 5 to 9)"""
+    return [
+        {
+            "start_time": _timestamp(t),
+            "end_time": _timestamp(t + 6),
+            "type": "goal",
+            "description": f"Moment at {_timestamp(t)}",
+            "score": 5 + i % 5
+        }
+        for i, t in enumerate(range(every // 2, int(duration) - 6, every))
+    ]
@@ -2,6 +2,7 @@
 A simple check to see if the environment is ready.
 """
 import sys
+import importlib.util
 
 print("="*60)
 print("Environmental inspection")
@@ -10,33 +11,19 @@ print("="*60)
 # Check Python packages
 print("\n1. Check Python packages...")
 packages_ok = True
-try:
-    import whisper
-    print("  [OK] whisper")
-except:
-    print("  [X] whisper - Not installed")
-    packages_ok = False
-
-try:
-    import moviepy
-    print("  [OK] moviepy")
-except:
-    print("  [X] moviepy - Not installed")
-    packages_ok = False
-
-try:
-    import anthropic
-    print("  [OK] anthropic")
-except:
-    print("  [X] anthropic - Not installed")
-    packages_ok = False
+# Only locate the packages: importing whisper (torch) alone takes seconds
+for package in ("whisper", "moviepy", "anthropic", "librosa"):
+    if importlib.util.find_spec(package) is not None:
+        print(f"  [OK] {package}")
+    else:
+        print(f"  [X] {package} - Not installed")
+        packages_ok = False
 
-try:
-    import librosa
-    print("  [OK] librosa")
-except:
-    print("  [X] librosa - Not installed")
-    packages_ok = False
+for package in ("faster_whisper", "psutil"):
+    if importlib.util.find_spec(package) is not None:
+        print(f"  [OK] {package} (optional)")
+    else:
+        print(f"  [--] {package} - Not installed (optional)")
 
 # Check FFmpeg
 print("\n2. Check FFmpeg...")
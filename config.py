@@ -12,18 +12,21 @@ AVAILABLE_MODELS = {
         "name": "Claude Sonnet 4",
         "model_id": "claude-sonnet-4-20250514",
         "api_endpoint": "/v1/messages",
+        "price_per_mtok": (3.00, 15.00),  # USD per million input / output tokens (for cost metrics)
         "description": "The strongest semantic understanding, with the highest accuracy."
     },
     "gpt": {
         "name": "GPT-5 Chat Latest",
         "model_id": "gpt-5-chat-latest",
         "api_endpoint": "/v1/chat/completions",
+        "price_per_mtok": (1.25, 10.00),
         "description": "OpenAI GPT-5 latest version"
     },
     "gemini": {
         "name": "Gemini 2.5 Flash",
         "model_id": "gemini-2.5-flash",
         "api_endpoint": "/v1beta/models/gemini-2.5-flash:streamGenerateContent",
+        "price_per_mtok": (0.30, 2.50),
         "description": "Google's latest model, fast"
     }
 }
@@ -36,18 +39,95 @@ CLAUDE_API_KEY = API_KEY
 CLAUDE_MODEL = AVAILABLE_MODELS[SELECTED_MODEL]["model_id"]
 CLAUDE_API_BASE = API_BASE + "/v1"
 
+# Long transcripts can be analyzed as token-budgeted windows in parallel requests
+LLM_WINDOWED = False  # True = windows in parallel (opt-in, highlights may differ); False = the whole transcript in one request
+LLM_WINDOW_TOKENS = 8000  # Token budget per window
+LLM_WINDOW_OVERLAP_TOKENS = 400  # Transcript repeated between neighbouring windows
+LLM_MAX_CONCURRENCY = 4  # Maximum requests in flight
+LLM_MAX_RETRIES = 4  # Retries per window on 429 / 5xx / timeouts (exponential backoff)
+
 # API request method (if the anthropic library connection fails, switch to True to use raw HTTP)
 USE_HTTP_REQUEST = True  # True = raw HTTP request, False = anthropic library
+HTTP_CLIENT = "legacy"  # "legacy" = MultiModelAnalyzer, "pooled" = shared keep-alive asyncio client (src/llm_client.py, opt-in)
+HTTP_MAX_CONNECTIONS_PER_HOST = 8  # Kept-alive connections per API host
+HTTP_TIMEOUT = 300  # Seconds allowed per request
+LLM_STREAMING = False  # True = stream model answers and parse each highlight as soon as it is complete (opt-in)
 
 # Whisper configuration
 WHISPER_MODEL = "medium"  # tiny, base, small, medium, large - Use medium to improve accuracy
 WHISPER_LANGUAGE = None  # zh=Chinese, en=English, None=Auto-detect (Recommended)
+WHISPER_CHUNKED = False  # True = split long audio at pauses and transcribe chunks in parallel processes
+WHISPER_CHUNK_SECONDS = 600  # Target chunk length (seconds)
+WHISPER_CHUNK_OVERLAP = 2  # Audio overlap between neighbouring chunks (seconds)
+WHISPER_CHUNK_WORKERS = 2  # Worker processes (each loads its own model), None = CPU count
+WHISPER_BACKEND = "openai"  # "openai" = openai-whisper, "faster-whisper" = CTranslate2 (pip install faster-whisper)
+WHISPER_COMPUTE_TYPE = "int8"  # faster-whisper weight type: int8 (fastest on CPU), float16 (GPU), float32
+WHISPER_ADAPTIVE = False  # True = transcribe with WHISPER_FAST_MODEL, re-transcribe low-confidence parts with WHISPER_MODEL
+WHISPER_FAST_MODEL = "small"  # First-pass model in adaptive mode
+WHISPER_ADAPTIVE_LOGPROB = -0.8  # Segments with a lower average log-probability are re-transcribed
+WHISPER_ADAPTIVE_NO_SPEECH = 0.6  # Segments with a higher no-speech probability are re-transcribed
+WHISPER_ADAPTIVE_MAX_FRACTION = 0.5  # Re-transcribe the whole file if more than this share is low-confidence
 
 # FFmpeg path (specify manually if the system cannot find it)
 FFMPEG_PATH = r"D:\ffmpeg\ffmpeg-N-121640-g08eda05967-win64-gpl-shared\bin\ffmpeg.exe"
 
 # Audio analysis configuration
 AUDIO_PEAK_THRESHOLD = 0.7  # Audio peak threshold (0-1)
+SHARED_AUDIO = True  # Decode the audio track once (16 kHz mono WAV) for both transcription and peak detection
+PARALLEL_AUDIO_ANALYSIS = True  # Run audio peak detection in a worker process alongside transcription and AI analysis
+AUDIO_ENGINE = "librosa"  # "librosa" = AudioAnalyzer; "numpy" = vectorized excitement curve (RMS, spectral flux, crowd band), opt-in: peaks and final scores differ
+AUDIO_THRESHOLD_WINDOW = 60  # Seconds of context for the adaptive (rolling-percentile) peak threshold
+AUDIO_THRESHOLD_PERCENTILE = 90  # A frame is a peak candidate above this percentile of its window
+AUDIO_STREAMING = True  # Read the audio in blocks (memory independent of video length); False = memory-map a temp WAV
+AUDIO_BLOCK_SECONDS = 30  # Block length for streaming audio analysis
+AUDIO_WEIGHT = 0.3  # Share of the final score coming from audio excitement (0-1, numpy engine)
+AUDIO_MATCH_TOLERANCE = 5  # Seconds an audio peak may lie outside a highlight and still support it (numpy engine)
 
 # Video editing configuration
 HIGHLIGHT_BUFFER = 5  # Leave a few seconds before and after the highlight.
+FAST_EDIT = False  # True = cut clips with FFmpeg stream copy (only the head before the first keyframe is re-encoded), opt-in; False = moviepy
+EDIT_WORKERS = None  # FFmpeg processes cutting clips at the same time (None = CPU count)
+# Extra renditions encoded next to {video_name}_highlights.mp4 from one decode (FAST_EDIT = True only),
+# saved as {video_name}_highlights_{suffix}.mp4. Spec keys: suffix, height, video_bitrate,
+# top_n / min_score / max_duration (seconds) to make a teaser of the best moments. Example:
+# RENDITIONS = [
+#     {"suffix": "720p", "height": 720, "video_bitrate": "2500k"},
+#     {"suffix": "teaser", "height": 720, "video_bitrate": "2500k", "top_n": 5, "min_score": 8, "max_duration": 60},
+# ]
+RENDITIONS = []
+
+# Result cache configuration (re-runs reuse transcription / AI analysis / audio peaks)
+USE_CACHE = True  # False = always recompute every stage
+CACHE_DIR = ".cache"  # Cache directory
+CACHE_MAX_SIZE_MB = 2048  # Least recently used entries are deleted beyond this size
+
+# Run metrics (per-stage wall / CPU time, peak memory, I/O, LLM tokens and cost)
+METRICS_ENABLED = True  # Write {video_name}_metrics.json next to the outputs
+METRICS_PROMETHEUS_FILE = None  # e.g. "/var/lib/node_exporter/textfile/video_summarizer.prom"
+METRICS_PROMETHEUS_MAX_RUNS = 50  # Videos kept in the textfile (the latest run of each); older ones are dropped
+
+# Whisper model pool (loaded models are reused across runs in the same process)
+WHISPER_POOL_MEMORY_MB = 6000  # Memory budget for loaded models; idle models are unloaded beyond it
+WHISPER_POOL_REPLICAS = 1  # Loaded copies per model size (concurrent transcriptions)
+WHISPER_POOL_IDLE_SECONDS = 1800  # Unload models unused for this long (None = keep forever)
+
+# GUI job queue (python ui.py)
+GUI_MAX_JOBS = 1  # Queued videos processed at the same time
+
+# Local HTTP service (python service.py)
+SERVICE_HOST = "127.0.0.1"  # Listen address (the API has no authentication, keep it local)
+SERVICE_PORT = 8765
+SERVICE_WORKERS = 1  # Videos processed at the same time
+SERVICE_QUEUE_SIZE = 8  # Jobs waiting for a worker; further submissions get 503 + Retry-After
+SERVICE_UPLOAD_DIR = "uploads"  # Uploaded videos (deleted when their job ends)
+SERVICE_OUTPUT_DIR = "output"  # Job outputs go to SERVICE_OUTPUT_DIR/<job id> unless the job names a directory
+SERVICE_MAX_UPLOAD_MB = 4096  # Largest accepted upload
+SERVICE_KEEP_JOBS = 200  # Finished jobs remembered for status queries
+
+# Live mode (python live.py)
+LIVE_CHUNK_SECONDS = 20  # Minimum new audio transcribed per step
+LIVE_WINDOW_SECONDS = 300  # Transcript window sent to the AI model on every analysis
+LIVE_SETTLE_SECONDS = 20  # A highlight is confirmed once this much commentary follows it
+LIVE_POLL_SECONDS = 5  # How often the recording is checked for new data
+LIVE_IDLE_TIMEOUT = 120  # Finish when the recording has not grown for this long
+LIVE_MAX_BACKOFF = 60  # Longest wait before retrying a step that hit a rate limit / server error
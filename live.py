@@ -0,0 +1,418 @@
+"""
+Sports Video AI Summarizer - Live Mode
+Follows a broadcast while it is still being recorded: a growing recording file
+(streamable container such as .ts / .mkv / .flv) or a directory of segment files.
+New audio is transcribed incrementally, the AI model re-analyzes a sliding transcript
+window, and confirmed highlights are cut and appended to the reel within a minute or two.
+The reel is an HLS playlist of the clip files while the broadcast runs (a new highlight adds a
+clip, nothing is re-joined) and is joined into one MP4 when it ends.
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import wave
+import shutil
+import argparse
+import tempfile
+
+import config
+from src import model_pool
+from src.audio_extract import extract_audio
+from src.chunked_transcribe import shift_segment
+from src.fusion import highlight_score
+from src.ffmpeg_tools import run_ffmpeg, write_concat_list, concat_files
+from src.highlight_utils import highlight_span, is_duplicate
+from src.pipeline import MIN_SCORE, create_analyzer
+from src.windowed_analysis import is_retryable
+
+SEGMENT_EXTENSIONS = (".ts", ".mp4", ".mkv", ".flv", ".m4s")
+CLIP_ENCODE_ARGS = [
+    "-c:v", "libx264", "-preset", "veryfast", "-crf", "20",
+    "-c:a", "aac", "-b:a", "160k", "-ar", "48000", "-ac", "2"
+]
+
+
+def _wav_duration(path):
+    with wave.open(path, "rb") as wf:
+        return wf.getnframes() / wf.getframerate()
+
+
+def _trim_wav(path, seconds):
+    """Cut a WAV file down to its first `seconds`"""
+    with wave.open(path, "rb") as wf:
+        params = wf.getparams()
+        frames = wf.readframes(int(seconds * wf.getframerate()))
+    with wave.open(path, "wb") as wf:
+        wf.setparams(params)
+        wf.writeframes(frames)
+
+
+class GrowingFileSource:
+    """A recording file that is still being written"""
+
+    def __init__(self, path, work_dir, min_chunk_seconds=20, guard_seconds=2):
+        """
+        Args:
+            path: Recording path
+            work_dir: Temp directory for extracted audio
+            min_chunk_seconds: Wait until at least this much new audio is available
+            guard_seconds: Audio at the growing end that is not trusted yet (partially written packets)
+        """
+        self.path = path
+        self.work_dir = work_dir
+        self.min_chunk_seconds = min_chunk_seconds
+        self.guard_seconds = guard_seconds
+        self.available_until = 0.0
+        self._count = 0
+        self._bytes_per_second = None  # Recording bitrate, estimated from the audio decoded so far
+        self._next_size = 0  # File size at which the next extraction can yield a full chunk
+
+    def _wait_for(self, size, seconds):
+        # Skip decoding until the file has grown by about `seconds` of recording
+        if self._bytes_per_second:
+            self._next_size = size + 0.9 * seconds * self._bytes_per_second
+
+    def poll(self, final=False):
+        """
+        Extract newly recorded audio
+
+        Args:
+            final: Recording has stopped; take everything including the guard
+
+        Returns:
+            List of (wav_path, start_seconds)
+        """
+        if not os.path.exists(self.path):
+            return []
+        size = os.path.getsize(self.path)
+        if not final and size < self._next_size:
+            return []  # Too little new data for a chunk; don't decode the same tail again
+
+        wav_path = os.path.join(self.work_dir, f"audio_{self._count:05d}.wav")
+        try:
+            extract_audio(self.path, wav_path, start=self.available_until)
+        except RuntimeError:
+            return []  # Nothing decodable yet
+
+        decoded = _wav_duration(wav_path)
+        if self.available_until + decoded > 0:
+            self._bytes_per_second = size / (self.available_until + decoded)
+        usable = decoded - (0 if final else self.guard_seconds)
+        if usable <= 0 or (not final and usable < self.min_chunk_seconds):
+            os.remove(wav_path)
+            self._wait_for(size, self.min_chunk_seconds - max(0.0, usable))
+            return []
+
+        self._wait_for(size, self.min_chunk_seconds)
+        _trim_wav(wav_path, usable)
+        start = self.available_until
+        self.available_until += usable
+        self._count += 1
+        return [(wav_path, start)]
+
+    def cut(self, start, end, output_path):
+        """Encode the [start, end] range of the recording as a clip"""
+        run_ffmpeg(
+            ["-ss", f"{start:.3f}", "-i", self.path, "-t", f"{end - start:.3f}"] + CLIP_ENCODE_ARGS + [output_path],
+            "FFmpeg clip extraction"
+        )
+
+
+class SegmentDirectorySource:
+    """A directory that receives one media file per recorded segment (e.g. HLS .ts segments)"""
+
+    def __init__(self, directory, work_dir):
+        """
+        Args:
+            directory: Segment directory (segments sort by name in recording order)
+            work_dir: Temp directory for extracted audio
+        """
+        self.directory = directory
+        self.work_dir = work_dir
+        self.available_until = 0.0
+        self.segments = []  # (path, start_seconds, duration)
+
+    def poll(self, final=False):
+        """
+        Pick up completed segments (a segment is complete once a newer one exists)
+
+        Returns:
+            List of (wav_path, start_seconds)
+        """
+        names = sorted(n for n in os.listdir(self.directory) if n.lower().endswith(SEGMENT_EXTENSIONS))
+        known = {os.path.basename(path) for path, _, _ in self.segments}
+        pending = [n for n in names if n not in known]
+        if not final:
+            pending = pending[:-1]
+
+        chunks = []
+        for name in pending:
+            path = os.path.join(self.directory, name)
+            wav_path = os.path.join(self.work_dir, os.path.splitext(name)[0] + ".wav")
+            try:
+                extract_audio(path, wav_path)
+            except RuntimeError as e:
+                print(f"[WARNING] Skipping unreadable segment {name}: {e}")
+                continue
+            duration = _wav_duration(wav_path)
+            self.segments.append((path, self.available_until, duration))
+            chunks.append((wav_path, self.available_until))
+            self.available_until += duration
+        return chunks
+
+    def cut(self, start, end, output_path):
+        """Encode the [start, end] range across the segments that cover it"""
+        covering = [s for s in self.segments if s[1] + s[2] > start and s[1] < end]
+        if not covering:
+            raise RuntimeError(f"No segments cover {start:.1f}-{end:.1f}s")
+
+        list_path = output_path + ".concat.txt"
+        write_concat_list([path for path, _, _ in covering], list_path)
+        try:
+            offset = start - covering[0][1]
+            run_ffmpeg(
+                ["-f", "concat", "-safe", "0", "-ss", f"{max(0.0, offset):.3f}", "-i", list_path,
+                 "-t", f"{end - start:.3f}"] + CLIP_ENCODE_ARGS + [output_path],
+                "FFmpeg clip extraction"
+            )
+        finally:
+            os.remove(list_path)
+
+
+class LiveSummarizer:
+    def __init__(self, source, output_dir, name, model_type=config.SELECTED_MODEL,
+                 window_seconds=config.LIVE_WINDOW_SECONDS, settle_seconds=config.LIVE_SETTLE_SECONDS,
+                 min_score=MIN_SCORE, buffer_seconds=config.HIGHLIGHT_BUFFER):
+        """
+        Initialize live processing
+
+        Args:
+            source: GrowingFileSource or SegmentDirectorySource
+            output_dir: Output directory
+            name: Base name of the output files
+            model_type: claude / gpt / gemini
+            window_seconds: Transcript window sent to the AI model on every analysis
+            settle_seconds: A highlight is confirmed once this much commentary follows it
+            min_score: Minimum highlight score
+            buffer_seconds: Seconds kept before and after each highlight
+        """
+        self.source = source
+        self.output_dir = output_dir
+        self.name = name
+        self.model_type = model_type
+        self.window_seconds = window_seconds
+        self.settle_seconds = settle_seconds
+        self.min_score = min_score
+        self.buffer_seconds = buffer_seconds
+
+        self.segments = []  # Whisper segments with absolute timestamps
+        self.language = config.WHISPER_LANGUAGE
+        self.confirmed = []
+        self.clips = []  # (path, duration)
+        self._pending_chunks = []  # Polled audio not transcribed yet
+        self._analysis_due = False  # New transcript not analyzed yet
+
+        self.clip_dir = os.path.join(output_dir, f"{name}_live_clips")
+        self.playlist_path = os.path.join(output_dir, f"{name}_live_highlights.m3u8")
+        self.reel_path = os.path.join(output_dir, f"{name}_live_highlights.mp4")
+        self.highlights_path = os.path.join(output_dir, f"{name}_live_highlights.json")
+        os.makedirs(self.clip_dir, exist_ok=True)
+
+        # Same analyzer selection as the other front-ends (API access, HTTP client, windowing)
+        self.analyzer = create_analyzer(model_type)[0]
+
+    def run(self, poll_seconds=config.LIVE_POLL_SECONDS, idle_timeout=config.LIVE_IDLE_TIMEOUT,
+            max_backoff=config.LIVE_MAX_BACKOFF):
+        """
+        Follow the source until it stops growing for idle_timeout seconds (or Ctrl+C).
+        A step that fails with a rate limit, server error or timeout is retried with backoff
+        (audio already polled is kept); any other error stops following and the highlights
+        confirmed so far are finished as usual.
+        """
+        last_growth = time.time()
+        delay = poll_seconds
+        try:
+            while True:
+                try:
+                    chunks = self.source.poll()
+                    if chunks:
+                        last_growth = time.time()
+                    if chunks or self._pending_chunks or self._analysis_due:
+                        self._process_chunks(chunks)
+                    elif time.time() - last_growth > idle_timeout:
+                        print(f"\nNo new recording for {idle_timeout}s, finishing")
+                        break
+                    else:
+                        time.sleep(poll_seconds)
+                    delay = poll_seconds
+                except Exception as e:
+                    if not is_retryable(e) or time.time() - last_growth > idle_timeout:
+                        print(f"[ERROR] Live processing failed: {e}, finishing")
+                        break
+                    wait = delay * (1 + random.random() * 0.25)
+                    print(f"[WARNING] Live processing failed ({e}), retrying in {wait:.1f}s")
+                    time.sleep(wait)
+                    delay = min(delay * 2, max_backoff)
+        except KeyboardInterrupt:
+            print("\nStopped by user, finishing")
+
+        try:
+            self._process_chunks(self.source.poll(final=True), final=True)
+        except Exception as e:
+            print(f"[ERROR] Final analysis failed: {e}")
+        return self._finish()
+
+    def _process_chunks(self, chunks, final=False):
+        self._pending_chunks.extend(chunks)
+        with model_pool.lease(config.WHISPER_MODEL) as transcriber:
+            while self._pending_chunks:
+                wav_path, start = self._pending_chunks[0]
+                result = transcriber.transcribe(wav_path, language=self.language)
+                self.language = self.language or result.get("language")
+                new_segments = [shift_segment(s, start) for s in result.get("segments", [])]
+                self.segments.extend(new_segments)
+                print(f"[LIVE] Transcribed {start:.0f}s - {self.source.available_until:.0f}s "
+                      f"({len(new_segments)} segments)")
+                self._pending_chunks.pop(0)
+                os.remove(wav_path)
+                self._analysis_due = True
+
+            if not self.segments or not (self._analysis_due or final):
+                return
+
+            # Sliding window over the most recent commentary
+            transcript_end = self.segments[-1]["end"]
+            window = [s for s in self.segments if s["end"] >= transcript_end - self.window_seconds]
+            window_result = {
+                "text": "".join(s.get("text", "") for s in window),
+                "segments": window,
+                "language": self.language
+            }
+            full_text = transcriber.get_full_text(transcriber.format_transcript(window_result))
+
+        if hasattr(self.analyzer, "iter_highlights") and config.LLM_STREAMING:
+            # Each highlight is cut as soon as the model has finished describing it
+            highlights = self.analyzer.iter_highlights(full_text)
+        else:
+            highlights = self.analyzer.analyze_highlights(full_text) or []
+            highlights = sorted(highlights, key=lambda h: highlight_span(h)[0] or 0)
+
+        for highlight in highlights:
+            start, end = highlight_span(highlight)
+            if start is None or highlight_score(highlight) < self.min_score:
+                continue
+            settled = final or end <= transcript_end - self.settle_seconds
+            recorded = final or end + self.buffer_seconds <= self.source.available_until
+            if not (settled and recorded):
+                continue  # Wait for a later window
+            if any(is_duplicate(highlight, c) for c in self.confirmed):
+                continue
+            self._confirm(highlight, start, end)
+        self._analysis_due = False
+
+    def _confirm(self, highlight, start, end):
+        highlight['final_score'] = highlight_score(highlight)
+        # MPEG-TS clips can be listed in an HLS playlist as they are, and joined losslessly at the end
+        clip_path = os.path.join(self.clip_dir, f"clip_{len(self.clips) + 1:04d}.ts")
+        clip_start = max(0.0, start - self.buffer_seconds)
+        clip_end = min(self.source.available_until, end + self.buffer_seconds)
+        try:
+            self.source.cut(clip_start, clip_end, clip_path)
+        except RuntimeError as e:
+            print(f"[WARNING] Clip extraction failed: {e}")
+            return
+
+        self.confirmed.append(highlight)
+        self.clips.append((clip_path, clip_end - clip_start))
+        print(f"[LIVE] Highlight confirmed at {start:.0f}s (score {highlight['final_score']}): "
+              f"{highlight.get('description', '')}")
+
+        self._write_playlist()
+        with open(self.highlights_path, "w", encoding="utf-8") as f:
+            json.dump(self.confirmed, f, ensure_ascii=False, indent=2)
+
+    def _write_playlist(self, ended=False):
+        """
+        Write the HLS playlist of the clips; a new clip only adds an entry, the video data
+        of earlier clips is not touched
+        """
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+            f"#EXT-X-TARGETDURATION:{math.ceil(max(duration for _, duration in self.clips))}",
+            "#EXT-X-MEDIA-SEQUENCE:0"
+        ]
+        for i, (path, duration) in enumerate(self.clips):
+            if i:
+                lines.append("#EXT-X-DISCONTINUITY")  # Every clip starts its own timeline
+            lines.append(f"#EXTINF:{duration:.3f},")
+            lines.append(os.path.relpath(path, self.output_dir).replace("\\", "/"))
+        if ended:
+            lines.append("#EXT-X-ENDLIST")
+
+        tmp_path = self.playlist_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.playlist_path)
+
+    def _finish(self):
+        from src.summarizer import TextSummarizer
+
+        print("\n" + "=" * 70)
+        if not self.confirmed:
+            print("[WARNING] No highlights were confirmed")
+            return None
+
+        # One stream-copy join at the end instead of one per confirmed highlight
+        self._write_playlist(ended=True)
+        concat_files([path for path, _ in self.clips], self.reel_path)
+
+        summary_path = os.path.join(self.output_dir, f"{self.name}_live_summary.txt")
+        summarizer = TextSummarizer()
+        summarizer.generate_summary(self.confirmed, summary_path)
+        print(f"Highlights: {len(self.confirmed)}")
+        print(f"  1. Highlights Video: {self.reel_path}")
+        print(f"  2. Live Playlist: {self.playlist_path}")
+        print(f"  3. Text Summary: {summary_path}")
+        print("=" * 70)
+        return {"highlights_video": self.reel_path, "playlist": self.playlist_path, "summary": summary_path,
+                "highlight_count": len(self.confirmed)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sports Video AI Summarizer - Live Mode")
+    parser.add_argument("source", help="Growing recording file (.ts/.mkv/.flv) or segment directory")
+    parser.add_argument("-o", "--output", default="output", help="Output directory (default: output)")
+    parser.add_argument("--model", default=config.SELECTED_MODEL, choices=list(config.AVAILABLE_MODELS),
+                        help=f"AI model (default: {config.SELECTED_MODEL})")
+    parser.add_argument("--window", type=float, default=config.LIVE_WINDOW_SECONDS,
+                        help=f"Transcript window per analysis in seconds (default: {config.LIVE_WINDOW_SECONDS})")
+    parser.add_argument("--idle-timeout", type=float, default=config.LIVE_IDLE_TIMEOUT,
+                        help=f"Finish after the source stops growing for this long (default: {config.LIVE_IDLE_TIMEOUT})")
+
+    args = parser.parse_args()
+
+    # Check API Key
+    if config.CLAUDE_API_KEY == "your-api-key-here":
+        print("[ERROR] Please set CLAUDE_API_KEY in config.py first.")
+        sys.exit(1)
+
+    os.makedirs(args.output, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix="video_summarizer_live_")
+    try:
+        if os.path.isdir(args.source):
+            source = SegmentDirectorySource(args.source, work_dir)
+            name = os.path.basename(os.path.normpath(args.source))
+        else:
+            source = GrowingFileSource(args.source, work_dir, min_chunk_seconds=config.LIVE_CHUNK_SECONDS)
+            name = os.path.splitext(os.path.basename(args.source))[0]
+
+        print(f"Following {args.source} (Ctrl+C to finish)")
+        live = LiveSummarizer(source, args.output, name, model_type=args.model, window_seconds=args.window)
+        live.run(idle_timeout=args.idle_timeout)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
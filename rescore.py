@@ -0,0 +1,145 @@
+"""
+Sports Video AI Summarizer - Rescore / Recut
+Reloads the intermediate results saved by a previous run ({video_name}_analysis.json) and
+recomputes only the cheap downstream stages: score filtering, audio fusion, the highlight reel
+and the text summary. No transcription and no AI call, so cut thresholds can be tuned in seconds.
+
+The stages are the pipeline's own steps; only the first one is replaced (the saved highlights
+and audio peaks are loaded instead of being computed).
+"""
+import os
+import sys
+import argparse
+
+import config
+from src.pipeline import Pipeline, MIN_SCORE
+from src.intermediates import load_intermediates
+
+
+class RescorePipeline(Pipeline):
+    """The pipeline's filter, fusion, edit and summary steps over saved intermediates"""
+
+    def __init__(self, analysis_file, video_path=None, output_dir=None, cut=True, peak_threshold=None, **options):
+        """
+        Args:
+            analysis_file: {video_name}_analysis.json
+            video_path: Source video (default: the path recorded in the analysis file)
+            output_dir: Output directory (default: the analysis file's directory)
+            cut: Regenerate the highlight reel (False = summary only)
+            peak_threshold: Re-detect excitement peaks with this floor (None = as saved)
+            **options: Passed to Pipeline (min_score, audio_weight, audio_tolerance, buffer_seconds,
+                use_audio_analysis, on_event, cancel)
+
+        Raises:
+            ValueError: peak_threshold without a saved excitement curve (see load_intermediates)
+        """
+        self.analysis_file = analysis_file
+        self.data = load_intermediates(analysis_file, peak_threshold=peak_threshold)
+        super().__init__(video_path or self.data["video"] or "",
+                         output_dir or os.path.dirname(os.path.abspath(analysis_file)),
+                         use_cache=False, **options)
+        # Nothing is recomputed, so the run's own metrics are left untouched
+        self.metrics_enabled = False
+        self.cut = cut
+
+        name = os.path.basename(analysis_file)
+        self.video_name = name[:-len("_analysis.json")] if name.endswith("_analysis.json") else os.path.splitext(name)[0]
+
+        self.steps = [
+            ("load", "Loading Saved Analysis", type(self).load_analysis),
+            ("audio_peaks", "Audio Fusion", type(self).fuse_audio),
+        ]
+        if cut:
+            self.steps.append(("edit", "Generating Highlight Reel", type(self).edit))
+        self.steps.append(("summary", "Generating Text Summary", type(self).summarize))
+
+    def check_inputs(self):
+        # The source video is only read when the reel is cut again
+        if self.cut and not os.path.exists(self.video_path):
+            self.log(f"[ERROR] Source video not found: {self.video_path or None} (pass --video)")
+            return False
+        return True
+
+    def start_background_stages(self):
+        # The audio peaks were saved with the analysis; nothing is decoded
+        pass
+
+    def load_analysis(self):
+        """Step 1: the highlights of the previous run, filtered with the new minimum score"""
+        self.transcript_path = self.data["transcript"]
+        self.raw_highlights = [dict(h) for h in self.data["highlights"]]
+        self.highlights = self.filter_highlights([dict(h) for h in self.raw_highlights])
+        self.log(f"{len(self.highlights)}/{len(self.raw_highlights)} highlights scored >= {self.min_score}")
+        if not self.highlights:
+            self.stop("No highlights left after rescoring")
+
+    def load_audio_peaks(self):
+        """The saved audio peaks (None when the previous run skipped audio analysis)"""
+        return self.data["audio_peaks"]
+
+    def save_analysis(self):
+        # The saved intermediates are the input here; they are not rewritten
+        self.outputs["analysis"] = self.analysis_file
+
+
+def recut(analysis_file, video_path=None, output_dir=None, cut=True, **options):
+    """
+    Rescore, then regenerate the highlight reel and the text summary
+
+    Args:
+        analysis_file: {video_name}_analysis.json
+        video_path: Source video (default: the path recorded in the analysis file)
+        output_dir: Output directory (default: the analysis file's directory)
+        cut: Regenerate the highlight reel (False = summary only)
+        **options: Passed to RescorePipeline (min_score, audio_weight, audio_tolerance,
+            buffer_seconds, peak_threshold, use_audio_analysis)
+
+    Returns:
+        Dictionary of output file paths, or None if nothing was produced
+
+    Raises:
+        ValueError: peak_threshold without a saved excitement curve
+    """
+    pipeline = RescorePipeline(analysis_file, video_path, output_dir, cut=cut, **options)
+    outputs = pipeline.run()
+    if outputs:
+        pipeline.summarizer.print_summary(pipeline.highlights)
+    return outputs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sports Video AI Summarizer - Rescore / Recut")
+    parser.add_argument("analysis", help="{video_name}_analysis.json written by a previous run")
+    parser.add_argument("--video", help="Source video (default: the path recorded in the analysis file)")
+    parser.add_argument("-o", "--output", help="Output directory (default: the analysis file's directory)")
+    parser.add_argument("--min-score", type=float, default=MIN_SCORE, help=f"Minimum AI score kept (default: {MIN_SCORE})")
+    parser.add_argument("--audio-weight", type=float, help=f"Share of the final score from audio, numpy audio engine only (default: {config.AUDIO_WEIGHT})")
+    parser.add_argument("--tolerance", type=float, help=f"Audio matching tolerance in seconds, numpy audio engine only (default: {config.AUDIO_MATCH_TOLERANCE})")
+    parser.add_argument("--peak-threshold", type=float,
+                        help="Re-detect excitement peaks with this threshold (numpy audio engine only)")
+    parser.add_argument("--buffer", type=float, help=f"Seconds kept around each highlight (default: {config.HIGHLIGHT_BUFFER})")
+    parser.add_argument("--no-audio", action="store_true", help="Ignore the saved audio analysis")
+    parser.add_argument("--no-cut", action="store_true", help="Only rescore and rewrite the summary")
+
+    args = parser.parse_args()
+    if not os.path.exists(args.analysis):
+        print(f"[ERROR] Analysis file does not exist: {args.analysis}")
+        sys.exit(1)
+
+    try:
+        outputs = recut(
+            args.analysis,
+            video_path=args.video,
+            output_dir=args.output,
+            cut=not args.no_cut,
+            buffer_seconds=args.buffer,
+            min_score=args.min_score,
+            audio_weight=args.audio_weight,
+            audio_tolerance=args.tolerance,
+            peak_threshold=args.peak_threshold,
+            use_audio_analysis=not args.no_audio
+        )
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    sys.exit(0 if outputs else 1)
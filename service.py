@@ -0,0 +1,509 @@
+"""
+Sports Video AI Summarizer - Service
+Long-lived local HTTP service. Whisper models stay loaded in the model pool and the result
+cache and HTTP connections are shared between jobs, so a submitted video starts transcribing
+right away instead of paying interpreter start-up and model load per file.
+
+API (JSON):
+    POST   /jobs                    Submit {"video": path, "output": dir, "no_audio": false, "model": "claude"},
+                                    or upload the video as the request body: POST /jobs?filename=game.mp4
+    GET    /jobs                    All jobs
+    GET    /jobs/<id>               Status, current step and progress
+    GET    /jobs/<id>/result        Output files of a finished job, with download URLs
+    GET    /jobs/<id>/files/<name>  Download an output file
+    DELETE /jobs/<id>               Cancel a queued or running job
+    GET    /health                  Queue length and loaded models
+
+Jobs wait in a bounded queue in front of the workers; when it is full, submissions are
+answered with 503 and Retry-After so clients back off instead of piling up work.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import argparse
+import threading
+import traceback
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import config
+from src import model_pool
+from src.pipeline import Pipeline
+from src.result_cache import ResultCache
+from src.cancellation import CancelToken, Cancelled
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".flv")
+RETRY_AFTER_SECONDS = 30  # Suggested wait when the queue is full
+MAX_JSON_BYTES = 1024 * 1024
+UPLOAD_BLOCK = 1024 * 1024
+FINISHED = ("done", "no_output", "failed", "cancelled")
+
+
+class ServiceError(Exception):
+    """A request that is answered with an HTTP error status"""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class JobService:
+    """Job registry, bounded queue and worker threads"""
+
+    def __init__(self, workers=config.SERVICE_WORKERS, queue_size=config.SERVICE_QUEUE_SIZE,
+                 output_dir=config.SERVICE_OUTPUT_DIR, upload_dir=config.SERVICE_UPLOAD_DIR,
+                 use_cache=config.USE_CACHE, cache_dir=config.CACHE_DIR):
+        """
+        Args:
+            workers: Videos processed at the same time
+            queue_size: Jobs allowed to wait for a worker
+            output_dir: Parent directory of the per-job output directories
+            upload_dir: Where uploaded videos are stored while their job runs
+            use_cache: Reuse cached stage results
+            cache_dir: Cache directory
+        """
+        self.workers = max(1, workers)
+        self.output_dir = output_dir
+        self.upload_dir = upload_dir
+        self.jobs = {}
+        self._order = []
+        self._lock = threading.Lock()
+        self.queue_size = max(1, queue_size)
+        self._pending = deque()  # Queued jobs, oldest first
+        self._work = threading.Condition(self._lock)  # Signalled when a job is queued or on stop
+        self._stopping = False
+        self._threads = []
+        self.cache = ResultCache(cache_dir, max_size_mb=config.CACHE_MAX_SIZE_MB, enabled=use_cache)
+
+        # Allow up to one loaded Whisper model per worker
+        model_pool.get_pool(max_replicas=self.workers)
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"service-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Cancel every job and stop the workers"""
+        with self._lock:
+            active = [job for job in self.jobs.values() if job["status"] not in FINISHED]
+        for job in active:
+            job["cancel"].cancel()
+        with self._work:
+            # Workers drain the (cancelled) queued jobs, then exit
+            self._stopping = True
+            self._work.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=10)
+
+    # ---------- Submission ----------
+
+    def check_capacity(self):
+        """Fail fast with 503 before an upload is read when no job could be queued"""
+        with self._lock:
+            full = len(self._pending) >= self.queue_size
+        if full:
+            raise ServiceError(503, "Job queue is full, retry later", {"Retry-After": str(RETRY_AFTER_SECONDS)})
+
+    def new_job_id(self):
+        return uuid.uuid4().hex[:12]
+
+    def submit(self, job_id, video_path, output_dir=None, use_audio_analysis=True, model_type=None, upload=False):
+        """
+        Queue a job
+
+        Args:
+            job_id: From new_job_id()
+            video_path: Video file path
+            output_dir: Output directory (default: <output_dir>/<job id>)
+            use_audio_analysis: Use audio analysis enhancement
+            model_type: claude / gpt / gemini (default config.SELECTED_MODEL)
+            upload: The video was uploaded and is deleted when the job ends
+
+        Returns:
+            Job dictionary
+        """
+        model_type = model_type or config.SELECTED_MODEL
+        if model_type not in config.AVAILABLE_MODELS:
+            raise ServiceError(400, f"Unknown model: {model_type} (expected one of {', '.join(config.AVAILABLE_MODELS)})")
+        if not os.path.isfile(video_path):
+            raise ServiceError(400, f"Video file does not exist: {video_path}")
+
+        job = {
+            "id": job_id,
+            "video": os.path.abspath(video_path),
+            "output": output_dir or os.path.join(self.output_dir, job_id),
+            "use_audio_analysis": use_audio_analysis,
+            "model_type": model_type,
+            "upload": upload,
+            "status": "queued",
+            "stage": None,
+            "step": None,
+            "progress": None,
+            "message": None,
+            "submitted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "started_at": None,
+            "finished_at": None,
+            "outputs": None,
+            "error": None,
+            "cancel": CancelToken()
+        }
+        with self._work:
+            if len(self._pending) >= self.queue_size:
+                raise ServiceError(503, "Job queue is full, retry later", {"Retry-After": str(RETRY_AFTER_SECONDS)})
+            self._pending.append(job)
+            self._work.notify()
+            self.jobs[job_id] = job
+            self._order.append(job_id)
+            self._forget_old_jobs()
+        print(f"Queued job {job_id}: {job['video']}")
+        return job
+
+    def cancel(self, job_id):
+        """Cancel a job; queued jobs leave the queue at once, freeing their slot"""
+        job = self.get(job_id)
+        if job["status"] in FINISHED:
+            return job
+        job["cancel"].cancel()
+        with self._lock:
+            queued = any(pending is job for pending in self._pending)
+            if queued:
+                # No worker will reach it, so finish it here
+                self._pending.remove(job)
+                job.update(status="cancelled", finished_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+            else:
+                # A worker already took it: it stops at the next step (or right away if not started)
+                job.update(status="cancelling")
+        if queued and job["upload"]:
+            shutil.rmtree(os.path.dirname(job["video"]), ignore_errors=True)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            raise ServiceError(404, f"No such job: {job_id}")
+        return job
+
+    def all_jobs(self):
+        with self._lock:
+            # Also pruned here, so a server that no longer receives jobs still drops old ones
+            self._forget_old_jobs()
+            return [self.jobs[job_id] for job_id in self._order]
+
+    def health(self):
+        with self._lock:
+            queued = len(self._pending)
+        return {
+            "queued": queued,
+            "queue_size": self.queue_size,
+            "workers": self.workers,
+            "running": sum(1 for job in self.all_jobs() if job["status"] in ("running", "cancelling")),
+            "loaded_models": model_pool.get_pool().loaded_models()
+        }
+
+    # ---------- Workers ----------
+
+    def _worker(self):
+        while True:
+            with self._work:
+                while not self._pending and not self._stopping:
+                    self._work.wait()
+                if not self._pending:
+                    return
+                job = self._pending.popleft()
+            try:
+                self._run_job(job)
+            finally:
+                if job["upload"]:
+                    shutil.rmtree(os.path.dirname(job["video"]), ignore_errors=True)
+
+    def _run_job(self, job):
+        if job["cancel"].cancelled:
+            self._update(job, status="cancelled", finished_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+            return
+        self._update(job, status="running", started_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+        fields = {}
+        try:
+            pipeline = Pipeline(
+                job["video"],
+                job["output"],
+                use_audio_analysis=job["use_audio_analysis"],
+                model_type=job["model_type"],
+                cache=self.cache,
+                on_event=lambda kind, data: self._on_event(job, kind, data),
+                cancel=job["cancel"]
+            )
+            outputs = pipeline.run()
+            if outputs:
+                fields = dict(status="done", outputs=outputs)
+            else:
+                fields = dict(status="no_output", error=pipeline.stopped or "Nothing was produced")
+        except Cancelled:
+            fields = dict(status="cancelled")
+        except Exception as e:
+            print(f"[ERROR] Job {job['id']} failed:\n{traceback.format_exc()}")
+            fields = dict(status="failed", error=str(e))
+        with self._lock:
+            job.update(progress=None, finished_at=time.strftime("%Y-%m-%d %H:%M:%S"), **fields)
+            self._forget_old_jobs()
+        print(f"Job {job['id']} {job['status']}")
+
+    def _on_event(self, job, kind, data):
+        if kind == "stage":
+            self._update(job, stage=data["name"], step=f"{data['index']}/{data['total']} {data['title']}", progress=None)
+        elif kind == "progress" and data["total"]:
+            self._update(job, progress=round(min(1.0, data["done"] / data["total"]), 3))
+        elif kind == "log":
+            self._update(job, message=data["message"])
+
+    def _update(self, job, **fields):
+        with self._lock:
+            job.update(fields)
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id in self._order if self.jobs[job_id]["status"] in FINISHED]
+        for job_id in finished[:max(0, len(finished) - config.SERVICE_KEEP_JOBS)]:
+            self._order.remove(job_id)
+            del self.jobs[job_id]
+
+
+def job_view(job):
+    """JSON-safe view of a job with its URLs"""
+    view = {key: value for key, value in job.items() if key not in ("cancel", "outputs")}
+    view["status_url"] = f"/jobs/{job['id']}"
+    view["result_url"] = f"/jobs/{job['id']}/result"
+    return view
+
+
+def output_files(job):
+    """Output name -> path of a finished job (only these files are served)"""
+    outputs = job["outputs"] or {}
+    paths = [value for value in outputs.values() if isinstance(value, str)]
+    paths += list((outputs.get("renditions") or {}).values())
+    return {os.path.basename(path): path for path in paths if path and os.path.isfile(path)}
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    server_version = "VideoSummarizer/1.0"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def do_GET(self):
+        self._dispatch(self._get)
+
+    def do_POST(self):
+        self._dispatch(self._post)
+
+    def do_DELETE(self):
+        self._dispatch(self._delete)
+
+    def _dispatch(self, handler):
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        try:
+            handler(parts, parse_qs(url.query))
+        except ServiceError as e:
+            self._send_json(e.status, {"error": str(e)}, e.headers)
+        except Exception as e:
+            traceback.print_exc()
+            self._send_json(500, {"error": str(e)})
+
+    def _get(self, parts, query):
+        if parts == ["health"]:
+            self._send_json(200, self.service.health())
+        elif parts == ["jobs"]:
+            self._send_json(200, {"jobs": [job_view(job) for job in self.service.all_jobs()]})
+        elif len(parts) == 2 and parts[0] == "jobs":
+            self._send_json(200, job_view(self.service.get(parts[1])))
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "result":
+            job = self.service.get(parts[1])
+            if job["status"] != "done":
+                raise ServiceError(409, f"Job is {job['status']}, no result yet" if job["status"] not in FINISHED
+                                   else f"Job ended with status {job['status']}: {job['error']}")
+            files = {name: f"/jobs/{job['id']}/files/{name}" for name in output_files(job)}
+            self._send_json(200, {"id": job["id"], "outputs": job["outputs"], "files": files})
+        elif len(parts) == 4 and parts[0] == "jobs" and parts[2] == "files":
+            path = output_files(self.service.get(parts[1])).get(parts[3])
+            if path is None:
+                raise ServiceError(404, f"No such output file: {parts[3]}")
+            self._send_file(path)
+        else:
+            raise ServiceError(404, f"Not found: {self.path}")
+
+    def _post(self, parts, query):
+        if parts != ["jobs"]:
+            raise ServiceError(404, f"Not found: {self.path}")
+        job_id = self.service.new_job_id()
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip()
+        if content_type == "application/json":
+            request = self._read_json()
+            if not request.get("video"):
+                raise ServiceError(400, 'Missing "video" (path of a video file)')
+            job = self.service.submit(
+                job_id,
+                request["video"],
+                output_dir=request.get("output"),
+                use_audio_analysis=not request.get("no_audio", False),
+                model_type=request.get("model")
+            )
+        else:
+            self.service.check_capacity()
+            video_path = self._read_upload(job_id, (query.get("filename") or ["upload.mp4"])[0])
+            try:
+                job = self.service.submit(
+                    job_id,
+                    video_path,
+                    use_audio_analysis=(query.get("no_audio") or ["0"])[0] not in ("1", "true"),
+                    model_type=(query.get("model") or [None])[0],
+                    upload=True
+                )
+            except ServiceError:
+                shutil.rmtree(os.path.dirname(video_path), ignore_errors=True)
+                raise
+        self._send_json(202, job_view(job), {"Location": f"/jobs/{job['id']}"})
+
+    def _delete(self, parts, query):
+        if len(parts) != 2 or parts[0] != "jobs":
+            raise ServiceError(404, f"Not found: {self.path}")
+        self._send_json(200, job_view(self.service.cancel(parts[1])))
+
+    def _content_length(self, limit):
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            raise ServiceError(411, "Content-Length is required")
+        if length > limit:
+            raise ServiceError(413, f"Request body larger than {limit // 2 ** 20} MB")
+        return length
+
+    def _read_json(self):
+        body = self.rfile.read(self._content_length(MAX_JSON_BYTES))
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError as e:
+            raise ServiceError(400, f"Invalid JSON: {e}")
+        if not isinstance(request, dict):
+            raise ServiceError(400, "Expected a JSON object")
+        return request
+
+    def _read_upload(self, job_id, filename):
+        """Stream the request body into the upload directory"""
+        filename = os.path.basename(filename)
+        if os.path.splitext(filename)[1].lower() not in VIDEO_EXTENSIONS:
+            raise ServiceError(415, f"Unsupported video type: {filename} (expected {', '.join(VIDEO_EXTENSIONS)})")
+        remaining = self._content_length(config.SERVICE_MAX_UPLOAD_MB * 2 ** 20)
+        job_dir = os.path.join(self.service.upload_dir, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        path = os.path.join(job_dir, filename)
+        try:
+            with open(path, "wb") as f:
+                while remaining > 0:
+                    block = self.rfile.read(min(UPLOAD_BLOCK, remaining))
+                    if not block:
+                        raise ServiceError(400, "Upload ended before Content-Length bytes")
+                    f.write(block)
+                    remaining -= len(block)
+        except BaseException:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+        return path
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_file(self, path):
+        content_type = {
+            ".mp4": "video/mp4",
+            ".json": "application/json",
+            ".txt": "text/plain; charset=utf-8",
+            ".md": "text/markdown; charset=utf-8"
+        }.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(path)}"')
+        self.end_headers()
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile)
+
+    def log_message(self, format, *args):
+        # Status polling would flood the console; only errors are logged
+        if len(args) > 1 and str(args[1]).startswith(("4", "5")):
+            super().log_message(format, *args)
+
+
+def serve(host=config.SERVICE_HOST, port=config.SERVICE_PORT, preload=True, **service_options):
+    """
+    Run the service until interrupted
+
+    Args:
+        host, port: Listen address
+        preload: Load the Whisper model before accepting jobs
+        **service_options: JobService arguments
+    """
+    service = JobService(**service_options)
+    if preload:
+        from src.whisper_backends import first_pass_model
+        model_pool.get_pool().preload(first_pass_model())
+    service.start()
+
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.service = service
+    print(f"Service listening on http://{host}:{port} ({service.workers} workers, "
+          f"queue of {service.queue_size}, Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping, cancelling running jobs...")
+    finally:
+        server.server_close()
+        service.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sports Video AI Summarizer - Service")
+    parser.add_argument("--host", default=config.SERVICE_HOST, help=f"Listen address (default: {config.SERVICE_HOST})")
+    parser.add_argument("--port", type=int, default=config.SERVICE_PORT, help=f"Port (default: {config.SERVICE_PORT})")
+    parser.add_argument("-w", "--workers", type=int, default=config.SERVICE_WORKERS,
+                        help=f"Videos processed in parallel (default: {config.SERVICE_WORKERS})")
+    parser.add_argument("--queue-size", type=int, default=config.SERVICE_QUEUE_SIZE,
+                        help=f"Jobs allowed to wait for a worker (default: {config.SERVICE_QUEUE_SIZE})")
+    parser.add_argument("-o", "--output", default=config.SERVICE_OUTPUT_DIR,
+                        help=f"Output directory (default: {config.SERVICE_OUTPUT_DIR})")
+    parser.add_argument("--no-preload", action="store_true", help="Load the Whisper model on the first job instead of at start-up")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every stage instead of reusing cached results")
+    parser.add_argument("--cache-dir", default=config.CACHE_DIR, help=f"Cache directory (default: {config.CACHE_DIR})")
+
+    args = parser.parse_args()
+
+    # Check API Key
+    if config.CLAUDE_API_KEY == "your-api-key-here":
+        print("[ERROR] Please set CLAUDE_API_KEY in config.py first.")
+        sys.exit(1)
+
+    serve(
+        host=args.host,
+        port=args.port,
+        preload=not args.no_preload,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        output_dir=args.output,
+        use_cache=config.USE_CACHE and not args.no_cache,
+        cache_dir=args.cache_dir
+    )
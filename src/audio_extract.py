@@ -0,0 +1,228 @@
+"""
+Shared Audio Extraction -
+Decodes the audio track of a video once into a 16 kHz mono PCM WAV file that both
+Whisper transcription and audio peak detection read, instead of each demuxing the video.
+stream_pcm reads the same samples block by block for analyses that must not hold the whole track.
+"""
+import os
+import shutil
+import struct
+import wave
+import weakref
+import tempfile
+import threading
+import subprocess
+
+from src.ffmpeg_tools import find_ffmpeg, run_ffmpeg
+
+SAMPLE_RATE = 16000  # Whisper's native sample rate
+
+
+def extract_audio(video_path, output_path, sample_rate=SAMPLE_RATE, start=None, duration=None, cancel=None):
+    """
+    Decode the audio track of a video into mono 16-bit PCM WAV
+
+    Args:
+        video_path: Input video path
+        output_path: Output WAV path
+        sample_rate: Output sample rate
+        start: Start time in seconds (None = beginning)
+        duration: Seconds to extract (None = until the end)
+        cancel: Optional CancelToken (see run_ffmpeg)
+
+    Returns:
+        output_path
+    """
+    args = []
+    if start:
+        args += ["-ss", f"{start:.3f}"]
+    args += ["-i", video_path]
+    if duration is not None:
+        args += ["-t", f"{duration:.3f}"]
+    args += [
+        "-vn", "-ac", "1", "-ar", str(sample_rate),
+        "-c:a", "pcm_s16le",
+        output_path
+    ]
+    run_ffmpeg(args, "FFmpeg audio extraction", cancel)
+    return output_path
+
+
+def load_pcm(wav_path):
+    """
+    Memory-map the samples of a PCM WAV written by extract_audio
+
+    Args:
+        wav_path: WAV path
+
+    Returns:
+        (samples, sample_rate) - samples is a read-only int16 numpy memmap
+    """
+    import numpy as np
+
+    with wave.open(wav_path, "rb") as wf:
+        if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+            raise ValueError(f"Expected mono 16-bit PCM: {wav_path}")
+        sample_rate = wf.getframerate()
+
+    offset, size = _data_chunk(wav_path)
+    samples = np.memmap(wav_path, dtype="<i2", mode="r", offset=offset, shape=(size // 2,))
+    return samples, sample_rate
+
+
+def _data_chunk(wav_path):
+    """(offset, size) of the data chunk, found by walking the RIFF chunks (others may follow it)"""
+    file_size = os.path.getsize(wav_path)
+    with open(wav_path, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"Not a RIFF/WAVE file: {wav_path}")
+        offset = 12
+        while offset + 8 <= file_size:
+            f.seek(offset)
+            chunk_id, size = struct.unpack("<4sI", f.read(8))
+            if chunk_id == b"data":
+                # A streamed WAV may leave the size unset; the data then runs to the end of the file
+                return offset + 8, min(size, file_size - offset - 8)
+            # Chunks are padded to an even size
+            offset += 8 + size + (size & 1)
+    raise ValueError(f"No data chunk: {wav_path}")
+
+
+def write_wav(path, samples, sample_rate=SAMPLE_RATE):
+    """
+    Write int16 samples (e.g. a slice of load_pcm) as a mono 16-bit PCM WAV
+
+    Args:
+        path: Output WAV path
+        samples: int16 numpy array
+        sample_rate: Sample rate of the samples
+    """
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(samples.tobytes())
+
+
+def stream_pcm(path, sample_rate=SAMPLE_RATE, block_seconds=30):
+    """
+    Yield the audio of a file as consecutive mono int16 blocks; memory use does not depend on its length
+
+    A mono 16-bit WAV at sample_rate (as written by extract_audio) is read directly,
+    anything else is decoded through an FFmpeg pipe.
+
+    Args:
+        path: Audio or video path
+        sample_rate: Sample rate of the yielded samples
+        block_seconds: Seconds per block
+
+    Yields:
+        int16 numpy arrays
+    """
+    import numpy as np
+
+    block_samples = int(block_seconds * sample_rate)
+    if path.lower().endswith(".wav"):
+        try:
+            with wave.open(path, "rb") as wf:
+                if wf.getsampwidth() == 2 and wf.getnchannels() == 1 and wf.getframerate() == sample_rate:
+                    while True:
+                        data = wf.readframes(block_samples)
+                        if not data:
+                            return
+                        yield np.frombuffer(data, dtype="<i2")
+        except (wave.Error, EOFError):
+            pass  # Not a plain PCM WAV: let FFmpeg decode it
+
+    process = subprocess.Popen(
+        [find_ffmpeg(), "-v", "error", "-i", path, "-vn", "-ac", "1", "-ar", str(sample_rate),
+         "-f", "s16le", "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    try:
+        block_bytes = block_samples * 2
+        remainder = b""
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            data = remainder + data
+            usable = len(data) - len(data) % 2
+            remainder = data[usable:]
+            if usable:
+                yield np.frombuffer(data[:usable], dtype="<i2")
+        error = process.stderr.read().decode("utf-8", errors="replace").strip()
+        if process.wait() != 0:
+            raise RuntimeError(f"FFmpeg audio decoding failed: {error}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+class SharedAudio:
+    """
+    Lazily extracted audio track of one video, shared by every stage that needs audio.
+
+    Usage:
+        with SharedAudio(video_path) as audio:
+            transcriber.transcribe(audio.path)
+            audio_analyzer.detect_peaks(audio.path)
+    """
+
+    def __init__(self, video_path, sample_rate=SAMPLE_RATE, enabled=True, cancel=None):
+        """
+        Args:
+            video_path: Input video path
+            sample_rate: Sample rate of the extracted track
+            enabled: When False, path returns the video itself (each consumer decodes on its own)
+            cancel: Optional CancelToken that aborts the extraction
+        """
+        self.video_path = video_path
+        self.sample_rate = sample_rate
+        self.enabled = enabled
+        self.cancel = cancel
+        self._path = None
+        self._tmp_dir = None
+        self._failed = False
+        self._lock = threading.Lock()
+        self._finalizer = None
+
+    @property
+    def path(self):
+        """Path consumers should read audio from; the track is extracted on first access"""
+        if not self.enabled or self._failed:
+            return self.video_path
+
+        with self._lock:
+            if self._path is None and not self._failed:
+                self._tmp_dir = tempfile.mkdtemp(prefix="video_summarizer_audio_")
+                # Remove the temp track even if the caller never reaches cleanup()
+                self._finalizer = weakref.finalize(self, shutil.rmtree, self._tmp_dir, True)
+                wav_path = os.path.join(self._tmp_dir, "audio.wav")
+                print("Extracting audio track (shared by transcription and audio analysis)...")
+                try:
+                    self._path = extract_audio(self.video_path, wav_path, self.sample_rate, cancel=self.cancel)
+                except (RuntimeError, OSError) as e:
+                    print(f"[WARNING] {e}; stages will decode the video directly")
+                    self._failed = True
+                    self.cleanup()
+            return self._path or self.video_path
+
+    def cleanup(self):
+        """Delete the extracted track"""
+        if self._finalizer:
+            self._finalizer()
+        self._finalizer = None
+        self._tmp_dir = None
+        self._path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+        return False
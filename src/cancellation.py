@@ -0,0 +1,77 @@
+"""
+Cancellation -
+Cooperative cancellation of one pipeline run. Long operations register how to abort
+themselves while they run (kill an FFmpeg process, cancel an HTTP request, terminate worker
+processes) and check the token between units of work; the run then ends with Cancelled.
+
+Every function taking cancel=None accepts a CancelToken or None (not cancellable).
+"""
+import threading
+from contextlib import contextmanager, nullcontext
+
+
+class Cancelled(Exception):
+    """The run was cancelled by the user"""
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """Request cancellation and run the registered abort callbacks (safe from any thread)"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[WARNING] Abort callback failed: {e}")
+
+    def check(self):
+        """Raise Cancelled if cancellation was requested"""
+        if self._event.is_set():
+            raise Cancelled()
+
+    def wait(self, timeout):
+        """Sleep up to timeout seconds, waking early on cancellation; True if cancelled"""
+        return self._event.wait(timeout)
+
+    @contextmanager
+    def on_cancel(self, callback):
+        """
+        Run callback if the token is cancelled while the block runs
+        (immediately if it already is)
+        """
+        with self._lock:
+            registered = not self._event.is_set()
+            if registered:
+                self._callbacks.append(callback)
+        if not registered:
+            callback()
+        try:
+            yield
+        finally:
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+
+
+def on_cancel(cancel, callback):
+    """CancelToken.on_cancel for an optional token"""
+    return cancel.on_cancel(callback) if cancel is not None else nullcontext()
+
+
+def check_cancelled(cancel):
+    """CancelToken.check for an optional token"""
+    if cancel is not None:
+        cancel.check()
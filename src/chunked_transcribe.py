@@ -0,0 +1,275 @@
+"""
+Chunked Transcription -
+Splits long audio at quiet points into overlapping chunks, transcribes the chunks in a pool
+of worker processes and stitches the segments back together with absolute timestamps.
+The stitched result has the same shape as a Whisper result, so format_transcript and every
+later stage are unchanged.
+"""
+import os
+import wave
+import shutil
+import tempfile
+from contextlib import nullcontext
+from concurrent.futures import as_completed
+
+import config
+from src.audio_extract import SAMPLE_RATE, extract_audio, load_pcm, write_wav
+from src.cancellation import check_cancelled, on_cancel
+from src.parallel import WorkerPool, terminate_workers
+
+WINDOW_SECONDS = 0.1  # Loudness window used to find quiet split points
+LANGUAGE_PROBE_SECONDS = 30  # Audio used to detect the language once for all chunks
+
+# Whisper model of the current worker process (loaded once by _init_worker)
+_worker_transcriber = None
+
+
+def transcribe_audio(transcriber, audio_path, language=None, progress=None, cancel=None):
+    """
+    Transcribe with the configured strategy (chunked across processes or a single pass),
+    followed by the adaptive second pass when config.WHISPER_ADAPTIVE is set
+
+    Args:
+        transcriber: Loaded VideoTranscriber of whisper_backends.first_pass_model()
+                     (used directly for single-pass transcription), or None to lease it from
+                     the model pool only when this process transcribes itself; chunked mode
+                     loads the model in its workers and needs it only for short audio
+        audio_path: Audio or video path
+        language: Whisper language code, None = auto-detect
+        progress: Optional callable(done, total): seconds transcribed (single pass, faster-whisper),
+                  chunks transcribed (chunked), then seconds re-transcribed (adaptive second pass)
+        cancel: Optional CancelToken. Chunk workers are terminated at once; a single
+                faster-whisper pass stops after the current segment, an openai-whisper pass
+                only once it returns (it has no hook to interrupt decoding)
+
+    Returns:
+        Whisper-style result dictionary
+    """
+    from src.whisper_backends import adaptive_refine, first_pass_model
+
+    def report(done, total):
+        check_cancelled(cancel)
+        if progress is not None:
+            progress(done, total)
+
+    if cancel is None and progress is None:
+        report = None
+
+    if config.WHISPER_CHUNKED:
+        result = transcribe_chunked(
+            audio_path,
+            model_size=first_pass_model(),
+            language=language,
+            chunk_seconds=config.WHISPER_CHUNK_SECONDS,
+            overlap_seconds=config.WHISPER_CHUNK_OVERLAP,
+            workers=config.WHISPER_CHUNK_WORKERS,
+            fallback=transcriber,
+            progress=report,
+            cancel=cancel
+        )
+    else:
+        result = transcribe_single(transcriber, first_pass_model(), audio_path, language, report)
+    check_cancelled(cancel)
+
+    if config.WHISPER_ADAPTIVE:
+        result = adaptive_refine(result, audio_path, model_size=config.WHISPER_MODEL, progress=report)
+        check_cancelled(cancel)
+    return result
+
+
+def transcribe_single(transcriber, model_size, audio_path, language=None, progress=None):
+    """One pass in this process, with transcriber or a model_size model leased from the pool"""
+    from src import model_pool
+    from src.whisper_backends import transcribe_with_progress
+
+    lease = nullcontext(transcriber) if transcriber is not None else model_pool.lease(model_size)
+    with lease as transcriber:
+        return transcribe_with_progress(transcriber, audio_path, language, progress)
+
+
+def find_split_points(samples, sample_rate, chunk_seconds, search_seconds):
+    """
+    Choose chunk boundaries near every multiple of chunk_seconds, snapped to the quietest
+    WINDOW_SECONDS window within +/- search_seconds so splits land in pauses, not mid-word.
+
+    Args:
+        samples: Mono PCM samples (numpy array or memmap)
+        sample_rate: Sample rate
+        chunk_seconds: Target chunk length
+        search_seconds: How far a boundary may move to find silence
+
+    Returns:
+        Boundary times in seconds, including 0 and the total duration
+    """
+    import numpy as np
+
+    duration = len(samples) / sample_rate
+    window = int(WINDOW_SECONDS * sample_rate)
+    boundaries = [0.0]
+
+    target = chunk_seconds
+    while target < duration - chunk_seconds / 2:
+        lo = int(max(boundaries[-1] + chunk_seconds / 2, target - search_seconds) * sample_rate)
+        hi = int(min(duration, target + search_seconds) * sample_rate)
+        n_windows = (hi - lo) // window
+        if n_windows > 0:
+            region = np.asarray(samples[lo:lo + n_windows * window], dtype=np.float32)
+            energy = np.square(region.reshape(n_windows, window)).mean(axis=1)
+            quietest = int(np.argmin(energy))
+            split = (lo + quietest * window + window // 2) / sample_rate
+        else:
+            split = target
+        boundaries.append(split)
+        target = split + chunk_seconds
+
+    boundaries.append(duration)
+    return boundaries
+
+
+def _init_worker(model_size, threads):
+    """Load the Whisper model once per worker process"""
+    global _worker_transcriber
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from src.whisper_backends import create_transcriber
+    _worker_transcriber = create_transcriber(model_size, threads=threads)
+
+
+def _transcribe_chunk(index, chunk_path, language):
+    result = _worker_transcriber.transcribe(chunk_path, language=language)
+    return index, result
+
+
+def shift_segment(segment, offset):
+    """Copy of a Whisper segment moved by offset seconds (words included)"""
+    segment = dict(segment)
+    segment["start"] = segment["start"] + offset
+    segment["end"] = segment["end"] + offset
+    if segment.get("words"):
+        segment["words"] = [
+            dict(word, start=word["start"] + offset, end=word["end"] + offset)
+            for word in segment["words"]
+        ]
+    return segment
+
+
+def stitch_results(chunks, results):
+    """
+    Merge per-chunk Whisper results into one result with absolute timestamps.
+    Each chunk "owns" the time between its split points; segments from the overlap are kept
+    only by the chunk whose owned range contains the segment midpoint, so nothing is duplicated.
+
+    Args:
+        chunks: List of dicts with audio_start, own_start, own_end (seconds)
+        results: Whisper result per chunk (same order)
+
+    Returns:
+        Whisper-style result dictionary
+    """
+    segments = []
+    for chunk, result in zip(chunks, results):
+        for segment in result.get("segments", []):
+            shifted = shift_segment(segment, chunk["audio_start"])
+            midpoint = (shifted["start"] + shifted["end"]) / 2
+            if chunk["own_start"] <= midpoint < chunk["own_end"]:
+                segments.append(shifted)
+
+    segments.sort(key=lambda s: s["start"])
+    for i, segment in enumerate(segments):
+        segment["id"] = i
+
+    language = next((r.get("language") for r in results if r.get("language")), None)
+    return {
+        "text": "".join(s.get("text", "") for s in segments),
+        "segments": segments,
+        "language": language
+    }
+
+
+def transcribe_chunked(audio_path, model_size, language=None, chunk_seconds=600,
+                       overlap_seconds=2, workers=None, fallback=None, progress=None, cancel=None):
+    """
+    Transcribe long audio as parallel chunks
+
+    Args:
+        audio_path: Audio or video path (a 16 kHz mono WAV from SharedAudio avoids re-decoding)
+        model_size: Whisper model size loaded by every worker
+        language: Whisper language code, None = detect once on the first LANGUAGE_PROBE_SECONDS
+        chunk_seconds: Target chunk length
+        overlap_seconds: Audio shared by neighbouring chunks
+        workers: Worker processes (None = config default / CPU count)
+        fallback: Loaded VideoTranscriber used when the audio is short enough for one pass
+                  (None = lease model_size from the model pool in that case)
+        progress: Optional callable(done, total) called as chunks finish
+        cancel: Optional CancelToken; cancelling terminates the worker processes
+
+    Returns:
+        Whisper-style result dictionary
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="video_summarizer_chunks_")
+    try:
+        try:
+            samples, sample_rate = load_pcm(audio_path)
+        except (wave.Error, ValueError, EOFError):
+            # Not a PCM WAV (e.g. the video itself): decode the audio once here
+            wav_path = extract_audio(audio_path, os.path.join(tmp_dir, "audio.wav"), SAMPLE_RATE, cancel=cancel)
+            samples, sample_rate = load_pcm(wav_path)
+
+        boundaries = find_split_points(samples, sample_rate, chunk_seconds, search_seconds=chunk_seconds / 10)
+        if len(boundaries) <= 2:
+            return transcribe_single(fallback, model_size, audio_path, language, progress)
+
+        duration = boundaries[-1]
+        chunks = []
+        for i in range(len(boundaries) - 1):
+            audio_start = max(0.0, boundaries[i] - overlap_seconds)
+            audio_end = min(duration, boundaries[i + 1] + overlap_seconds)
+            path = os.path.join(tmp_dir, f"chunk_{i:04d}.wav")
+            write_wav(path, samples[int(audio_start * sample_rate):int(audio_end * sample_rate)], sample_rate)
+            chunks.append({
+                "path": path,
+                "audio_start": audio_start,
+                "own_start": boundaries[i],
+                "own_end": boundaries[i + 1] if i < len(boundaries) - 2 else float("inf")
+            })
+
+        cpu_count = os.cpu_count() or 1
+        workers = max(1, min(workers or cpu_count, len(chunks)))
+        threads = max(1, cpu_count // workers)
+        print(f"Transcribing {len(chunks)} chunks of ~{chunk_seconds}s with {workers} worker processes...")
+
+        results = [None] * len(chunks)
+        try:
+            with WorkerPool(max_workers=workers, initializer=_init_worker,
+                            initargs=(model_size, threads)) as pool, \
+                    on_cancel(cancel, lambda: terminate_workers(pool)):
+                if language is None:
+                    # Detect the language once so every chunk is transcribed consistently
+                    probe_path = os.path.join(tmp_dir, "language_probe.wav")
+                    probe_samples = int(min(duration, LANGUAGE_PROBE_SECONDS) * sample_rate)
+                    write_wav(probe_path, samples[:probe_samples], sample_rate)
+                    _, probe = pool.submit(_transcribe_chunk, -1, probe_path, None).result()
+                    language = probe.get("language")
+                    print(f"Detected language: {language}")
+
+                futures = [
+                    pool.submit(_transcribe_chunk, i, chunk["path"], language)
+                    for i, chunk in enumerate(chunks)
+                ]
+                for done, future in enumerate(as_completed(futures), 1):
+                    index, result = future.result()
+                    results[index] = result
+                    print(f"  Chunk {done}/{len(chunks)} transcribed")
+                    if progress is not None:
+                        progress(done, len(chunks))
+        except Exception:
+            # Terminated workers fail their futures; report that as the cancellation
+            check_cancelled(cancel)
+            raise
+
+        return stitch_results(chunks, results)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,373 @@
+"""
+Fast Video Editor -
+Builds the highlight reel with FFmpeg stream copy instead of decoding every frame through moviepy.
+Each clip is copied from the first keyframe inside its window; only the short head before that
+keyframe is re-encoded (with the source's codec parameters), and all pieces are joined with the
+concat demuxer. Overlapping padded windows are merged so shared footage is cut once, and clips
+are cut by several FFmpeg processes at a time. Extra renditions (lower resolution, bitrate cap,
+top-N teaser) are encoded from a single decode of the reel with a split filter graph.
+Falls back to the moviepy VideoEditor if anything goes wrong.
+"""
+import os
+import math
+import shutil
+import bisect
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import config
+from src.ffmpeg_tools import probe, run_ffmpeg, concat_files
+from src.cancellation import Cancelled
+from src.fusion import highlight_score
+from src.highlight_utils import highlight_span, merge_intervals
+
+# Intermediate pieces are MPEG-TS (Annex B): H.264/HEVC parameter sets travel in-band, so
+# re-encoded heads and stream-copied bodies can be concatenated without re-encoding. The heads'
+# parameter sets differ from the source's, so the reel uses the MP4 sample entries that allow
+# parameter sets to change in-band (avc3 / hev1) instead of a single avcC / hvcC for everything
+SEGMENT_FORMAT = "mpegts"
+SEGMENT_EXTENSION = ".ts"
+ENCODERS = {"h264": "libx264", "hevc": "libx265"}
+ANNEXB_FILTERS = {"h264": "h264_mp4toannexb", "hevc": "hevc_mp4toannexb"}
+SAMPLE_ENTRIES = {"h264": "avc3", "hevc": "hev1"}
+AUDIO_ENCODERS = {"aac": "aac", "mp3": "libmp3lame", "ac3": "ac3", "opus": "libopus"}
+MIN_HEAD_SECONDS = 0.05  # Shorter heads are dropped instead of re-encoded
+
+
+def _timestamp(seconds, round_up=False):
+    """FFmpeg time argument rounded to whole milliseconds in the given direction"""
+    scaled = seconds * 1000
+    # Absorb float noise (e.g. 12.0000000001 after subtracting the start time)
+    scaled = math.ceil(scaled - 1e-6) if round_up else math.floor(scaled + 1e-6)
+    return f"{scaled / 1000:.3f}"
+
+
+class FastVideoEditor:
+    def __init__(self, buffer_seconds=5, workers=None, progress=None, cancel=None):
+        """
+        Initialize the editor
+
+        Args:
+            buffer_seconds: Seconds kept before and after each highlight
+            workers: FFmpeg processes run at once (default config.EDIT_WORKERS, None = CPU count)
+            progress: Optional callable(done, total) called as clips are cut (from this thread)
+            cancel: Optional CancelToken; cancelling kills the running FFmpeg processes
+        """
+        self.buffer_seconds = buffer_seconds
+        self.workers = workers or config.EDIT_WORKERS or os.cpu_count() or 1
+        self.progress = progress
+        self.cancel = cancel
+
+    # ---------- Probing ----------
+
+    @staticmethod
+    def probe_streams(video_path):
+        """
+        Codec parameters of the first video and audio streams
+
+        Returns:
+            (video_stream, audio_stream) dictionaries (audio may be None)
+        """
+        streams = probe(video_path, ["-show_streams"]).get("streams", [])
+        video = next((s for s in streams if s.get("codec_type") == "video"), None)
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+        if video is None:
+            raise RuntimeError("No video stream found")
+        return video, audio
+
+    @staticmethod
+    def probe_keyframes(video_path):
+        """
+        Keyframe timestamps of the video stream (read from packet flags, no decoding)
+
+        Returns:
+            Sorted list of seconds from the start of the file. Packet times are absolute, so the
+            container start time (nonzero in MPEG-TS) is subtracted, as FFmpeg adds it to -ss
+        """
+        info = probe(video_path, [
+            "-select_streams", "v:0", "-show_entries", "packet=pts_time,flags:format=start_time"
+        ])
+        start_time = info.get("format", {}).get("start_time")
+        offset = float(start_time) if start_time not in (None, "N/A") else 0.0
+        times = []
+        for packet in info.get("packets", []):
+            if "K" in packet.get("flags", "") and packet.get("pts_time") not in (None, "N/A"):
+                times.append(float(packet["pts_time"]) - offset)
+        return sorted(times)
+
+    # ---------- Windows ----------
+
+    def highlight_windows(self, highlights, duration=None):
+        """
+        Padded time windows of the highlights, in chronological order; windows that overlap
+        after padding are merged into one clip
+
+        Returns:
+            List of (start, end) in seconds
+        """
+        windows = []
+        for highlight in highlights:
+            start, end = highlight_span(highlight)
+            if start is None:
+                continue
+            start = max(0.0, start - self.buffer_seconds)
+            end = end + self.buffer_seconds
+            if duration:
+                end = min(end, duration)
+            if end > start:
+                windows.append((start, end))
+        return merge_intervals(windows)
+
+    # ---------- Cutting ----------
+
+    @staticmethod
+    def _encode_args(video, audio):
+        encoder = ENCODERS[video["codec_name"]]
+        args = ["-c:v", encoder, "-preset", "veryfast", "-crf", "18"]
+        if video.get("pix_fmt"):
+            args += ["-pix_fmt", video["pix_fmt"]]
+        if video.get("r_frame_rate") and video["r_frame_rate"] != "0/0":
+            args += ["-r", video["r_frame_rate"]]
+        if audio is not None:
+            args += ["-c:a", AUDIO_ENCODERS[audio["codec_name"]], "-ar", str(audio.get("sample_rate", 48000)), "-ac", str(audio.get("channels", 2))]
+        return args
+
+    def cut_clip(self, video_path, start, end, keyframes, tmp_dir, index, video, audio):
+        """
+        Cut one clip into pieces: a re-encoded head up to the first keyframe, then a stream copy
+
+        Returns:
+            List of piece paths
+        """
+        pieces = []
+        streams = ["-map", "0:v:0"] + (["-map", "0:a:0"] if audio is not None else [])
+        i = bisect.bisect_left(keyframes, start)
+        keyframe = keyframes[i] if i < len(keyframes) else None
+
+        if keyframe is None or keyframe >= end:
+            # No keyframe inside the window: re-encode the whole (short) clip
+            keyframe = end
+        if keyframe - start >= MIN_HEAD_SECONDS:
+            # Rounded down so the keyframe itself stays out of the head
+            head_path = os.path.join(tmp_dir, f"clip_{index:04d}_head{SEGMENT_EXTENSION}")
+            run_ffmpeg(
+                ["-ss", f"{start:.3f}", "-i", video_path, "-t", _timestamp(keyframe - start)] + streams
+                + self._encode_args(video, audio) + ["-f", SEGMENT_FORMAT, head_path],
+                "FFmpeg head re-encode",
+                self.cancel
+            )
+            pieces.append(head_path)
+
+        if keyframe < end:
+            # Rounded up: a stream-copy seek snaps back to the keyframe at or before -ss, so a
+            # value just below this keyframe would repeat the whole previous GOP
+            body_path = os.path.join(tmp_dir, f"clip_{index:04d}_body{SEGMENT_EXTENSION}")
+            run_ffmpeg(
+                ["-ss", _timestamp(keyframe, round_up=True), "-i", video_path, "-t", f"{end - keyframe:.3f}"]
+                + streams + ["-c", "copy", "-bsf:v", ANNEXB_FILTERS[video["codec_name"]],
+                             "-avoid_negative_ts", "make_zero", "-f", SEGMENT_FORMAT, body_path],
+                "FFmpeg stream copy",
+                self.cancel
+            )
+            pieces.append(body_path)
+        return pieces
+
+    # ---------- Renditions ----------
+
+    @staticmethod
+    def rendition_path(output_path, spec):
+        """Output path of a rendition: <reel name>_<suffix>.mp4"""
+        base, ext = os.path.splitext(output_path)
+        return f"{base}_{spec['suffix']}{ext or '.mp4'}"
+
+    def rendition_ranges(self, spec, highlights, windows):
+        """
+        Time ranges of the reel kept by a rendition
+
+        Args:
+            spec: Rendition spec (top_n / min_score / max_duration select a teaser)
+            highlights: Highlight list
+            windows: Merged clip windows the reel was cut from
+
+        Returns:
+            List of (start, end) in reel time, or None for the whole reel
+        """
+        top_n, min_score, max_duration = spec.get("top_n"), spec.get("min_score"), spec.get("max_duration")
+        if top_n is None and min_score is None and max_duration is None:
+            return None
+
+        def score(h):
+            # Fused score when the highlight has one; analysis JSON may hold "8" instead of 8
+            return highlight_score(h, default=0, field='final_score' if 'final_score' in h else 'score')
+
+        selected = [h for h in highlights if min_score is None or score(h) >= min_score]
+        # Equal scores: the earlier moment first, whatever order the highlights came in
+        selected = sorted(selected, key=lambda h: (-score(h), highlight_span(h)[0] or 0))[:top_n]
+
+        # Highest scored moments first until the duration budget is spent
+        ranges, total = [], 0.0
+        for highlight in selected:
+            window = self.highlight_windows([highlight])
+            if not window:
+                continue
+            start, end = window[0]
+            if max_duration is not None:
+                end = min(end, start + max_duration - total)
+                if end - start < 1:
+                    continue
+            ranges.append((start, end))
+            total += end - start
+
+        # Map source time to reel time: the reel is the merged windows back to back
+        reel_ranges, offset = [], 0.0
+        for window_start, window_end in windows:
+            for start, end in merge_intervals(ranges):
+                if window_start <= start < window_end:
+                    reel_ranges.append((offset + start - window_start, offset + min(end, window_end) - window_start))
+            offset += window_end - window_start
+        return merge_intervals(reel_ranges)
+
+    def render_renditions(self, reel_path, specs, highlights, windows, has_audio=True):
+        """
+        Encode every rendition from one decode of the reel (split / asplit filter graph)
+
+        Args:
+            reel_path: Full-resolution reel (renditions are named after it)
+            specs: List of rendition specs ({"suffix", "height", "video_bitrate", "top_n", "min_score", "max_duration"})
+            highlights: Highlight list
+            windows: Merged clip windows the reel was cut from
+            has_audio: Whether the reel has an audio track
+
+        Returns:
+            Dictionary suffix -> output path
+        """
+        jobs = []
+        for spec in specs:
+            ranges = self.rendition_ranges(spec, highlights, windows)
+            if ranges == []:
+                print(f"[WARNING] Rendition '{spec['suffix']}' selects no highlights, skipped")
+                continue
+            jobs.append((spec, ranges))
+        if not jobs:
+            return {}
+
+        count = len(jobs)
+        graph = [f"[0:v]split={count}" + "".join(f"[v{i}]" for i in range(count))]
+        if has_audio:
+            graph.append(f"[0:a]asplit={count}" + "".join(f"[a{i}]" for i in range(count)))
+
+        outputs, args = {}, []
+        for i, (spec, ranges) in enumerate(jobs):
+            video_chain, audio_chain = [], []
+            if ranges is not None:
+                condition = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in ranges)
+                video_chain += [f"select='{condition}'", "setpts=N/FRAME_RATE/TB"]
+                audio_chain += [f"aselect='{condition}'", "asetpts=N/SR/TB"]
+            if spec.get("height"):
+                video_chain.append(f"scale=-2:'min({spec['height']},ih)'")
+            graph.append(f"[v{i}]" + (",".join(video_chain) or "null") + f"[vo{i}]")
+            if has_audio:
+                graph.append(f"[a{i}]" + (",".join(audio_chain) or "anull") + f"[ao{i}]")
+
+            path = self.rendition_path(reel_path, spec)
+            args += ["-map", f"[vo{i}]"] + (["-map", f"[ao{i}]"] if has_audio else [])
+            args += ["-c:v", "libx264", "-preset", "veryfast"]
+            if spec.get("video_bitrate"):
+                bitrate = spec["video_bitrate"]
+                args += ["-b:v", bitrate, "-maxrate", bitrate, "-bufsize", bitrate]
+            else:
+                args += ["-crf", "20"]
+            if has_audio:
+                args += ["-c:a", "aac", "-b:a", spec.get("audio_bitrate", "128k")]
+            args += ["-movflags", "+faststart", path]
+            outputs[spec["suffix"]] = path
+
+        print(f"Encoding {count} renditions from one decode: {', '.join(outputs)}")
+        run_ffmpeg(["-i", reel_path, "-filter_complex", ";".join(graph)] + args, "FFmpeg renditions", self.cancel)
+        for path in outputs.values():
+            print(f"Rendition saved: {path}")
+        return outputs
+
+    def create_highlights_video(self, video_path, highlights, output_path, renditions=None):
+        """
+        Generate the highlight reel
+
+        Args:
+            video_path: Source video path
+            highlights: Highlight list
+            output_path: Output video path
+            renditions: Optional list of extra rendition specs (see render_renditions); the paths
+                written are kept in self.rendition_paths
+
+        Returns:
+            Whether the reel was generated
+        """
+        self.rendition_paths = {}
+        try:
+            return self._create(video_path, highlights, output_path, renditions or [])
+        except Cancelled:
+            # Drop partially written outputs
+            for path in [output_path] + [self.rendition_path(output_path, spec) for spec in renditions or []]:
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+        except (RuntimeError, OSError, KeyError, ValueError) as e:
+            print(f"[WARNING] Fast editing failed ({e}), falling back to moviepy")
+            if renditions:
+                print("[WARNING] Renditions are only produced by the FFmpeg editor")
+            from src.video_editor import VideoEditor
+            editor = VideoEditor(buffer_seconds=self.buffer_seconds)
+            return editor.create_highlights_video(video_path, highlights, output_path)
+
+    def _create(self, video_path, highlights, output_path, renditions):
+        video, audio = self.probe_streams(video_path)
+        if video.get("codec_name") not in ENCODERS:
+            raise RuntimeError(f"Unsupported codec for stream copy: {video.get('codec_name')}")
+        if audio is not None and audio.get("codec_name") not in AUDIO_ENCODERS:
+            raise RuntimeError(f"Unsupported audio codec for stream copy: {audio.get('codec_name')}")
+
+        duration = float(video["duration"]) if video.get("duration") not in (None, "N/A") else None
+        windows = self.highlight_windows(highlights, duration)
+        if not windows:
+            print("[WARNING] No highlights with timestamps to cut")
+            return False
+
+        keyframes = self.probe_keyframes(video_path)
+        workers = min(self.workers, len(windows))
+        print(f"Cutting {len(windows)} clips with stream copy ({len(keyframes)} keyframes, {workers} workers)...")
+
+        tmp_dir = tempfile.mkdtemp(prefix="video_summarizer_clips_")
+        try:
+            clip_pieces = [None] * len(windows)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clip") as pool:
+                futures = {
+                    pool.submit(self.cut_clip, video_path, start, end, keyframes, tmp_dir, index, video, audio): index
+                    for index, (start, end) in enumerate(windows)
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    index = futures[future]
+                    clip_pieces[index] = future.result()
+                    start, end = windows[index]
+                    print(f"  Clip {index + 1}/{len(windows)}: {start:.1f}s - {end:.1f}s")
+                    if self.progress is not None:
+                        self.progress(done, len(windows))
+
+            pieces = [piece for clip in clip_pieces for piece in clip]
+
+            extra = ["-tag:v", SAMPLE_ENTRIES[video["codec_name"]]]
+            if audio is not None and audio.get("codec_name") == "aac":
+                extra += ["-bsf:a", "aac_adtstoasc"]
+            concat_files(pieces, output_path, extra, self.cancel)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        print(f"Highlight reel saved: {output_path}")
+        if renditions:
+            try:
+                self.rendition_paths = self.render_renditions(
+                    output_path, renditions, highlights, windows, audio is not None
+                )
+            except RuntimeError as e:
+                # The main reel is done; a failed rendition must not trigger the moviepy fallback
+                print(f"[WARNING] Rendition encoding failed: {e}")
+        return True
@@ -0,0 +1,70 @@
+"""
+faster-whisper Backend -
+VideoTranscriber running on CTranslate2 (config.WHISPER_BACKEND = "faster-whisper"), loaded by
+whisper_backends.create_transcriber only when that backend is selected.
+"""
+from src.transcribe import VideoTranscriber
+
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
+
+class FasterWhisperTranscriber(VideoTranscriber):
+    """VideoTranscriber running on faster-whisper; results have the openai-whisper layout"""
+
+    supports_progress = True  # transcribe() accepts a progress callback
+
+    def __init__(self, model_size="medium", compute_type="int8", device="cpu", cpu_threads=0):
+        """
+        Load the model
+
+        Args:
+            model_size: Whisper model size
+            compute_type: CTranslate2 weight type (int8, int8_float16, float16, float32)
+            device: cpu / cuda / auto
+            cpu_threads: Threads per transcription (0 = CTranslate2 default)
+        """
+        if WhisperModel is None:
+            raise ImportError("faster-whisper is not installed (pip install faster-whisper)")
+        self.model_size = model_size
+        print(f"Loading faster-whisper model: {model_size} ({compute_type}, {device})...")
+        self.model = WhisperModel(model_size, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+
+    def transcribe(self, audio_path, language=None, progress=None):
+        """
+        Transcribe an audio or video file
+
+        Args:
+            audio_path: Audio or video path
+            language: Whisper language code, None = auto-detect
+            progress: Optional callable(done, total) with transcribed / total seconds
+
+        Returns:
+            Whisper-style result dictionary (text, segments, language)
+        """
+        print(f"Transcribing: {audio_path}")
+        segments, info = self.model.transcribe(audio_path, language=language)
+        result_segments = []
+        for segment in segments:
+            result_segments.append({
+                "id": segment.id,
+                "seek": segment.seek,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "tokens": list(segment.tokens),
+                "temperature": segment.temperature,
+                "avg_logprob": segment.avg_logprob,
+                "compression_ratio": segment.compression_ratio,
+                "no_speech_prob": segment.no_speech_prob,
+            })
+            if progress is not None:
+                progress(min(segment.end, info.duration), info.duration)
+        print(f"Transcription complete: {len(result_segments)} segments")
+        return {
+            "text": "".join(s["text"] for s in result_segments),
+            "segments": result_segments,
+            "language": info.language
+        }
@@ -0,0 +1,121 @@
+"""
+FFmpeg Tools -
+Locating and running FFmpeg, and joining clips with the concat demuxer.
+"""
+import os
+import json
+import shutil
+import subprocess
+
+import config
+from src.cancellation import check_cancelled, on_cancel
+
+
+def find_ffmpeg():
+    """
+    Locate the FFmpeg executable (PATH first, then config.FFMPEG_PATH)
+
+    Returns:
+        Executable path or name
+    """
+    if shutil.which("ffmpeg"):
+        return "ffmpeg"
+    if config.FFMPEG_PATH and os.path.exists(config.FFMPEG_PATH):
+        return config.FFMPEG_PATH
+    return "ffmpeg"
+
+
+def find_ffprobe():
+    """
+    Locate the FFprobe executable (PATH first, then next to config.FFMPEG_PATH)
+
+    Returns:
+        Executable path or name
+    """
+    if shutil.which("ffprobe"):
+        return "ffprobe"
+    if config.FFMPEG_PATH:
+        directory, name = os.path.split(config.FFMPEG_PATH)
+        candidate = os.path.join(directory, name.replace("ffmpeg", "ffprobe"))
+        if os.path.exists(candidate):
+            return candidate
+    return "ffprobe"
+
+
+def probe(path, args):
+    """
+    Run FFprobe with JSON output
+
+    Args:
+        path: Media path
+        args: FFprobe arguments (e.g. ["-show_streams"])
+
+    Returns:
+        Parsed JSON dictionary
+    """
+    cmd = [find_ffprobe(), "-v", "error", "-of", "json"] + list(args) + [path]
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        error = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"FFprobe failed: {error}")
+    return json.loads(result.stdout.decode("utf-8") or "{}")
+
+
+def run_ffmpeg(args, description="FFmpeg", cancel=None):
+    """
+    Run FFmpeg and raise on failure
+
+    Args:
+        args: Arguments after the executable
+        description: Used in the error message
+        cancel: Optional CancelToken; cancelling kills the process and raises Cancelled
+
+    Returns:
+        CompletedProcess
+    """
+    cmd = [find_ffmpeg(), "-nostdin", "-y", "-loglevel", "error"] + list(args)
+    check_cancelled(cancel)
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    with on_cancel(cancel, process.kill):
+        stdout, stderr = process.communicate()
+    check_cancelled(cancel)
+    result = subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+    if result.returncode != 0:
+        error = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"{description} failed: {error}")
+    return result
+
+
+def write_concat_list(paths, list_path):
+    """Write an ffconcat list file for the concat demuxer"""
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.write("ffconcat version 1.0\n")
+        for path in paths:
+            escaped = os.path.abspath(path).replace("\\", "/").replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    return list_path
+
+
+def concat_files(paths, output_path, extra_args=None, cancel=None):
+    """
+    Join clips that share codec parameters without re-encoding
+
+    Args:
+        paths: Clip paths in order
+        output_path: Output video path
+        extra_args: Additional output arguments (e.g. bitstream filters)
+        cancel: Optional CancelToken (see run_ffmpeg)
+    """
+    list_path = output_path + ".concat.txt"
+    write_concat_list(paths, list_path)
+    try:
+        run_ffmpeg(
+            ["-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy"] + list(extra_args or [])
+            + ["-movflags", "+faststart", output_path],
+            "FFmpeg concat",
+            cancel
+        )
+    finally:
+        if os.path.exists(list_path):
+            os.remove(list_path)
+    return output_path
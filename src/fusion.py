@@ -0,0 +1,156 @@
+"""
+Audio / Text Fusion -
+Matches AI highlights against audio peaks through an interval index instead of comparing
+every highlight with every peak: peaks are sorted once into an implicit interval tree, and each
+highlight only visits the subtrees that can overlap its (tolerance-widened) span.
+Every fused highlight records the peaks that contributed to its score.
+"""
+import config
+from src.highlight_utils import highlight_span
+
+
+def peak_interval(peak):
+    """
+    Normalize an audio peak to (start, end, time, intensity)
+
+    Accepts ExcitementTrack peak dictionaries ({"time", "start", "end", "intensity"}), other
+    dictionaries with a time plus an intensity / score / amplitude, (time, intensity) pairs and
+    bare times in seconds.
+
+    Returns:
+        Tuple, or None if the peak has no usable time
+    """
+    if isinstance(peak, dict):
+        time = peak.get('time', peak.get('start'))
+        if time is None:
+            return None
+        intensity = peak.get('intensity', peak.get('score', peak.get('amplitude', 1.0)))
+        start = peak.get('start', time)
+        end = peak.get('end', time)
+    elif isinstance(peak, (tuple, list)):
+        if not peak:
+            return None
+        time = peak[0]
+        intensity = peak[1] if len(peak) > 1 else 1.0
+        start = end = time
+    else:
+        time = peak
+        intensity = 1.0
+        start = end = time
+    try:
+        return float(start), float(end), float(time), float(intensity)
+    except (TypeError, ValueError):
+        return None
+
+
+def highlight_score(highlight, default=5, field='score'):
+    """The AI score of a highlight as a number (models sometimes answer "8" or "8.5"; unusable = 0)"""
+    try:
+        score = float(highlight.get(field, default) or 0)
+    except (TypeError, ValueError):
+        return 0
+    return int(score) if score.is_integer() else score
+
+
+class PeakIndex:
+    """
+    Peaks sorted by start time, viewed as an implicit balanced tree: the node of the index range
+    [lo, hi) is its middle index and max_end[node] is the latest end within the range. Overlap
+    queries skip subtrees that start after the query or end before it, so they cost O(log n + k)
+    even when a few peaks are very long.
+    """
+
+    def __init__(self, peaks):
+        """
+        Args:
+            peaks: Iterable of peaks in any format accepted by peak_interval
+        """
+        intervals = sorted(filter(None, (peak_interval(p) for p in peaks)))
+        self.intervals = intervals
+        self.starts = [interval[0] for interval in intervals]
+        self.max_end = [0.0] * len(intervals)
+        self._build(0, len(intervals))
+        top = max((interval[3] for interval in intervals), default=0.0)
+        self.scale = top if top > 1.0 else 1.0
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return float("-inf")
+        mid = (lo + hi) // 2
+        self.max_end[mid] = max(self.intervals[mid][1], self._build(lo, mid), self._build(mid + 1, hi))
+        return self.max_end[mid]
+
+    def _collect(self, lo, hi, start, end, found):
+        if lo >= hi or self.starts[lo] > end:
+            return  # Empty, or every peak in the range starts after the query
+        mid = (lo + hi) // 2
+        if self.max_end[mid] < start:
+            return  # Every peak in the range ends before the query
+        self._collect(lo, mid, start, end, found)
+        if self.starts[mid] <= end and self.intervals[mid][1] >= start:
+            found.append(self.intervals[mid])
+        self._collect(mid + 1, hi, start, end, found)
+
+    def overlapping(self, start, end):
+        """
+        Peaks overlapping [start, end]
+
+        Returns:
+            List of (start, end, time, intensity), sorted by start
+        """
+        found = []
+        self._collect(0, len(self.intervals), start, end, found)
+        return found
+
+
+def fuse_highlights(audio_peaks, highlights, tolerance=None, audio_weight=None):
+    """
+    Combine the AI scores with audio evidence
+
+    Args:
+        audio_peaks: Peak list, or an ExcitementTrack (its curve then supplies the audio score)
+        highlights: Highlight list
+        tolerance: Seconds a peak may lie outside a highlight and still count (default config.AUDIO_MATCH_TOLERANCE)
+        audio_weight: Share of the final score coming from audio, 0-1 (default config.AUDIO_WEIGHT)
+
+    Returns:
+        Highlights with audio_score (0-1), audio_evidence (contributing peaks) and final_score set
+    """
+    tolerance = config.AUDIO_MATCH_TOLERANCE if tolerance is None else tolerance
+    weight = config.AUDIO_WEIGHT if audio_weight is None else audio_weight
+    track = audio_peaks if hasattr(audio_peaks, "range_max") else None
+    index = PeakIndex(track.peaks if track is not None else (audio_peaks or []))
+
+    matched = 0
+    for highlight in highlights:
+        score = highlight_score(highlight)
+        start, end = highlight_span(highlight)
+        if start is None:
+            highlight['audio_score'] = 0.0
+            highlight['audio_evidence'] = []
+            highlight['final_score'] = score
+            continue
+
+        low, high = start - tolerance, end + tolerance
+        evidence = index.overlapping(low, high)
+        if track is not None:
+            audio_score = min(track.range_max(low, high), 1.0)
+        else:
+            audio_score = max((intensity for _, _, _, intensity in evidence), default=0.0) / index.scale
+            audio_score = min(max(audio_score, 0.0), 1.0)
+
+        highlight['audio_score'] = round(audio_score, 3)
+        highlight['audio_evidence'] = [
+            {"time": round(time, 2), "start": round(p_start, 2), "end": round(p_end, 2),
+             "intensity": round(intensity, 3)}
+            for p_start, p_end, time, intensity in evidence
+        ]
+        highlight['final_score'] = round(score * (1 - weight) + audio_score * 10 * weight, 2)
+        if evidence:
+            matched += 1
+
+    print(f"{matched}/{len(highlights)} highlights confirmed by {len(index)} audio peaks")
+    return highlights
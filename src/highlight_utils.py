@@ -0,0 +1,92 @@
+"""
+Highlight Utilities -
+Helpers for reading highlight time ranges and comparing / merging them.
+The AI analyzers return times either as seconds or as "MM:SS" / "HH:MM:SS" strings,
+under start_time/end_time (or start/end, timestamp) keys.
+"""
+
+START_KEYS = ("start_time", "start", "timestamp", "time")
+END_KEYS = ("end_time", "end")
+DEFAULT_DURATION = 10  # Seconds assumed when a highlight only has a start time
+
+
+def parse_time(value):
+    """
+    Convert a time value to seconds
+
+    Args:
+        value: Number of seconds, or "SS", "MM:SS", "HH:MM:SS" string
+
+    Returns:
+        Seconds as float, or None if it cannot be parsed
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        parts = [float(p) for p in str(value).strip().split(":")]
+    except ValueError:
+        return None
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return seconds
+
+
+def highlight_span(highlight):
+    """
+    Time range of a highlight
+
+    Args:
+        highlight: Highlight dictionary
+
+    Returns:
+        (start, end) in seconds, or (None, None) if the highlight has no usable time
+    """
+    start = next((parse_time(highlight[k]) for k in START_KEYS if k in highlight), None)
+    if start is None:
+        return None, None
+    end = next((parse_time(highlight[k]) for k in END_KEYS if k in highlight), None)
+    if end is None or end < start:
+        end = start + DEFAULT_DURATION
+    return start, end
+
+
+def overlap_seconds(a, b):
+    """Length of the overlap between two (start, end) ranges"""
+    return max(0.0, min(a[1], b[1]) - max(a[0], b[0]))
+
+
+def is_duplicate(a, b, min_ratio=0.5):
+    """
+    Whether two highlights describe the same moment (their ranges overlap by at least
+    min_ratio of the shorter range)
+    """
+    span_a, span_b = highlight_span(a), highlight_span(b)
+    if span_a[0] is None or span_b[0] is None:
+        return False
+    shorter = min(span_a[1] - span_a[0], span_b[1] - span_b[0])
+    if shorter <= 0:
+        return span_b[0] <= span_a[0] <= span_b[1] or span_a[0] <= span_b[0] <= span_a[1]
+    return overlap_seconds(span_a, span_b) / shorter >= min_ratio
+
+
+def merge_intervals(intervals, gap=0.0):
+    """
+    Merge overlapping (or nearly touching) time ranges
+
+    Args:
+        intervals: Iterable of (start, end)
+        gap: Ranges separated by at most this many seconds are merged too
+
+    Returns:
+        Sorted list of merged (start, end)
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
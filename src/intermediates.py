@@ -0,0 +1,126 @@
+"""
+Intermediate Results -
+Persists what the expensive stages produced (raw AI highlights, audio peaks / excitement curve)
+next to the outputs, so scores, fusion weights and cut settings can be tuned with rescore.py
+without transcribing or calling the AI model again.
+
+Files written to the output directory:
+    {video_name}_analysis.json   manifest: source video, transcript, raw highlights, audio peaks
+    {video_name}_audio.npz       excitement curve (vectorized audio engine only)
+"""
+import os
+import json
+
+ANALYSIS_VERSION = 1
+
+
+def analysis_path(output_dir, video_name):
+    """Path of the analysis manifest"""
+    return os.path.join(output_dir, f"{video_name}_analysis.json")
+
+
+def save_intermediates(output_dir, video_name, video_path, highlights, audio_peaks=None,
+                       transcript_path=None, settings=None):
+    """
+    Save the stage results a rescore needs
+
+    Args:
+        output_dir: Output directory
+        video_name: Video name (file name without extension)
+        video_path: Source video path
+        highlights: Raw AI highlights (before score filtering)
+        audio_peaks: Peak list or ExcitementTrack (None if audio analysis was skipped)
+        transcript_path: Transcript JSON path
+        settings: Settings used for this run (recorded for reference)
+
+    Returns:
+        Manifest path
+    """
+    audio = None
+    if audio_peaks is not None and hasattr(audio_peaks, "range_max"):
+        import numpy as np
+        curve_path = os.path.join(output_dir, f"{video_name}_audio.npz")
+        np.savez_compressed(
+            curve_path,
+            values=audio_peaks.values,
+            threshold=audio_peaks.threshold,
+            hop_seconds=audio_peaks.hop_seconds,
+            min_level=audio_peaks.min_level
+        )
+        audio = {"format": "track", "path": os.path.basename(curve_path)}
+    elif audio_peaks is not None:
+        audio = {"format": "peaks", "peaks": list(audio_peaks)}
+
+    manifest = {
+        "version": ANALYSIS_VERSION,
+        "video": os.path.abspath(video_path),
+        "transcript": os.path.basename(transcript_path) if transcript_path else None,
+        "settings": settings or {},
+        "highlights": highlights,
+        "audio": audio
+    }
+    path = analysis_path(output_dir, video_name)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, default=_to_json)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _to_json(value):
+    # numpy scalars in peak lists from the librosa analyzer
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def load_intermediates(path, peak_threshold=None):
+    """
+    Load a manifest written by save_intermediates
+
+    Args:
+        path: Manifest path
+        peak_threshold: Re-detect the excitement peaks with this floor (None = as saved); needs
+                        the saved excitement curve of the vectorized audio engine
+
+    Returns:
+        Dictionary with video, transcript, settings, highlights and audio_peaks
+        (an ExcitementTrack, a peak list or None)
+
+    Raises:
+        ValueError: Unsupported version, or peak_threshold for a run without an excitement curve
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != ANALYSIS_VERSION:
+        raise ValueError(f"Unsupported analysis file version: {manifest.get('version')}")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    audio = manifest.get("audio")
+    audio_peaks = None
+    if audio and audio.get("format") == "track":
+        import numpy as np
+        from src.excitement import ExcitementTrack
+        with np.load(os.path.join(directory, audio["path"])) as data:
+            audio_peaks = ExcitementTrack(
+                data["values"], data["threshold"],
+                float(data["hop_seconds"]),
+                float(data["min_level"]) if peak_threshold is None else peak_threshold
+            )
+    elif audio:
+        audio_peaks = audio.get("peaks", [])
+
+    if peak_threshold is not None and not (audio and audio.get("format") == "track"):
+        # A saved peak list (librosa engine) has no curve to re-detect peaks from
+        source = "only a peak list (librosa audio engine)" if audio else "no audio analysis"
+        raise ValueError(f"Peak threshold cannot be changed: {os.path.basename(path)} has {source}; "
+                         f"re-run with AUDIO_ENGINE = \"numpy\" to tune it")
+
+    transcript = manifest.get("transcript")
+    return {
+        "video": manifest.get("video"),
+        "transcript": os.path.join(directory, transcript) if transcript else None,
+        "settings": manifest.get("settings", {}),
+        "highlights": manifest.get("highlights", []),
+        "audio_peaks": audio_peaks
+    }
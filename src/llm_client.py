@@ -0,0 +1,525 @@
+"""
+LLM HTTP Client -
+asyncio HTTP/1.1 client with a persistent keep-alive connection pool per host, request timeouts
+and bounded concurrency, plus request/response adapters for the Claude (/v1/messages),
+GPT (/v1/chat/completions) and Gemini (streamGenerateContent) endpoints in config.AVAILABLE_MODELS.
+
+A single client (and its connections) is shared by the whole process, so batch runs and windowed
+analysis reuse TLS connections instead of reconnecting for every request.
+"""
+import ssl
+import json
+import time
+import queue
+import asyncio
+import threading
+import concurrent.futures
+from urllib.parse import urlsplit
+
+import config
+from src.cancellation import Cancelled, check_cancelled, on_cancel
+
+
+class HTTPError(Exception):
+    """Non-2xx HTTP response"""
+
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+        super().__init__(f"HTTP {status}: {body[:300]}")
+
+
+class HTTPResponse:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8"))
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class AsyncHTTPClient:
+    def __init__(self, max_connections_per_host=8, max_concurrency=8, timeout=300,
+                 connect_timeout=15, idle_timeout=60):
+        """
+        Initialize the client (create it inside the event loop that will use it)
+
+        Args:
+            max_connections_per_host: Kept-alive connections per host
+            max_concurrency: Requests in flight across all hosts
+            timeout: Seconds allowed for a whole request (including reading the response)
+            connect_timeout: Seconds allowed for TCP + TLS setup
+            idle_timeout: Pooled connections idle longer than this are closed instead of reused
+        """
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.idle_timeout = idle_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._idle = {}  # (scheme, host, port) -> [_Connection]
+        self._ssl = ssl.create_default_context()
+        self.connections_opened = 0
+
+    # ---------- Connection pool ----------
+
+    async def _acquire(self, scheme, host, port):
+        idle = self._idle.get((scheme, host, port), [])
+        while idle:
+            conn = idle.pop()
+            if time.monotonic() - conn.last_used < self.idle_timeout and not conn.reader.at_eof():
+                return conn, True
+            conn.close()
+
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                host, port,
+                ssl=self._ssl if scheme == "https" else None,
+                server_hostname=host if scheme == "https" else None
+            ),
+            self.connect_timeout
+        )
+        self.connections_opened += 1
+        return _Connection(reader, writer), False
+
+    def _release(self, key, conn):
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < self.max_connections_per_host:
+            conn.last_used = time.monotonic()
+            idle.append(conn)
+        else:
+            conn.close()
+
+    async def close(self):
+        """Close every pooled connection"""
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+        self._idle.clear()
+
+    # ---------- Requests ----------
+
+    async def request(self, method, url, headers=None, body=None):
+        """
+        Send a request and read the whole response
+
+        Returns:
+            HTTPResponse
+        """
+        chunks = []
+        async with self._semaphore:
+            status, response_headers = await asyncio.wait_for(
+                self._exchange(method, url, headers, body, chunks.append), self.timeout
+            )
+        return HTTPResponse(status, response_headers, b"".join(chunks))
+
+    async def stream(self, method, url, headers=None, body=None):
+        """
+        Send a request and yield the response body as it arrives
+
+        Yields:
+            bytes chunks; raises HTTPError for non-2xx responses before yielding
+        """
+        queue = asyncio.Queue()
+        done = object()
+
+        async def run():
+            try:
+                async with self._semaphore:
+                    await asyncio.wait_for(
+                        self._exchange(method, url, headers, body, queue.put_nowait), self.timeout
+                    )
+                queue.put_nowait(done)
+            except BaseException as e:
+                queue.put_nowait(e)
+
+        task = asyncio.ensure_future(run())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            if not task.done():
+                task.cancel()
+
+    async def _exchange(self, method, url, headers, body, on_data):
+        parts = urlsplit(url)
+        scheme = parts.scheme or "https"
+        host = parts.hostname
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        key = (scheme, host, port)
+
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode("utf-8")
+        body = body or b""
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {parts.netloc}", "Connection: keep-alive",
+                 "Accept-Encoding: identity", f"Content-Length: {len(body)}"]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        raw_request = ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8") + body
+
+        # A pooled connection may have been closed by the server; retry once on a fresh one
+        for attempt in range(2):
+            conn, reused = await self._acquire(scheme, host, port)
+            received = []
+            try:
+                conn.writer.write(raw_request)
+                await conn.writer.drain()
+                status, response_headers = await self._read_head(conn.reader)
+            except (ConnectionError, asyncio.IncompleteReadError, OSError) as e:
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise ConnectionError(f"Connection to {host} failed: {e}") from e
+            except BaseException:
+                conn.close()
+                raise
+            break
+
+        try:
+            if status >= 400:
+                await self._read_body(conn.reader, response_headers, received.append)
+                raise HTTPError(status, b"".join(received).decode("utf-8", errors="replace"))
+            keep_alive = await self._read_body(conn.reader, response_headers, on_data)
+        except BaseException:
+            conn.close()
+            raise
+
+        if keep_alive and response_headers.get("connection", "").lower() != "close":
+            self._release(key, conn)
+        else:
+            conn.close()
+        return status, response_headers
+
+    @staticmethod
+    async def _read_head(reader):
+        status_line = await reader.readuntil(b"\r\n")
+        if not status_line:
+            raise ConnectionError("Empty response")
+        status = int(status_line.split(b" ", 2)[1])
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return status, headers
+
+    @staticmethod
+    async def _read_body(reader, headers, on_data):
+        """Read the response body; returns whether the connection can be reused"""
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                size_line = await reader.readuntil(b"\r\n")
+                size = int(size_line.split(b";")[0].strip(), 16)
+                if size == 0:
+                    # Trailers end with an empty line
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    return True
+                on_data(await reader.readexactly(size))
+                await reader.readexactly(2)
+        if "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining > 0:
+                data = await reader.read(min(remaining, 65536))
+                if not data:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                on_data(data)
+                remaining -= len(data)
+            return True
+        # No length: the body ends when the server closes the connection
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                return False
+            on_data(data)
+
+
+# ---------- Provider adapters ----------
+
+def build_request(model_type, prompt, api_key=None, api_base=None, max_tokens=8192, stream=False):
+    """
+    Build the HTTP request for a model in config.AVAILABLE_MODELS
+
+    Args:
+        model_type: claude / gpt / gemini
+        prompt: User prompt
+        api_key: API key (default config.API_KEY)
+        api_base: Base URL (default config.API_BASE)
+        max_tokens: Maximum output tokens
+        stream: Ask for a streamed (server-sent events) response
+
+    Returns:
+        (url, headers, payload)
+    """
+    model = config.AVAILABLE_MODELS[model_type]
+    api_key = api_key or config.API_KEY
+    api_base = (api_base or config.API_BASE).rstrip("/")
+    if "://" not in api_base:
+        api_base = "https://" + api_base
+    url = api_base + model["api_endpoint"]
+    headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
+
+    if model_type == "claude":
+        headers["x-api-key"] = api_key
+        headers["anthropic-version"] = "2023-06-01"
+        payload = {
+            "model": model["model_id"],
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+        if stream:
+            payload["stream"] = True
+    elif model_type == "gemini":
+        headers["x-goog-api-key"] = api_key
+        payload = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {"maxOutputTokens": max_tokens}
+        }
+        if stream:
+            url += ("&" if "?" in url else "?") + "alt=sse"
+    else:
+        payload = {
+            "model": model["model_id"],
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+        if stream:
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+    return url, headers, payload
+
+
+def parse_response(model_type, data):
+    """
+    Extract the generated text and token usage from a (non-streamed) response body
+
+    Returns:
+        (text, usage) - usage is {"input_tokens": int, "output_tokens": int}
+    """
+    if model_type == "claude":
+        text = "".join(block.get("text", "") for block in data.get("content", []))
+        usage = data.get("usage", {})
+        return text, {"input_tokens": usage.get("input_tokens", 0), "output_tokens": usage.get("output_tokens", 0)}
+
+    if model_type == "gemini":
+        # streamGenerateContent without alt=sse returns a JSON array of partial responses
+        items = data if isinstance(data, list) else [data]
+        text, usage = "", {}
+        for item in items:
+            for candidate in item.get("candidates", [])[:1]:
+                text += "".join(p.get("text", "") for p in candidate.get("content", {}).get("parts", []))
+            usage = item.get("usageMetadata", usage)
+        return text, {"input_tokens": usage.get("promptTokenCount", 0),
+                      "output_tokens": usage.get("candidatesTokenCount", 0)}
+
+    choice = (data.get("choices") or [{}])[0]
+    usage = data.get("usage") or {}
+    return choice.get("message", {}).get("content") or "", {
+        "input_tokens": usage.get("prompt_tokens", 0),
+        "output_tokens": usage.get("completion_tokens", 0)
+    }
+
+
+class StreamDecoder:
+    """Turns a streamed (server-sent events) response body into text deltas and token usage"""
+
+    def __init__(self, model_type):
+        self.model_type = model_type
+        self.usage = {"input_tokens": 0, "output_tokens": 0}
+        self._buffer = b""
+
+    def feed(self, data):
+        """
+        Add received bytes
+
+        Returns:
+            List of text deltas completed by this data
+        """
+        self._buffer += data
+        *lines, self._buffer = self._buffer.split(b"\n")
+        deltas = []
+        for line in lines:
+            line = line.strip()
+            if not line.startswith(b"data:"):
+                continue
+            payload = line[5:].strip()
+            if not payload or payload == b"[DONE]":
+                continue
+            try:
+                event = json.loads(payload.decode("utf-8"))
+            except ValueError:
+                continue
+            delta = self._handle(event)
+            if delta:
+                deltas.append(delta)
+        return deltas
+
+    def _handle(self, event):
+        if self.model_type == "claude":
+            kind = event.get("type")
+            if kind == "content_block_delta":
+                return event.get("delta", {}).get("text", "")
+            if kind == "message_start":
+                usage = event.get("message", {}).get("usage", {})
+                self.usage["input_tokens"] = usage.get("input_tokens", 0)
+            elif kind == "message_delta":
+                self.usage["output_tokens"] = event.get("usage", {}).get("output_tokens", 0)
+            elif kind == "error":
+                raise RuntimeError(f"Stream error: {event.get('error')}")
+            return ""
+
+        if self.model_type == "gemini":
+            usage = event.get("usageMetadata")
+            if usage:
+                self.usage["input_tokens"] = usage.get("promptTokenCount", 0)
+                self.usage["output_tokens"] = usage.get("candidatesTokenCount", 0)
+            for candidate in event.get("candidates", [])[:1]:
+                return "".join(p.get("text", "") for p in candidate.get("content", {}).get("parts", []))
+            return ""
+
+        usage = event.get("usage")
+        if usage:
+            self.usage["input_tokens"] = usage.get("prompt_tokens", 0)
+            self.usage["output_tokens"] = usage.get("completion_tokens", 0)
+        for choice in event.get("choices", [])[:1]:
+            return choice.get("delta", {}).get("content") or ""
+        return ""
+
+
+# ---------- Synchronous facade ----------
+
+class LLMClient:
+    """
+    Thread-safe synchronous front-end: requests run on one background event loop that owns
+    the connection pool, so any worker thread can call complete() and share connections.
+    """
+
+    def __init__(self, **client_options):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-http", daemon=True)
+        self._thread.start()
+        self.http = self._run(self._create(client_options))
+
+    @staticmethod
+    async def _create(options):
+        return AsyncHTTPClient(**options)
+
+    def _run(self, coroutine, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    def complete(self, model_type, prompt, api_key=None, api_base=None, max_tokens=8192, cancel=None):
+        """
+        Send one prompt and wait for the full answer
+
+        Args:
+            cancel: Optional CancelToken; cancelling aborts the request (Cancelled is raised)
+
+        Returns:
+            (text, usage)
+        """
+        url, headers, payload = build_request(model_type, prompt, api_key, api_base, max_tokens)
+        check_cancelled(cancel)
+        future = asyncio.run_coroutine_threadsafe(self.http.request("POST", url, headers, payload), self._loop)
+        with on_cancel(cancel, future.cancel):
+            try:
+                response = future.result()
+            except concurrent.futures.CancelledError:
+                check_cancelled(cancel)
+                raise
+        return parse_response(model_type, response.json())
+
+    def stream(self, model_type, prompt, api_key=None, api_base=None, max_tokens=8192, usage=None,
+               cancel=None):
+        """
+        Send one prompt and yield the answer text as it is generated
+
+        Args:
+            usage: Optional dict, filled with the token usage once the stream ends
+            cancel: Optional CancelToken; cancelling aborts the request (Cancelled is raised)
+
+        Yields:
+            Text deltas
+        """
+        url, headers, payload = build_request(model_type, prompt, api_key, api_base, max_tokens, stream=True)
+        decoder = StreamDecoder(model_type)
+        deltas = queue.Queue()
+        end = object()
+
+        async def pump():
+            try:
+                async for chunk in self.http.stream("POST", url, headers, payload):
+                    for delta in decoder.feed(chunk):
+                        deltas.put(delta)
+                deltas.put(end)
+            except BaseException as e:
+                deltas.put(e)
+
+        def abort():
+            future.cancel()
+            # Wakes the reader even if pump() never started
+            deltas.put(Cancelled())
+
+        check_cancelled(cancel)
+        future = asyncio.run_coroutine_threadsafe(pump(), self._loop)
+        try:
+            with on_cancel(cancel, abort):
+                while True:
+                    item = deltas.get()
+                    if item is end:
+                        break
+                    if isinstance(item, BaseException):
+                        check_cancelled(cancel)
+                        raise item
+                    yield item
+        finally:
+            # Stops the request if the caller stops reading early
+            future.cancel()
+
+        if usage is not None:
+            usage.update(decoder.usage)
+
+    def close(self):
+        """Close pooled connections and stop the event loop"""
+        self._run(self.http.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide LLM client (configured from config.py)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient(
+                max_connections_per_host=config.HTTP_MAX_CONNECTIONS_PER_HOST,
+                max_concurrency=config.LLM_MAX_CONCURRENCY,
+                timeout=config.HTTP_TIMEOUT
+            )
+        return _client
@@ -0,0 +1,353 @@
+"""
+Run Metrics -
+Lightweight per-stage instrumentation: wall time, CPU time (this process and finished child
+processes such as FFmpeg and worker pools), peak resident memory, bytes read / written and
+LLM token usage with estimated cost. Written as {video_name}_metrics.json and, optionally,
+merged into a Prometheus node-exporter textfile for fleet dashboards (the latest run of each
+video, at most config.METRICS_PROMETHEUS_MAX_RUNS videos).
+
+CPU, memory and I/O are measured for the whole process: when a batch or the service runs
+several videos at once, they include the other runs. thread_cpu_seconds (the CPU time of the
+thread running the stage, without its worker threads and processes) is the per-run figure.
+
+psutil is used when installed (memory of child processes, I/O on every platform);
+without it memory and I/O come from /proc on Linux and are omitted elsewhere.
+"""
+import os
+import re
+import sys
+import json
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import config
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+SAMPLE_INTERVAL = 0.2  # Seconds between memory samples while a stage runs
+
+# Prometheus series; the stage CPU / memory / I/O figures carry scope="process" or scope="thread"
+PROMETHEUS_HELP = {
+    "video_summarizer_stage_wall_seconds": "Wall-clock time per pipeline stage",
+    "video_summarizer_stage_thread_cpu_seconds": "CPU time of the thread running the stage",
+    "video_summarizer_stage_cpu_seconds": "CPU time of the whole process (and its finished children) during the stage",
+    "video_summarizer_stage_peak_rss_mb": "Peak resident memory of the whole process during the stage",
+    "video_summarizer_stage_bytes_read": "Bytes read by the whole process during the stage",
+    "video_summarizer_stage_bytes_written": "Bytes written by the whole process during the stage",
+    "video_summarizer_run_wall_seconds": "Wall-clock time of the run",
+    "video_summarizer_run_timestamp_seconds": "Unix time the run finished",
+}
+VIDEO_LABEL = re.compile(r'^[^{]*\{video="((?:[^"\\]|\\.)*)"')
+_prometheus_lock = threading.Lock()
+
+
+def _rss_bytes():
+    """Resident memory of this process plus its children, or None if unknown"""
+    if psutil is not None:
+        try:
+            process = psutil.Process()
+            total = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total
+        except psutil.Error:
+            return None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _io_bytes():
+    """(bytes read, bytes written) by this process, or (None, None) if unknown"""
+    if psutil is not None:
+        try:
+            counters = psutil.Process().io_counters()
+            return counters.read_bytes, counters.write_bytes
+        except (psutil.Error, AttributeError):
+            return None, None
+    try:
+        values = {}
+        with open("/proc/self/io") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                values[key.strip()] = int(value)
+        # rchar / wchar also count page-cache hits, which is what a re-read of a cached video costs
+        return values["rchar"], values["wchar"]
+    except (OSError, ValueError, KeyError):
+        return None, None
+
+
+def _cpu_seconds():
+    """CPU seconds of this process and of its finished (waited-for) children"""
+    total = time.process_time()
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        total += children.ru_utime + children.ru_stime
+    return total
+
+
+class _MemorySampler(threading.Thread):
+    def __init__(self):
+        super().__init__(name="metrics-sampler", daemon=True)
+        self.peak = _rss_bytes()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(SAMPLE_INTERVAL):
+            rss = _rss_bytes()
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        rss = _rss_bytes()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+        return self.peak
+
+
+def llm_cost(model_type, input_tokens, output_tokens):
+    """
+    Estimated cost in USD from config.AVAILABLE_MODELS prices (None if the model has no price)
+    """
+    import config
+    model = config.AVAILABLE_MODELS.get(model_type, {})
+    prices = model.get("price_per_mtok")
+    if not prices:
+        return None
+    return round((input_tokens * prices[0] + output_tokens * prices[1]) / 1e6, 6)
+
+
+class MetricsRecorder:
+    """Collects the metrics of one pipeline run"""
+
+    def __init__(self, video_name, enabled=True):
+        """
+        Args:
+            video_name: Video name (used in file names and Prometheus labels)
+            enabled: False = stage() is a no-op and nothing is written
+        """
+        self.video_name = video_name
+        self.enabled = enabled
+        self.stages = []
+        self.llm = {}
+        self._started = time.time()
+        self._wall = time.perf_counter()
+        self._cpu = _cpu_seconds()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Measure a block of the pipeline
+
+        Yields:
+            The stage record (a dictionary); extra fields may be added to it
+        """
+        record = {"stage": name}
+        if not self.enabled:
+            yield record
+            return
+
+        sampler = _MemorySampler()
+        sampler.start()
+        read_before, written_before = _io_bytes()
+        cpu_before = _cpu_seconds()
+        thread_cpu_before = time.thread_time()
+        wall_before = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["wall_seconds"] = round(time.perf_counter() - wall_before, 3)
+            record["thread_cpu_seconds"] = round(time.thread_time() - thread_cpu_before, 3)
+            record["cpu_seconds"] = round(_cpu_seconds() - cpu_before, 3)
+            peak = sampler.stop()
+            record["peak_rss_mb"] = round(peak / 2 ** 20, 1) if peak is not None else None
+            read_after, written_after = _io_bytes()
+            if read_before is not None and read_after is not None:
+                record["bytes_read"] = read_after - read_before
+                record["bytes_written"] = written_after - written_before
+            self.stages.append(record)
+            print(f"[METRICS] {name}: {record['wall_seconds']:.1f}s wall, {record['cpu_seconds']:.1f}s CPU"
+                  + (f", peak {record['peak_rss_mb']:.0f} MB" if record["peak_rss_mb"] is not None else ""))
+
+    def record_llm(self, analyzer, model_type):
+        """
+        Add the token usage of an analyzer (PooledAnalyzer / WindowedAnalyzer expose .usage)
+
+        Args:
+            analyzer: Analyzer used for the run
+            model_type: claude / gpt / gemini (for the price lookup)
+        """
+        usage = getattr(analyzer, "usage", None)
+        if not self.enabled or not isinstance(usage, dict):
+            return
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        self.llm = {
+            "model": model_type,
+            "requests": usage.get("requests", 0),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost_usd": llm_cost(model_type, input_tokens, output_tokens)
+        }
+
+    def summary(self):
+        """
+        Returns:
+            Dictionary with run totals, per-stage records and LLM usage
+        """
+        peak = None
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux and bytes on macOS
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            peak = maxrss / 2 ** 20 if sys.platform == "darwin" else maxrss / 2 ** 10
+        stage_peaks = [s["peak_rss_mb"] for s in self.stages if s.get("peak_rss_mb") is not None]
+        return {
+            "video": self.video_name,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._started)),
+            "wall_seconds": round(time.perf_counter() - self._wall, 3),
+            "cpu_seconds": round(_cpu_seconds() - self._cpu, 3),
+            "peak_rss_mb": round(max(stage_peaks + ([peak] if peak else [])), 1) if stage_peaks or peak else None,
+            "stages": self.stages,
+            "llm": self.llm
+        }
+
+    def write(self, output_dir, prometheus_path=None):
+        """
+        Write {video_name}_metrics.json (and the Prometheus textfile if a path is given)
+
+        Returns:
+            Metrics JSON path, or None if disabled
+        """
+        if not self.enabled:
+            return None
+        data = self.summary()
+        path = os.path.join(output_dir, f"{self.video_name}_metrics.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        if prometheus_path:
+            write_prometheus(data, prometheus_path)
+        print(f"Metrics saved: {path}")
+        return path
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", " ")
+
+
+def _run_samples(data):
+    """(metric, sample line) pairs of one run; every sample's labels start with the video"""
+    run = f'video="{_label(data["video"])}"'
+    samples = []
+    for stage in data["stages"]:
+        labels = f'{run},stage="{_label(stage["stage"])}"'
+        for key, scope in (("wall_seconds", None), ("thread_cpu_seconds", "thread"), ("cpu_seconds", "process"),
+                           ("peak_rss_mb", "process"), ("bytes_read", "process"), ("bytes_written", "process")):
+            if stage.get(key) is not None:
+                metric = f"video_summarizer_stage_{key}"
+                scope_label = f',scope="{scope}"' if scope else ""
+                samples.append((metric, f"{metric}{{{labels}{scope_label}}} {stage[key]}"))
+
+    samples.append(("video_summarizer_run_wall_seconds",
+                    f"video_summarizer_run_wall_seconds{{{run}}} {data['wall_seconds']}"))
+    samples.append(("video_summarizer_run_timestamp_seconds",
+                    f"video_summarizer_run_timestamp_seconds{{{run}}} {round(time.time(), 3)}"))
+    llm = data.get("llm") or {}
+    if llm:
+        model = _label(llm.get("model"))
+        for key in ("requests", "input_tokens", "output_tokens", "cost_usd"):
+            if llm.get(key) is not None:
+                metric = f"video_summarizer_llm_{key}"
+                samples.append((metric, f'{metric}{{{run},model="{model}"}} {llm[key]}'))
+    return run, samples
+
+
+@contextmanager
+def _file_lock(path):
+    # Threads of this process, and (where fcntl exists) other processes writing the same file
+    with _prometheus_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def write_prometheus(data, path, max_runs=None):
+    """
+    Merge the metrics of a run into a Prometheus textfile (for node_exporter's textfile collector).
+    Series are labelled with the video only: a new run of a video replaces its earlier series, and
+    of the other videos only the max_runs - 1 most recently finished are kept, so the file and the
+    number of series stay bounded on a long-running service. The file is replaced atomically so
+    the collector never reads a partial file.
+
+    Args:
+        data: MetricsRecorder.summary()
+        path: Textfile path
+        max_runs: Videos kept in the file (default config.METRICS_PROMETHEUS_MAX_RUNS)
+    """
+    max_runs = max(1, config.METRICS_PROMETHEUS_MAX_RUNS if max_runs is None else max_runs)
+    _, samples = _run_samples(data)
+    directory = os.path.dirname(os.path.abspath(path))
+    with _file_lock(path):
+        runs = {}  # video label -> [finish time, (metric, line) pairs]
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    match = VIDEO_LABEL.match(line)
+                    if not match or match.group(1) == _label(data["video"]):
+                        continue  # Comments, and the earlier run of this video
+                    metric = line.split("{", 1)[0]
+                    run = runs.setdefault(match.group(1), [0.0, []])
+                    run[1].append((metric, line))
+                    if metric == "video_summarizer_run_timestamp_seconds":
+                        run[0] = float(line.rsplit(" ", 1)[1])
+
+        newest = sorted(runs.values(), key=lambda run: run[0], reverse=True)[:max_runs - 1]
+        kept = [sample for _, run_samples in newest for sample in run_samples]
+        by_metric = {}
+        for metric, line in kept + samples:
+            by_metric.setdefault(metric, []).append(line)
+        lines = []
+        for metric, metric_lines in by_metric.items():
+            if metric in PROMETHEUS_HELP:
+                lines.append(f"# HELP {metric} {PROMETHEUS_HELP[metric]}")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.extend(metric_lines)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".video_summarizer_", suffix=".prom.tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            os.chmod(tmp_path, 0o644)  # mkstemp creates 0600; the collector may run as another user
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,252 @@
+"""
+Whisper Model Pool -
+Process-wide registry of loaded VideoTranscriber instances. Each model size is loaded lazily
+on first use and then shared by later runs (CLI batch jobs, repeated GUI runs), instead of
+paying the model load on every video.
+
+A loaded model is leased to one caller at a time (Whisper decoding is not thread-safe);
+idle models are evicted when the memory budget is exceeded or after an idle timeout.
+"""
+import gc
+import time
+import threading
+from contextlib import contextmanager
+
+import config
+
+# Approximate resident memory of a loaded model on CPU (MB)
+MODEL_MEMORY_MB = {
+    "tiny": 300,
+    "base": 450,
+    "small": 1000,
+    "medium": 2500,
+    "large": 5000,
+}
+DEFAULT_MODEL_MEMORY_MB = 5000
+
+
+class _Replica:
+    def __init__(self, model_size):
+        self.model_size = model_size
+        self.transcriber = None
+        self.in_use = True
+        self.last_used = time.time()
+        self.memory_mb = MODEL_MEMORY_MB.get(model_size.split(".")[0], DEFAULT_MODEL_MEMORY_MB)
+
+
+class ModelPool:
+    def __init__(self, memory_budget_mb=6000, max_replicas=1, idle_seconds=None, loader=None):
+        """
+        Initialize the pool
+
+        Args:
+            memory_budget_mb: Total memory allowed for loaded models (MB)
+            max_replicas: Maximum loaded copies of one model size (concurrent transcriptions)
+            idle_seconds: Unload models that have not been used for this long (None = never)
+            loader: Callable(model_size) -> transcriber, defaults to the config.WHISPER_BACKEND transcriber
+        """
+        self.memory_budget_mb = memory_budget_mb
+        self.max_replicas = max(1, max_replicas)
+        self.idle_seconds = idle_seconds
+        self._loader = loader
+        self._replicas = {}
+        self._cond = threading.Condition()
+        self._reaper = None
+
+    # ---------- Leasing ----------
+
+    def acquire(self, model_size):
+        """
+        Get exclusive use of a loaded model, loading it on first use
+
+        Args:
+            model_size: Whisper model size
+
+        Returns:
+            VideoTranscriber instance (return it with release())
+        """
+        with self._cond:
+            while True:
+                replicas = self._replicas.setdefault(model_size, [])
+                free = [r for r in replicas if not r.in_use and r.transcriber is not None]
+                if free:
+                    replica = max(free, key=lambda r: r.last_used)
+                    replica.in_use = True
+                    return replica.transcriber
+
+                if len(replicas) < self.max_replicas and self._make_room(model_size, required=not replicas):
+                    # Reserve the slot, then load outside the lock
+                    replica = _Replica(model_size)
+                    replicas.append(replica)
+                    break
+
+                self._cond.wait()
+
+        try:
+            print(f"Loading Whisper model '{model_size}' into the model pool...")
+            replica.transcriber = self._load(model_size)
+        except BaseException:
+            with self._cond:
+                self._replicas[model_size].remove(replica)
+                self._cond.notify_all()
+            raise
+
+        self._start_reaper()
+        return replica.transcriber
+
+    def release(self, transcriber):
+        """Return a model obtained from acquire()"""
+        with self._cond:
+            for replicas in self._replicas.values():
+                for replica in replicas:
+                    if replica.transcriber is transcriber:
+                        replica.in_use = False
+                        replica.last_used = time.time()
+            self._cond.notify_all()
+
+    @contextmanager
+    def lease(self, model_size):
+        """
+        Context manager form of acquire()/release()
+
+        Usage:
+            with pool.lease("medium") as transcriber:
+                transcriber.transcribe(path)
+        """
+        transcriber = self.acquire(model_size)
+        try:
+            yield transcriber
+        finally:
+            self.release(transcriber)
+
+    def allow_replicas(self, count):
+        """Raise max_replicas to at least count; callers waiting for a replica may now load one"""
+        with self._cond:
+            if count > self.max_replicas:
+                self.max_replicas = count
+                self._cond.notify_all()
+
+    def preload(self, model_size):
+        """Load a model ahead of time (e.g. at GUI start-up) without keeping it leased"""
+        self.release(self.acquire(model_size))
+
+    # ---------- Eviction ----------
+
+    def evict_idle(self, max_idle_seconds=0):
+        """
+        Unload models that are not in use
+
+        Args:
+            max_idle_seconds: Only unload models idle for at least this long
+
+        Returns:
+            Number of models unloaded
+        """
+        now = time.time()
+        with self._cond:
+            evicted = 0
+            for model_size, replicas in self._replicas.items():
+                for replica in list(replicas):
+                    if self._is_idle(replica) and now - replica.last_used >= max_idle_seconds:
+                        replicas.remove(replica)
+                        evicted += 1
+        if evicted:
+            gc.collect()
+        return evicted
+
+    def loaded_models(self):
+        """Summary of loaded models: {model_size: (loaded, in_use)}"""
+        with self._cond:
+            return {
+                size: (len(replicas), sum(1 for r in replicas if r.in_use))
+                for size, replicas in self._replicas.items() if replicas
+            }
+
+    # ---------- Internal ----------
+
+    def _load(self, model_size):
+        if self._loader is not None:
+            return self._loader(model_size)
+        from src.whisper_backends import create_transcriber
+        return create_transcriber(model_size)
+
+    @staticmethod
+    def _is_idle(replica):
+        return not replica.in_use and replica.transcriber is not None
+
+    def _used_memory_mb(self):
+        return sum(r.memory_mb for replicas in self._replicas.values() for r in replicas)
+
+    def _make_room(self, model_size, required):
+        """
+        Evict idle models (least recently used first) until a new model_size replica fits the budget.
+        Called with the lock held.
+
+        Args:
+            model_size: Model about to be loaded
+            required: The caller cannot make progress otherwise (no replica of this size exists),
+                      so the model is loaded even if the budget cannot be met
+        """
+        needed = MODEL_MEMORY_MB.get(model_size.split(".")[0], DEFAULT_MODEL_MEMORY_MB)
+        idle = sorted(
+            (r for replicas in self._replicas.values() for r in replicas if self._is_idle(r)),
+            key=lambda r: r.last_used
+        )
+        reclaimable = sum(r.memory_mb for r in idle)
+        if not required and self._used_memory_mb() - reclaimable + needed > self.memory_budget_mb:
+            # Evicting would not help; wait for a model of this size to be released instead
+            return False
+
+        while self._used_memory_mb() + needed > self.memory_budget_mb and idle:
+            victim = idle.pop(0)
+            self._replicas[victim.model_size].remove(victim)
+            print(f"Unloading idle Whisper model '{victim.model_size}' (memory budget)")
+
+        if self._used_memory_mb() + needed <= self.memory_budget_mb:
+            return True
+        if required:
+            print(f"[WARNING] Whisper model '{model_size}' exceeds the model pool memory budget")
+            return True
+        return False
+
+    def _start_reaper(self):
+        with self._cond:
+            if not self.idle_seconds or self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap, name="model-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap(self):
+        while True:
+            time.sleep(max(1, self.idle_seconds / 4))
+            self.evict_idle(self.idle_seconds)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(max_replicas=None):
+    """
+    The process-wide model pool (configured from config.py)
+
+    Args:
+        max_replicas: Allow at least this many loaded copies per model size, e.g. one per job the
+                      caller runs at once (the limit is only ever raised, never lowered)
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ModelPool(
+                memory_budget_mb=config.WHISPER_POOL_MEMORY_MB,
+                max_replicas=config.WHISPER_POOL_REPLICAS,
+                idle_seconds=config.WHISPER_POOL_IDLE_SECONDS
+            )
+        if max_replicas is not None:
+            _pool.allow_replicas(max_replicas)
+        return _pool
+
+
+def lease(model_size):
+    """Lease a model from the process-wide pool (see ModelPool.lease)"""
+    return get_pool().lease(model_size)
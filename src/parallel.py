@@ -0,0 +1,138 @@
+"""
+Parallel Stages -
+Runs pipeline stages that do not depend on each other in background worker processes.
+
+Stage dependencies:
+    audio extraction --+--> transcription --> AI analysis --+
+                       +--> audio peak detection -----------+--> fusion --> editing --> summary
+Audio peak detection only needs the audio track, so it runs in a worker process
+while transcription and the AI call happen in the main process.
+"""
+import os
+import signal
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+
+
+def detect_audio_peaks(audio_path, threshold, engine=None):
+    """
+    Audio peak detection task (runs in a worker process)
+
+    Args:
+        audio_path: Audio or video path
+        threshold: Audio peak threshold
+        engine: "librosa" or "numpy" (default config.AUDIO_ENGINE); passed by the parent so a
+                spawned worker uses the engine of the cache key even if config was changed at runtime
+
+    Returns:
+        Audio peaks as returned by AudioAnalyzer.detect_peaks
+    """
+    import config
+    if (engine or config.AUDIO_ENGINE) == "numpy":
+        from src.excitement import ExcitementAnalyzer as AudioAnalyzer
+    else:
+        from src.audio_analyzer import AudioAnalyzer
+    return AudioAnalyzer(threshold=threshold).detect_peaks(audio_path)
+
+
+def _register_worker(pid_queue, initializer, initargs):
+    pid_queue.put(os.getpid())
+    if initializer is not None:
+        initializer(*initargs)
+
+
+class WorkerPool(ProcessPoolExecutor):
+    """
+    ProcessPoolExecutor with spawned (not forked) workers that can be stopped mid-task.
+
+    The pipeline runs in multi-threaded processes (GUI, service and batch threads, the LLM
+    event loop); a forked child inherits locks other threads hold (stdout, logging) and can
+    deadlock on them. Workers report their PIDs so terminate() can stop running tasks.
+    """
+
+    def __init__(self, max_workers=None, initializer=None, initargs=()):
+        context = multiprocessing.get_context("spawn")
+        self._worker_pids = context.SimpleQueue()
+        self._known_pids = set()
+        super().__init__(max_workers=max_workers, mp_context=context, initializer=_register_worker,
+                         initargs=(self._worker_pids, initializer, initargs))
+
+    def terminate(self):
+        """Shut down without waiting, killing tasks that are still running"""
+        self.shutdown(wait=False, cancel_futures=True)
+        while not self._worker_pids.empty():
+            self._known_pids.add(self._worker_pids.get())
+        for pid in self._known_pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass  # Already exited
+
+
+def terminate_workers(executor):
+    """Shut an executor down without waiting; a WorkerPool also kills tasks that are still running"""
+    if isinstance(executor, WorkerPool):
+        executor.terminate()
+    else:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BackgroundStage:
+    """A stage started in a worker process; call result() where the pipeline joins on it"""
+
+    def __init__(self, name, fn, get_args, cache=None, cache_params=None):
+        """
+        Start the stage
+
+        Args:
+            name: Stage name (also the cache stage name)
+            fn: Picklable top-level function
+            get_args: Zero-argument callable returning the argument tuple for fn;
+                      only called when the stage actually has to run
+            cache: Optional ResultCache; a hit skips the worker entirely
+            cache_params: Cache key parameters (see ResultCache.make_key)
+        """
+        self.name = name
+        self._executor = None
+        self._cache = cache if cache is not None and cache.enabled else None
+        self._key = None
+
+        if self._cache is not None:
+            self._key = self._cache.make_key(name, **(cache_params or {}))
+            hit, value = self._cache.get(self._key)
+            if hit:
+                self._cache.hits += 1
+                print(f"[CACHE] Reusing cached result for stage '{name}'")
+                self._future = Future()
+                self._future.set_result(value)
+                self._key = None
+                return
+            self._cache.misses += 1
+
+        self._executor = WorkerPool(max_workers=1)
+        self._future = self._executor.submit(fn, *get_args())
+        print(f"Started stage '{name}' in the background")
+
+    def result(self):
+        """Wait for the stage and return its result"""
+        try:
+            value = self._future.result()
+        finally:
+            self._shutdown(wait=True)
+
+        if self._key is not None and value:
+            self._cache.put(self._key, value)
+            self._key = None
+        return value
+
+    def cancel(self):
+        """Abandon the stage (e.g. when the pipeline ends early); a running worker is terminated"""
+        self._future.cancel()
+        if self._executor is not None:
+            terminate_workers(self._executor)
+            self._executor = None
+
+    def _shutdown(self, wait):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,437 @@
+"""
+Pipeline Engine -
+The five-step flow shared by every front-end (main.py, ui.py, batch.py): speech to text,
+AI analysis, audio peak detection and fusion, highlight reel, text summary.
+
+Front-ends only render events; what runs, how results are cached and which analyzer is used
+is decided here, so the CLI and the GUI cannot drift apart.
+
+Usage as a library:
+    from src.pipeline import Pipeline
+    outputs = Pipeline("game.mp4", "output", on_event=handler).run()
+
+Events are delivered as on_event(kind, data) on the thread running the pipeline:
+    "log"        {"message"}                        Progress message
+    "stage"      {"name", "index", "total", "title"}  A step starts
+    "progress"   {"stage", "done", "total"}          Determinate progress of the running step
+    "highlight"  {"highlight"}                       A highlight arrived from a streaming LLM answer
+    "stage_done" {"name", "record"}                  A step ended (record = its metrics record)
+    "done"       {"outputs"}                         The run finished
+Without on_event, log messages and step headings are printed.
+
+Steps are pluggable: pipeline.steps is a list of (name, title, fn) called as fn(pipeline), in
+order. Insert or replace entries (or override the step methods in a subclass); a step reads and
+writes the run state attributes (full_text, highlights, ...) and may call pipeline.stop(reason).
+"""
+import os
+
+import config
+from src.result_cache import ResultCache
+from src.audio_extract import SharedAudio
+from src.parallel import BackgroundStage, detect_audio_peaks
+from src.chunked_transcribe import transcribe_audio
+from src.windowed_analysis import WindowedAnalyzer
+from src.fusion import fuse_highlights, highlight_score
+from src.intermediates import analysis_path, save_intermediates
+from src.metrics import MetricsRecorder
+from src.cancellation import check_cancelled
+# Whisper (torch), moviepy and the analyzer SDKs are imported by the steps that need them,
+# so importing this module (e.g. for `python main.py --help`) stays fast
+
+MIN_SCORE = 6  # Highlights scoring lower are dropped before fusion
+
+
+def create_analyzer(model_type=None, cancel=None):
+    """
+    Highlight analyzer for the configured API access (config.USE_HTTP_REQUEST / HTTP_CLIENT),
+    wrapped in a WindowedAnalyzer when config.LLM_WINDOWED
+
+    Args:
+        model_type: claude / gpt / gemini for the multi-model analyzers (default config.SELECTED_MODEL)
+        cancel: Optional CancelToken (only the pooled client can abort requests in flight)
+
+    Returns:
+        (analyzer, model id for the cache key, model type for the price lookup)
+    """
+    model_type = model_type or config.SELECTED_MODEL
+    if config.USE_HTTP_REQUEST:
+        # Multi-model analyzer (supports Claude/GPT/Gemini)
+        model_id = config.AVAILABLE_MODELS[model_type]['model_id']
+        api_base = config.API_BASE.replace("https://", "").replace("http://", "")
+        if config.HTTP_CLIENT == "pooled":
+            # Same interface, but requests share keep-alive connections
+            from src.pooled_analyzer import PooledAnalyzer
+            factory = lambda: PooledAnalyzer(api_key=config.API_KEY, model_type=model_type,
+                                             api_base=api_base, cancel=cancel)
+        else:
+            from src.multi_model_analyzer import MultiModelAnalyzer
+            factory = lambda: MultiModelAnalyzer(api_key=config.API_KEY, model_type=model_type, api_base=api_base)
+    else:
+        # The anthropic library (Claude only)
+        from src.claude_analyzer import ClaudeAnalyzer
+        model_id, model_type = config.CLAUDE_MODEL, "claude"
+        factory = lambda: ClaudeAnalyzer(api_key=config.CLAUDE_API_KEY, model=config.CLAUDE_MODEL,
+                                         base_url=config.CLAUDE_API_BASE)
+
+    if config.LLM_WINDOWED:
+        # Long transcripts are split into windows analyzed concurrently
+        analyzer = WindowedAnalyzer(
+            factory,
+            max_tokens=config.LLM_WINDOW_TOKENS,
+            overlap_tokens=config.LLM_WINDOW_OVERLAP_TOKENS,
+            max_concurrency=config.LLM_MAX_CONCURRENCY,
+            max_retries=config.LLM_MAX_RETRIES,
+            cancel=cancel
+        )
+    else:
+        analyzer = factory()
+    return analyzer, model_id, model_type
+
+
+def analyzer_name(model_type=None):
+    """Display name of the model create_analyzer uses"""
+    if not config.USE_HTTP_REQUEST:
+        return f"{config.CLAUDE_MODEL} (anthropic library)"
+    return config.AVAILABLE_MODELS[model_type or config.SELECTED_MODEL]['name']
+
+
+class Pipeline:
+    """One run of the pipeline over one video"""
+
+    def __init__(self, video_path, output_dir="output", use_audio_analysis=True, model_type=None,
+                 use_cache=config.USE_CACHE, cache_dir=config.CACHE_DIR, cache=None,
+                 transcriber=None, min_score=MIN_SCORE, audio_weight=None, audio_tolerance=None,
+                 buffer_seconds=None, on_event=None, cancel=None):
+        """
+        Args:
+            video_path: Input video path
+            output_dir: Output directory
+            use_audio_analysis: Use audio analysis enhancement
+            model_type: claude / gpt / gemini (default config.SELECTED_MODEL)
+            use_cache: Reuse cached stage results from previous runs
+            cache_dir: Cache directory
+            cache: ResultCache to use instead of opening cache_dir (e.g. shared by a long-running service)
+            transcriber: VideoTranscriber to use (None = lease one from the shared model pool)
+            min_score: Minimum AI score of a highlight
+            audio_weight: Share of the final score coming from audio (default config.AUDIO_WEIGHT)
+            audio_tolerance: Audio matching tolerance in seconds (default config.AUDIO_MATCH_TOLERANCE)
+            buffer_seconds: Seconds kept around each highlight (default config.HIGHLIGHT_BUFFER)
+            on_event: Optional callable(kind, data), see the module docstring
+            cancel: Optional CancelToken; the run then ends with Cancelled
+        """
+        self.video_path = video_path
+        self.output_dir = output_dir
+        self.use_audio_analysis = use_audio_analysis
+        self.model_type = model_type or config.SELECTED_MODEL
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self.cache = cache
+        self.transcriber = transcriber
+        self.min_score = min_score
+        self.audio_weight = config.AUDIO_WEIGHT if audio_weight is None else audio_weight
+        self.audio_tolerance = config.AUDIO_MATCH_TOLERANCE if audio_tolerance is None else audio_tolerance
+        self.buffer_seconds = config.HIGHLIGHT_BUFFER if buffer_seconds is None else buffer_seconds
+        self.metrics_enabled = config.METRICS_ENABLED
+        self.on_event = on_event
+        self.cancel = cancel
+        self.video_name = os.path.splitext(os.path.basename(video_path))[0]
+
+        self.steps = [
+            ("transcribe", "Speech to Text", type(self).transcribe),
+            ("analyze", "AI Analysis of Highlights", type(self).analyze),
+            ("audio_peaks", "Audio Peak Detection", type(self).fuse_audio),
+            ("edit", "Generating Highlight Reel", type(self).edit),
+            ("summary", "Generating Text Summary", type(self).summarize),
+        ]
+
+        # Run state, filled in by the steps
+        self.stopped = None
+        self.video_hash = None
+        self.transcript_path = None
+        self.full_text = None
+        self.analyzer = None
+        self.raw_highlights = None
+        self.highlights = []
+        self.audio_peaks = None
+        self.summarizer = None
+        self.outputs = {}
+        self.metrics = None
+        self.audio = None
+        self.audio_stage = None
+
+    def emit(self, kind, **data):
+        """Send an event to on_event (or print it when there is no listener)"""
+        if self.on_event is not None:
+            self.on_event(kind, data)
+        elif kind == "log":
+            print(data["message"])
+        elif kind == "stage":
+            print(f"\n【Step {data['index']}/{data['total']}】{data['title']}")
+
+    def log(self, message):
+        self.emit("log", message=message)
+
+    def progress_callback(self, stage):
+        """progress(done, total) callable reporting on the given step"""
+        return lambda done, total: self.emit("progress", stage=stage, done=done, total=total)
+
+    def stop(self, reason):
+        """End the run after the current step without producing outputs"""
+        self.stopped = reason
+        self.log(f"[WARNING] {reason}")
+
+    def run(self):
+        """
+        Run every step
+
+        Returns:
+            Dictionary of output file paths, or None if nothing was produced
+        """
+        if not self.check_inputs():
+            return None
+        # A job cancelled while it waited in a queue ends before hashing the video or starting workers
+        check_cancelled(self.cancel)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # Stage results are keyed by the video content, so renamed/copied videos also hit the cache
+        if self.cache is None:
+            self.cache = ResultCache(self.cache_dir, max_size_mb=config.CACHE_MAX_SIZE_MB, enabled=self.use_cache)
+        self.video_hash = self.cache.file_hash(self.video_path) if self.cache.enabled else None
+        self.metrics = MetricsRecorder(self.video_name, enabled=self.metrics_enabled)
+
+        # The audio track is decoded once (only if a stage actually has to run) and shared
+        self.audio = SharedAudio(self.video_path, enabled=config.SHARED_AUDIO, cancel=self.cancel)
+        try:
+            self.start_background_stages()
+            for index, (name, title, step) in enumerate(self.steps, 1):
+                check_cancelled(self.cancel)
+                self.emit("stage", name=name, index=index, total=len(self.steps), title=title)
+                with self.metrics.stage(name) as record:
+                    step(self)
+                self.emit("stage_done", name=name, record=record)
+                if self.stopped:
+                    self.metrics.write(self.output_dir, config.METRICS_PROMETHEUS_FILE)
+                    return None
+
+            self.outputs["metrics"] = self.metrics.write(self.output_dir, config.METRICS_PROMETHEUS_FILE)
+            self.outputs["highlight_count"] = len(self.highlights)
+            self.emit("done", outputs=self.outputs)
+            return self.outputs
+        finally:
+            # Also reached on errors and cancellation: stop the audio worker and delete the temp track
+            if self.audio_stage is not None:
+                self.audio_stage.cancel()
+            self.audio.cleanup()
+
+    def check_inputs(self):
+        """Whether the run can start (logs the reason when it cannot)"""
+        if not os.path.exists(self.video_path):
+            self.log(f"[ERROR] Video file does not exist: {self.video_path}")
+            return False
+        return True
+
+    def audio_cache_params(self):
+        # Every setting the peaks depend on, so changing one never reuses stale peaks
+        return dict(
+            video=self.video_hash,
+            threshold=config.AUDIO_PEAK_THRESHOLD,
+            engine=config.AUDIO_ENGINE,
+            shared_audio=config.SHARED_AUDIO,
+            threshold_window=config.AUDIO_THRESHOLD_WINDOW,
+            threshold_percentile=config.AUDIO_THRESHOLD_PERCENTILE,
+            streaming=config.AUDIO_STREAMING,
+            block_seconds=config.AUDIO_BLOCK_SECONDS
+        )
+
+    def transcribe_cache_params(self):
+        # Every setting the transcript depends on; settings of a mode that is off are left out
+        from src.whisper_backends import first_pass_model
+
+        return dict(
+            video=self.video_hash,
+            model=config.WHISPER_MODEL,
+            backend=config.WHISPER_BACKEND,
+            compute_type=config.WHISPER_COMPUTE_TYPE if config.WHISPER_BACKEND == "faster-whisper" else None,
+            first_pass=first_pass_model(),
+            language=config.WHISPER_LANGUAGE,
+            chunked=config.WHISPER_CHUNKED,
+            chunk_seconds=config.WHISPER_CHUNK_SECONDS if config.WHISPER_CHUNKED else None,
+            chunk_overlap=config.WHISPER_CHUNK_OVERLAP if config.WHISPER_CHUNKED else None,
+            adaptive=(config.WHISPER_ADAPTIVE_LOGPROB, config.WHISPER_ADAPTIVE_NO_SPEECH,
+                      config.WHISPER_ADAPTIVE_MAX_FRACTION) if config.WHISPER_ADAPTIVE else None
+        )
+
+    def analyze_cache_params(self, model_id):
+        # Every setting the highlights depend on: the analyzer kind (each has its own prompt and
+        # parser), the windowing and whether the answer was streamed
+        return dict(
+            model=model_id,
+            client=config.HTTP_CLIENT if config.USE_HTTP_REQUEST else "anthropic",
+            transcript=self.cache.text_hash(self.full_text),
+            window_tokens=config.LLM_WINDOW_TOKENS if config.LLM_WINDOWED else None,
+            window_overlap=config.LLM_WINDOW_OVERLAP_TOKENS if config.LLM_WINDOWED else None,
+            streaming=config.LLM_STREAMING
+        )
+
+    def start_background_stages(self):
+        """Audio peak detection only depends on the audio track: start it now, join at step 3"""
+        if self.use_audio_analysis and config.PARALLEL_AUDIO_ANALYSIS:
+            self.audio_stage = BackgroundStage(
+                "audio_peaks",
+                detect_audio_peaks,
+                lambda: (self.audio.path, config.AUDIO_PEAK_THRESHOLD, config.AUDIO_ENGINE),
+                cache=self.cache,
+                cache_params=self.audio_cache_params()
+            )
+
+    def transcribe(self):
+        """Step 1: speech to text"""
+        from src.whisper_backends import transcript_formatter
+
+        if config.WHISPER_ADAPTIVE:
+            self.log(f"Using model: {config.WHISPER_FAST_MODEL}, low-confidence parts with {config.WHISPER_MODEL}")
+        else:
+            self.log(f"Using model: {config.WHISPER_MODEL}")
+
+        # Only a cache miss reaches transcribe_audio, which leases the model from the pool when
+        # this process transcribes (it stays loaded, so later videos skip the load); chunked
+        # mode loads it in its worker processes instead
+        result = self.cache.cached(
+            "transcribe",
+            lambda: transcribe_audio(self.transcriber, self.audio.path, language=config.WHISPER_LANGUAGE,
+                                     progress=self.progress_callback("transcribe"), cancel=self.cancel),
+            **self.transcribe_cache_params()
+        )
+        formatter = self.transcriber if self.transcriber is not None else transcript_formatter()
+        formatted_transcript = formatter.format_transcript(result)
+
+        self.transcript_path = os.path.join(self.output_dir, f"{self.video_name}_transcript.json")
+        formatter.save_transcript(formatted_transcript, self.transcript_path)
+
+        # The complete text for AI analysis
+        self.full_text = formatter.get_full_text(formatted_transcript)
+        self.outputs["transcript"] = self.transcript_path
+        self.log(f"Transcription completed, {len(formatted_transcript)} segments")
+
+    def analyze(self):
+        """Step 2: AI analysis of highlights"""
+        self.log(f"Using model: {analyzer_name(self.model_type)}")
+        self.analyzer, model_id, price_model = create_analyzer(self.model_type, cancel=self.cancel)
+        highlights = self.cache.cached(
+            "analyze",
+            lambda: self.find_highlights(self.analyzer),
+            **self.analyze_cache_params(model_id)
+        )
+        self.metrics.record_llm(self.analyzer, price_model)
+
+        if not highlights:
+            self.stop("No exciting moments were detected")
+            return
+
+        # Keep the raw highlights for rescore.py, then filter low-scoring moments
+        self.raw_highlights = [dict(h) for h in highlights]
+        self.highlights = self.filter_highlights(highlights)
+        self.log(f"Detected {len(self.highlights)} highlights")
+        if not self.highlights:
+            # Still saved, so rescore.py can lower the minimum score without a new AI call
+            self.save_analysis()
+            self.stop(f"No highlight scored >= {self.min_score}")
+
+    def find_highlights(self, analyzer):
+        """analyzer.analyze_highlights, emitting "highlight" events while a streamed answer arrives"""
+        if not (config.LLM_STREAMING and hasattr(analyzer, "iter_highlights")):
+            return analyzer.analyze_highlights(self.full_text)
+        highlights = []
+        for highlight in analyzer.iter_highlights(self.full_text):
+            highlights.append(highlight)
+            self.emit("highlight", highlight=highlight)
+        return highlights
+
+    def filter_highlights(self, highlights):
+        """Drop the highlights scoring below min_score"""
+        if self.analyzer is not None:
+            return self.analyzer.filter_by_score(highlights, min_score=self.min_score)
+        return [h for h in highlights if highlight_score(h) >= self.min_score]
+
+    def fuse_audio(self):
+        """Step 3: audio peak detection and fusion with the AI scores (optional)"""
+        self.audio_peaks = self.load_audio_peaks() if self.use_audio_analysis else None
+        if self.audio_peaks is not None:
+            # Fusion of audio and text analysis results
+            self.highlights = self.fuse(self.audio_peaks, self.highlights)
+            self.log("Audio analysis completed")
+        else:
+            self.log("Audio analysis skipped")
+            for h in self.highlights:
+                h['final_score'] = highlight_score(h)
+        self.audio.cleanup()
+        self.save_analysis()
+
+        # Sort by final score
+        self.highlights = sorted(self.highlights, key=lambda x: x.get('final_score', 0), reverse=True)
+
+    def fuse(self, audio_peaks, highlights):
+        """
+        Fuse audio peaks into the highlight scores the way their engine does it: an excitement
+        curve (AUDIO_ENGINE = "numpy") through fusion.fuse_highlights with audio_weight and
+        audio_tolerance, a peak list (the default librosa engine) through
+        AudioAnalyzer.compare_with_transcript as before the numpy engine existed
+        """
+        if hasattr(audio_peaks, "range_max"):
+            return fuse_highlights(audio_peaks, highlights, self.audio_tolerance, self.audio_weight)
+        from src.audio_analyzer import AudioAnalyzer
+        return AudioAnalyzer(threshold=config.AUDIO_PEAK_THRESHOLD).compare_with_transcript(audio_peaks, highlights)
+
+    def load_audio_peaks(self):
+        """Excitement peaks of the audio track (joins the background stage when one is running)"""
+        if self.audio_stage is not None:
+            return self.audio_stage.result()
+        return self.cache.cached(
+            "audio_peaks",
+            lambda: detect_audio_peaks(self.audio.path, config.AUDIO_PEAK_THRESHOLD, config.AUDIO_ENGINE),
+            **self.audio_cache_params()
+        )
+
+    def save_analysis(self):
+        """Persist the stage results so scores and cuts can be re-tuned with rescore.py"""
+        save_intermediates(
+            self.output_dir, self.video_name, self.video_path, self.raw_highlights,
+            audio_peaks=self.audio_peaks,
+            transcript_path=self.transcript_path,
+            settings={"min_score": self.min_score, "audio_weight": self.audio_weight,
+                      "audio_tolerance": self.audio_tolerance, "buffer": self.buffer_seconds}
+        )
+        self.outputs["analysis"] = analysis_path(self.output_dir, self.video_name)
+
+    def edit(self):
+        """Step 4: cut the highlight reel"""
+        highlight_video_path = os.path.join(self.output_dir, f"{self.video_name}_highlights.mp4")
+        if config.FAST_EDIT:
+            from src.fast_editor import FastVideoEditor
+            editor = FastVideoEditor(buffer_seconds=self.buffer_seconds,
+                                     progress=self.progress_callback("edit"), cancel=self.cancel)
+            success = editor.create_highlights_video(self.video_path, self.highlights, highlight_video_path,
+                                                     config.RENDITIONS)
+        else:
+            from src.video_editor import VideoEditor
+            editor = VideoEditor(buffer_seconds=self.buffer_seconds)
+            success = editor.create_highlights_video(self.video_path, self.highlights, highlight_video_path)
+
+        self.outputs["highlights_video"] = highlight_video_path if success else None
+        self.outputs["renditions"] = getattr(editor, "rendition_paths", {})
+        if success:
+            self.log(f"Highlight reel generated: {highlight_video_path}")
+            for path in self.outputs["renditions"].values():
+                self.log(f"Rendition generated: {path}")
+        else:
+            self.log("[WARNING] Video editing failed")
+
+    def summarize(self):
+        """Step 5: text summary"""
+        from src.summarizer import TextSummarizer
+
+        self.summarizer = TextSummarizer()
+        summary_path = os.path.join(self.output_dir, f"{self.video_name}_summary.txt")
+        self.summarizer.generate_summary(self.highlights, summary_path)
+        self.outputs["summary"] = summary_path
+        self.log(f"Text summary generated: {summary_path}")
@@ -0,0 +1,209 @@
+"""
+Pooled Analyzer -
+Highlight analyzer with the MultiModelAnalyzer interface that sends its requests through the
+shared keep-alive LLM client (src/llm_client.py) instead of opening a new connection per call.
+Supports every model in config.AVAILABLE_MODELS (Claude / GPT / Gemini).
+"""
+import json
+import threading
+
+import config
+from src.llm_client import get_client
+
+HIGHLIGHT_PROMPT = """You are a professional sports commentator and video editor.
+Below is the timestamped commentary transcript of a sports video. Identify the exciting moments
+(goals, scores, great saves, fouls, turning points, celebrations...) that belong in a highlight reel.
+
+Return ONLY a JSON array, no other text. Each element:
+{{
+  "start_time": "<start of the moment, same format as the transcript timestamps>",
+  "end_time": "<end of the moment, same format as the transcript timestamps>",
+  "type": "<goal / save / foul / celebration / other>",
+  "description": "<one sentence describing what happened>",
+  "score": <excitement score from 1 to 10>
+}}
+
+Transcript:
+{transcript}
+"""
+
+
+class HighlightStreamParser:
+    """
+    Incremental parser for a streamed JSON array: returns each top-level object as soon as
+    its closing brace arrives, without waiting for the rest of the answer.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._object_start = None
+        self._array_started = False
+
+    def feed(self, delta):
+        """
+        Add streamed text
+
+        Returns:
+            List of objects completed by this text
+        """
+        self._text += delta
+        completed = []
+        text = self._text
+        while self._pos < len(text):
+            ch = text[self._pos]
+            if not self._array_started:
+                self._array_started = ch == "["
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._object_start = self._pos
+                self._depth += 1
+            elif ch == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        item = json.loads(text[self._object_start:self._pos + 1])
+                        if isinstance(item, dict):
+                            completed.append(item)
+                    except ValueError:
+                        pass
+                    self._object_start = None
+            self._pos += 1
+
+        # Only keep the unfinished object in memory
+        keep_from = self._object_start if self._object_start is not None else self._pos
+        self._text = text[keep_from:]
+        self._pos -= keep_from
+        if self._object_start is not None:
+            self._object_start = 0
+        return completed
+
+
+def extract_json_array(text):
+    """
+    Parse the JSON array in a model answer (tolerates markdown code fences and surrounding prose)
+
+    Returns:
+        List (empty if no array could be parsed)
+    """
+    start = text.find("[")
+    end = text.rfind("]")
+    if start == -1 or end <= start:
+        return []
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return []
+    return [item for item in data if isinstance(item, dict)] if isinstance(data, list) else []
+
+
+class PooledAnalyzer:
+    def __init__(self, api_key=None, model_type=config.SELECTED_MODEL, api_base=None, cancel=None):
+        """
+        Initialize the analyzer
+
+        Args:
+            api_key: API key (default config.API_KEY)
+            model_type: claude / gpt / gemini
+            api_base: API host or base URL (default config.API_BASE)
+            cancel: Optional CancelToken that aborts in-flight requests
+        """
+        if model_type not in config.AVAILABLE_MODELS:
+            raise ValueError(f"Unsupported model type: {model_type}")
+        self.api_key = api_key or config.API_KEY
+        self.model_type = model_type
+        self.api_base = api_base or config.API_BASE
+        self.model_name = config.AVAILABLE_MODELS[model_type]['name']
+        self.client = get_client()
+        self.cancel = cancel
+        self.usage = {"requests": 0, "input_tokens": 0, "output_tokens": 0}
+        self._usage_lock = threading.Lock()
+
+    def _record_usage(self, usage):
+        with self._usage_lock:
+            self.usage["requests"] += 1
+            self.usage["input_tokens"] += usage.get("input_tokens", 0)
+            self.usage["output_tokens"] += usage.get("output_tokens", 0)
+
+    @staticmethod
+    def _normalize(highlight):
+        try:
+            score = float(highlight.get('score', 0))
+            highlight['score'] = int(score) if score.is_integer() else score
+        except (TypeError, ValueError):
+            highlight['score'] = 0
+        return highlight
+
+    def iter_highlights(self, full_text):
+        """
+        Stream the model answer and yield each highlight as soon as it is complete
+
+        Args:
+            full_text: Timestamped transcript
+
+        Yields:
+            Highlight dictionaries
+        """
+        print(f"Analyzing highlights with {self.model_name} (streaming)...")
+        prompt = HIGHLIGHT_PROMPT.format(transcript=full_text)
+        parser = HighlightStreamParser()
+        usage = {}
+        count = 0
+        for delta in self.client.stream(self.model_type, prompt, self.api_key, self.api_base, usage=usage,
+                                        cancel=self.cancel):
+            for highlight in parser.feed(delta):
+                count += 1
+                yield self._normalize(highlight)
+        self._record_usage(usage)
+        print(f"Found {count} highlights")
+
+    def analyze_highlights(self, full_text):
+        """
+        Ask the model for the highlights of a transcript
+
+        Args:
+            full_text: Timestamped transcript
+
+        Returns:
+            List of highlight dictionaries
+        """
+        if config.LLM_STREAMING:
+            return list(self.iter_highlights(full_text))
+
+        print(f"Analyzing highlights with {self.model_name}...")
+        prompt = HIGHLIGHT_PROMPT.format(transcript=full_text)
+        text, usage = self.client.complete(self.model_type, prompt, self.api_key, self.api_base, cancel=self.cancel)
+        self._record_usage(usage)
+
+        highlights = [self._normalize(h) for h in extract_json_array(text)]
+        if not highlights and text.strip():
+            print("[WARNING] The model answer did not contain a JSON highlight list")
+        print(f"Found {len(highlights)} highlights")
+        return highlights
+
+    def filter_by_score(self, highlights, min_score=6):
+        """
+        Keep highlights scoring at least min_score
+
+        Args:
+            highlights: Highlight list
+            min_score: Minimum score
+
+        Returns:
+            Filtered list
+        """
+        filtered = [h for h in highlights if (h.get('score') or 0) >= min_score]
+        print(f"{len(filtered)}/{len(highlights)} highlights scored >= {min_score}")
+        return filtered
@@ -0,0 +1,246 @@
+"""
+Result Cache -
+Content-addressed on-disk cache for pipeline stage results (transcription, AI analysis, audio peaks).
+Entries are keyed by the video content hash plus the stage configuration and evicted in LRU order
+once the cache grows beyond its size limit.
+"""
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+import threading
+
+HASH_MEMO_MAX_ENTRIES = 1000  # File hashes remembered; stale and oldest entries are dropped beyond that
+
+class ResultCache:
+    def __init__(self, cache_dir=".cache", max_size_mb=2048, enabled=True):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Cache directory
+            max_size_mb: Maximum total size of cached entries (MB); oldest-used entries are evicted first
+            enabled: When False every lookup misses and nothing is written
+        """
+        self.cache_dir = cache_dir
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.enabled:
+            os.makedirs(os.path.join(self.cache_dir, "entries"), exist_ok=True)
+
+    # ---------- Keys ----------
+
+    def file_hash(self, path):
+        """
+        SHA-256 of a file's content.
+        The digest is remembered per (path, size, mtime) so unchanged videos are only hashed once.
+
+        Args:
+            path: File path
+
+        Returns:
+            Hex digest string
+        """
+        stat = os.stat(path)
+        memo_key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        memo = self._load_hash_memo() if self.enabled else {}
+        if memo_key in memo:
+            return memo[memo_key]
+
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(4 * 1024 * 1024), b""):
+                sha.update(block)
+        digest = sha.hexdigest()
+
+        if self.enabled:
+            with self._lock:
+                memo = self._load_hash_memo()
+                memo[memo_key] = digest
+                self._save_hash_memo(self._prune_hash_memo(memo))
+        return digest
+
+    @staticmethod
+    def text_hash(text):
+        """SHA-256 of a string (e.g. the transcript sent to the AI model)"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(stage, **params):
+        """
+        Build the cache key of a stage result
+
+        Args:
+            stage: Stage name, e.g. "transcribe"
+            **params: Everything the stage result depends on (input hashes and stage config)
+
+        Returns:
+            Hex key string
+        """
+        payload = json.dumps({"stage": stage, "params": params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ---------- Lookup ----------
+
+    def get(self, key):
+        """
+        Read a cached result
+
+        Returns:
+            (hit, value)
+        """
+        if not self.enabled:
+            return False, None
+
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+
+        # Touch the entry so LRU eviction keeps recently used results
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return True, value
+
+    def put(self, key, value):
+        """Store a result and evict old entries if the cache is over its size limit"""
+        if not self.enabled:
+            return
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._atomic_write(self._entry_path(key), data)
+            self._evict()
+
+    def cached(self, stage, compute, **params):
+        """
+        Return the cached result of a stage, computing and storing it on a miss
+
+        Args:
+            stage: Stage name
+            compute: Zero-argument callable producing the result
+            **params: Key parameters (see make_key)
+
+        Returns:
+            Stage result
+        """
+        if not self.enabled:
+            return compute()
+
+        key = self.make_key(stage, **params)
+        hit, value = self.get(key)
+        if hit:
+            self.hits += 1
+            print(f"[CACHE] Reusing cached result for stage '{stage}'")
+            return value
+
+        self.misses += 1
+        value = compute()
+        # Empty results are usually failures (e.g. API error); don't pin them in the cache
+        if value:
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Delete every cached entry"""
+        if not self.enabled:
+            return
+        with self._lock:
+            for name, _, _ in self._entries():
+                try:
+                    os.remove(name)
+                except OSError:
+                    pass
+            try:
+                os.remove(self._hash_memo_path())
+            except OSError:
+                pass
+
+    # ---------- Internal ----------
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, "entries", f"{key}.pkl")
+
+    def _hash_memo_path(self):
+        return os.path.join(self.cache_dir, "file_hashes.json")
+
+    def _load_hash_memo(self):
+        try:
+            with open(self._hash_memo_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_hash_memo(self, memo):
+        self._atomic_write(self._hash_memo_path(), json.dumps(memo).encode("utf-8"))
+
+    @staticmethod
+    def _prune_hash_memo(memo):
+        """Drop hashes of files that were deleted or changed, then keep the newest HASH_MEMO_MAX_ENTRIES"""
+        kept = {}
+        for memo_key, digest in memo.items():
+            try:
+                path, size, mtime_ns = memo_key.rsplit("|", 2)
+                stat = os.stat(path)
+            except (ValueError, OSError):
+                continue
+            if str(stat.st_size) == size and str(stat.st_mtime_ns) == mtime_ns:
+                kept[memo_key] = digest
+        return dict(list(kept.items())[-HASH_MEMO_MAX_ENTRIES:])
+
+    def _entries(self):
+        entries_dir = os.path.join(self.cache_dir, "entries")
+        result = []
+        for name in os.listdir(entries_dir):
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(entries_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            result.append((path, stat.st_size, stat.st_mtime))
+        return result
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_size:
+            return
+
+        # Least recently used first
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+        # Evicting is also when the cache shrinks, so forget hashes of videos that are gone
+        memo = self._load_hash_memo()
+        pruned = self._prune_hash_memo(memo)
+        if len(pruned) != len(memo):
+            self._save_hash_memo(pruned)
+
+    @staticmethod
+    def _atomic_write(path, data):
+        directory = os.path.dirname(path)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
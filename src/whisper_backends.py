@@ -0,0 +1,204 @@
+"""
+Whisper Backends -
+Pluggable inference backends behind the VideoTranscriber interface, and the adaptive mode:
+transcribe with a fast model first, then re-transcribe only the low-confidence segments
+(low average log-probability, likely no speech, repetitive text) with the configured model.
+
+Backends (config.WHISPER_BACKEND):
+    "openai"          openai-whisper (PyTorch), the original VideoTranscriber
+    "faster-whisper"  CTranslate2 with int8 quantized weights, several times faster on CPU
+                      (src/faster_whisper_backend.py)
+"""
+import os
+import wave
+import shutil
+import tempfile
+
+import config
+from src.audio_extract import SAMPLE_RATE, extract_audio, load_pcm, write_wav
+from src.chunked_transcribe import shift_segment
+# openai-whisper (torch) and faster-whisper are imported when a model is loaded, so the
+# helpers below (e.g. first_pass_model for cache keys) stay cheap to import
+
+BACKENDS = ("openai", "faster-whisper")
+COMPRESSION_RATIO_LIMIT = 2.4  # Whisper's own threshold for repetitive (hallucinated) text
+ADAPTIVE_MERGE_GAP = 2.0  # Low-confidence segments closer than this are re-transcribed together
+ADAPTIVE_CONTEXT = 1.0  # Audio kept around each re-transcribed span (seconds)
+
+
+def create_transcriber(model_size, backend=None, threads=0):
+    """
+    Load a transcriber for the configured backend
+
+    Args:
+        model_size: Whisper model size
+        backend: One of BACKENDS (default config.WHISPER_BACKEND)
+        threads: CPU threads for faster-whisper (0 = default; openai-whisper uses torch's setting)
+
+    Returns:
+        VideoTranscriber (or subclass) instance
+    """
+    from src.transcribe import VideoTranscriber
+
+    backend = backend or config.WHISPER_BACKEND
+    if backend == "faster-whisper":
+        try:
+            from src.faster_whisper_backend import FasterWhisperTranscriber
+            return FasterWhisperTranscriber(model_size, compute_type=config.WHISPER_COMPUTE_TYPE, cpu_threads=threads)
+        except ImportError as e:
+            print(f"[WARNING] {e}, falling back to openai-whisper")
+    elif backend != "openai":
+        raise ValueError(f"Unknown Whisper backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    return VideoTranscriber(model_size=model_size)
+
+
+def transcribe_with_progress(transcriber, audio_path, language=None, progress=None):
+    """
+    transcriber.transcribe, reporting progress(done, total) in seconds of audio when the
+    backend supports it (openai-whisper does not; callers then show indeterminate progress)
+    """
+    if progress is not None and getattr(transcriber, "supports_progress", False):
+        return transcriber.transcribe(audio_path, language=language, progress=progress)
+    return transcriber.transcribe(audio_path, language=language)
+
+
+def transcript_formatter():
+    """
+    VideoTranscriber without a loaded model for format_transcript / save_transcript /
+    get_full_text, which only reshape a result (so a cached transcript needs no model load)
+    """
+    from src.transcribe import VideoTranscriber
+
+    return VideoTranscriber.__new__(VideoTranscriber)
+
+
+def first_pass_model():
+    """Model size that transcribes the whole video (the fast model in adaptive mode)"""
+    return config.WHISPER_FAST_MODEL if config.WHISPER_ADAPTIVE else config.WHISPER_MODEL
+
+
+def is_low_confidence(segment, logprob_threshold=None, no_speech_threshold=None):
+    """True if a Whisper segment should be re-transcribed with the larger model"""
+    if logprob_threshold is None:
+        logprob_threshold = config.WHISPER_ADAPTIVE_LOGPROB
+    if no_speech_threshold is None:
+        no_speech_threshold = config.WHISPER_ADAPTIVE_NO_SPEECH
+    return (segment.get("avg_logprob", 0) < logprob_threshold
+            or segment.get("no_speech_prob", 0) > no_speech_threshold
+            or segment.get("compression_ratio", 0) > COMPRESSION_RATIO_LIMIT)
+
+
+def low_confidence_spans(segments, merge_gap=ADAPTIVE_MERGE_GAP, **thresholds):
+    """
+    Group the low-confidence segments into spans to re-transcribe
+
+    Returns:
+        List of (start, end) in seconds, sorted and non-overlapping
+    """
+    spans = []
+    for segment in segments:
+        if not is_low_confidence(segment, **thresholds):
+            continue
+        if spans and segment["start"] - spans[-1][1] <= merge_gap:
+            spans[-1][1] = max(spans[-1][1], segment["end"])
+        else:
+            spans.append([segment["start"], segment["end"]])
+    return [tuple(span) for span in spans]
+
+
+def _inside(segment, start, end):
+    return start <= (segment["start"] + segment["end"]) / 2 < end
+
+
+def refine_result(result, audio_path, transcriber, spans, context=ADAPTIVE_CONTEXT, progress=None):
+    """
+    Replace the segments inside spans with a re-transcription by another model
+
+    Each span is cut with `context` seconds of audio on both sides; refined segments are kept
+    when their midpoint lies inside the span, and original segments inside it are dropped.
+
+    Args:
+        result: Whisper-style result of the first pass
+        audio_path: Audio or video path the result was transcribed from
+        transcriber: Loaded transcriber of the refining model
+        spans: (start, end) list from low_confidence_spans
+        progress: Optional callable(done, total) with re-transcribed / total seconds
+
+    Returns:
+        Whisper-style result dictionary
+    """
+    total_seconds = sum(end - start for start, end in spans)
+    done_seconds = 0.0
+    language = result.get("language")
+    tmp_dir = tempfile.mkdtemp(prefix="video_summarizer_refine_")
+    try:
+        try:
+            samples, sample_rate = load_pcm(audio_path)
+        except (wave.Error, ValueError, EOFError):
+            samples, sample_rate = None, SAMPLE_RATE
+
+        refined = []
+        for i, (start, end) in enumerate(spans):
+            audio_start = max(0.0, start - context)
+            path = os.path.join(tmp_dir, f"span_{i:04d}.wav")
+            if samples is not None:
+                write_wav(path, samples[int(audio_start * sample_rate):int((end + context) * sample_rate)], sample_rate)
+            else:
+                extract_audio(audio_path, path, sample_rate, start=audio_start, duration=end + context - audio_start)
+            span_result = transcriber.transcribe(path, language=language)
+            for segment in span_result.get("segments", []):
+                shifted = shift_segment(segment, audio_start)
+                if _inside(shifted, start, end):
+                    shifted["refined"] = True
+                    refined.append(shifted)
+            done_seconds += end - start
+            if progress is not None:
+                progress(done_seconds, total_seconds)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    kept = [s for s in result.get("segments", []) if not any(_inside(s, start, end) for start, end in spans)]
+    segments = sorted(kept + refined, key=lambda s: s["start"])
+    for i, segment in enumerate(segments):
+        segment["id"] = i
+    return {
+        "text": "".join(s.get("text", "") for s in segments),
+        "segments": segments,
+        "language": language
+    }
+
+
+def adaptive_refine(result, audio_path, model_size=None, progress=None):
+    """
+    Second pass of the adaptive mode: re-transcribe low-confidence segments with model_size
+
+    If most of the audio is low-confidence, the whole file is re-transcribed instead.
+
+    Args:
+        result: Whisper-style result of the fast model
+        audio_path: Audio or video path
+        model_size: Refining model (default config.WHISPER_MODEL), leased from the model pool
+        progress: Optional callable(done, total) with re-transcribed / total seconds
+
+    Returns:
+        Whisper-style result dictionary
+    """
+    from src import model_pool
+
+    model_size = model_size or config.WHISPER_MODEL
+    segments = result.get("segments", [])
+    spans = low_confidence_spans(segments)
+    if not spans:
+        print(f"Adaptive transcription: all {len(segments)} segments confident, no second pass")
+        return result
+
+    spoken = sum(s["end"] - s["start"] for s in segments) or 1.0
+    refine_seconds = sum(end - start for start, end in spans)
+    with model_pool.lease(model_size) as transcriber:
+        if refine_seconds / spoken > config.WHISPER_ADAPTIVE_MAX_FRACTION:
+            print(f"Adaptive transcription: {refine_seconds / spoken:.0%} low-confidence, "
+                  f"re-transcribing everything with '{model_size}'")
+            return transcribe_with_progress(transcriber, audio_path, result.get("language"), progress)
+        print(f"Adaptive transcription: re-transcribing {len(spans)} spans ({refine_seconds:.0f}s "
+              f"of {spoken:.0f}s) with '{model_size}'")
+        return refine_result(result, audio_path, transcriber, spans, progress=progress)
@@ -0,0 +1,281 @@
+"""
+Windowed Highlight Analysis -
+Splits a long timestamped transcript into token-budgeted, overlapping windows, analyzes the
+windows concurrently (bounded concurrency, retry with backoff on rate limits / server errors)
+and merges the highlights, de-duplicating moments found by two neighbouring windows.
+Latency is bounded by the slowest window instead of one request over the whole game.
+"""
+import re
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.fusion import highlight_score
+from src.highlight_utils import highlight_span, is_duplicate
+from src.cancellation import check_cancelled
+
+# An HTTP status in an error message: "HTTP 503", "status code: 429", "Error code: 529" (SDKs),
+# "429 Too Many Requests"; other 3-digit numbers (token counts, timestamps) are not statuses
+HTTP_STATUS = re.compile(
+    r"(?:\bHTTP(?:/\d(?:\.\d)?)?|\bstatus(?:[ _]code)?|\berror code)\s*[:=]?\s*(\d{3})\b"
+    r"|\b(\d{3})\s+(?:Too Many Requests|Internal Server Error|Bad Gateway|Service Unavailable|Gateway Timeout)",
+    re.IGNORECASE
+)
+
+
+def estimate_tokens(text):
+    """
+    Rough token count: CJK characters are about one token each, other text about four characters per token
+    """
+    cjk = sum(1 for ch in text if "\u3000" <= ch <= "\u9fff" or "\uac00" <= ch <= "\ud7af")
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+def split_windows(full_text, max_tokens, overlap_tokens):
+    """
+    Split a transcript into windows of whole lines
+
+    Args:
+        full_text: Timestamped transcript (one segment per line)
+        max_tokens: Token budget per window
+        overlap_tokens: Trailing lines of a window (up to this many tokens) repeated at the start of the next
+
+    Returns:
+        List of window texts
+    """
+    lines = [line for line in full_text.splitlines() if line.strip()]
+    costs = [estimate_tokens(line) for line in lines]
+
+    windows = []
+    start = 0
+    while start < len(lines):
+        end, used = start, 0
+        while end < len(lines) and (end == start or used + costs[end] <= max_tokens):
+            used += costs[end]
+            end += 1
+        windows.append("\n".join(lines[start:end]))
+        if end >= len(lines):
+            break
+
+        # Step back over the overlap, but always move forward
+        next_start, overlap = end, 0
+        while next_start - 1 > start and overlap + costs[next_start - 1] <= overlap_tokens:
+            next_start -= 1
+            overlap += costs[next_start]
+        start = next_start
+    return windows
+
+
+def _status_of(error):
+    for attr in ("status_code", "status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    if isinstance(value, int):
+        return value
+    match = HTTP_STATUS.search(str(error))
+    return int(match.group(1) or match.group(2)) if match else None
+
+
+def is_retryable(error):
+    """Rate limits (429), server errors (5xx) and network timeouts are worth retrying"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = _status_of(error)
+    return status is not None and (status == 429 or 500 <= status < 600)
+
+
+def merge_highlights(highlights):
+    """
+    Merge highlights from overlapping windows; of two highlights describing the same moment
+    the higher scored one is kept
+
+    Returns:
+        Highlights sorted by start time
+    """
+    merged = []
+    for highlight in sorted(highlights, key=lambda h: -highlight_score(h, default=0)):
+        if highlight_span(highlight)[0] is None:
+            if not any(h.get('description') == highlight.get('description') for h in merged):
+                merged.append(highlight)
+            continue
+        if not any(is_duplicate(highlight, h) for h in merged):
+            merged.append(highlight)
+    return sorted(merged, key=lambda h: highlight_span(h)[0] or 0)
+
+
+class WindowedAnalyzer:
+    """Wraps an analyzer (MultiModelAnalyzer / ClaudeAnalyzer) with the same interface"""
+
+    def __init__(self, analyzer_factory, max_tokens=8000, overlap_tokens=400,
+                 max_concurrency=4, max_retries=4, backoff_seconds=2.0, cancel=None):
+        """
+        Args:
+            analyzer_factory: Zero-argument callable creating an analyzer; each worker thread gets its own
+            max_tokens: Token budget per window
+            overlap_tokens: Overlap between neighbouring windows
+            max_concurrency: Maximum requests in flight
+            max_retries: Retries per window for retryable errors
+            backoff_seconds: Initial backoff, doubled on every retry (with jitter)
+            cancel: Optional CancelToken; no new window or retry starts once it is cancelled
+                    (pass the same token to the analyzers to abort requests in flight)
+        """
+        self.analyzer_factory = analyzer_factory
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.cancel = cancel
+        self._local = threading.local()
+        self._analyzer = analyzer_factory()
+        self._analyzers = [self._analyzer]
+        self._analyzers_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # filter_by_score and other helpers come from the wrapped analyzer; analyze_highlights
+        # and iter_highlights are defined here, so a whole transcript never bypasses the windows
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._analyzer, name)
+
+    def _thread_analyzer(self):
+        analyzer = getattr(self._local, "analyzer", None)
+        if analyzer is None:
+            analyzer = self.analyzer_factory()
+            self._local.analyzer = analyzer
+            with self._analyzers_lock:
+                self._analyzers.append(analyzer)
+        return analyzer
+
+    @property
+    def usage(self):
+        """Token usage summed over the analyzers of all worker threads (None if they do not track it)"""
+        totals = {}
+        for analyzer in self._analyzers:
+            usage = getattr(analyzer, "usage", None)
+            if not isinstance(usage, dict):
+                return None
+            for key, value in usage.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def _backoff(self, label, error, delay):
+        wait = delay * (1 + random.random() * 0.25)
+        print(f"  {label} failed ({error}), retrying in {wait:.1f}s")
+        if self.cancel is not None:
+            self.cancel.wait(wait)
+        else:
+            time.sleep(wait)
+
+    def _analyze_window(self, index, total, text):
+        delay = self.backoff_seconds
+        for attempt in range(self.max_retries + 1):
+            check_cancelled(self.cancel)
+            try:
+                highlights = self._thread_analyzer().analyze_highlights(text) or []
+                print(f"  Window {index + 1}/{total}: {len(highlights)} highlights")
+                return highlights
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                self._backoff(f"Window {index + 1}/{total}", e, delay)
+                delay *= 2
+
+    def _stream_window(self, text):
+        # Retried like a window as long as nothing has been yielded yet (a retry would repeat it)
+        delay = self.backoff_seconds
+        for attempt in range(self.max_retries + 1):
+            check_cancelled(self.cancel)
+            yielded = 0
+            try:
+                for highlight in self._analyzer.iter_highlights(text):
+                    yielded += 1
+                    yield highlight
+                return
+            except Exception as e:
+                if yielded or attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                self._backoff("Analysis", e, delay)
+                delay *= 2
+
+    def analyze_highlights(self, full_text):
+        """
+        Analyze a transcript window by window
+
+        Args:
+            full_text: Timestamped transcript (as from VideoTranscriber.get_full_text)
+
+        Returns:
+            Merged list of highlights
+        """
+        windows = split_windows(full_text, self.max_tokens, self.overlap_tokens)
+        if len(windows) <= 1:
+            return self._analyze_window(0, 1, full_text)
+
+        print(f"Transcript split into {len(windows)} windows of <= {self.max_tokens} tokens, "
+              f"{min(self.max_concurrency, len(windows))} analyzed concurrently")
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="llm-window") as pool:
+            futures = [
+                pool.submit(self._analyze_window, i, len(windows), text)
+                for i, text in enumerate(windows)
+            ]
+            results = [future.result() for future in futures]
+
+        return merge_highlights([h for highlights in results for h in highlights])
+
+    def iter_highlights(self, full_text):
+        """
+        Analyze a transcript window by window, yielding highlights as the windows finish.
+        A single window is streamed from the wrapped analyzer (if it can stream). With several
+        windows, the highlights of a window are yielded once it and its neighbours are done,
+        de-duplicated like merge_highlights (of two highlights of the same moment in
+        neighbouring windows the higher scored one is kept).
+
+        Args:
+            full_text: Timestamped transcript (as from VideoTranscriber.get_full_text)
+
+        Yields:
+            Highlight dictionaries
+        """
+        windows = split_windows(full_text, self.max_tokens, self.overlap_tokens)
+        if len(windows) <= 1:
+            if hasattr(self._analyzer, "iter_highlights"):
+                yield from self._stream_window(full_text)
+            else:
+                yield from self._analyze_window(0, 1, full_text)
+            return
+
+        print(f"Transcript split into {len(windows)} windows of <= {self.max_tokens} tokens, "
+              f"{min(self.max_concurrency, len(windows))} analyzed concurrently")
+        results = {}
+        emitted = []
+        next_window = 0
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="llm-window") as pool:
+            futures = {
+                pool.submit(self._analyze_window, i, len(windows), text): i
+                for i, text in enumerate(windows)
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                # Window i is final once window i + 1 is known (window i - 1 was emitted before it)
+                while next_window in results and (next_window + 1 in results or next_window + 1 == len(windows)):
+                    following = results.get(next_window + 1, [])
+                    for highlight in sorted(results[next_window], key=lambda h: highlight_span(h)[0] or 0):
+                        if _is_superseded(highlight, emitted, following):
+                            continue
+                        emitted.append(highlight)
+                        yield highlight
+                    next_window += 1
+
+
+def _is_superseded(highlight, emitted, following):
+    """Whether a window's highlight duplicates one already yielded or a higher scored one of the next window"""
+    if highlight_span(highlight)[0] is None:
+        return any(h.get('description') == highlight.get('description') for h in emitted)
+    score = highlight_score(highlight, default=0)
+    return (any(is_duplicate(highlight, h) for h in emitted)
+            or any(highlight_score(h, default=0) > score and is_duplicate(highlight, h) for h in following))
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Tests import the modules the way the entry points do (import config, from src import ...)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,73 @@
+import struct
+import wave
+
+import numpy as np
+import pytest
+
+from src.audio_extract import SharedAudio, load_pcm, stream_pcm
+
+
+def write_wav(path, samples, sample_rate=16000):
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(np.asarray(samples, dtype="<i2").tobytes())
+
+
+def test_load_pcm_maps_the_samples(tmp_path):
+    samples = np.arange(-500, 500, dtype=np.int16)
+    path = tmp_path / "audio.wav"
+    write_wav(path, samples, 8000)
+
+    loaded, sample_rate = load_pcm(str(path))
+
+    assert sample_rate == 8000
+    assert np.array_equal(loaded, samples)
+
+
+def test_load_pcm_reads_only_the_data_chunk(tmp_path):
+    samples = np.arange(-500, 500, dtype=np.int16)
+    path = tmp_path / "audio.wav"
+    write_wav(path, samples, 8000)
+    # Metadata after the data chunk, as some encoders write it
+    info = b"ISFT\x05\x00\x00\x00Lavf\x00\x00"
+    with open(path, "ab") as f:
+        f.write(b"LIST" + struct.pack("<I", len(info) + 4) + b"INFO" + info)
+    with open(path, "r+b") as f:
+        f.seek(4)
+        f.write(struct.pack("<I", path.stat().st_size - 8))
+
+    loaded, sample_rate = load_pcm(str(path))
+
+    assert sample_rate == 8000
+    assert np.array_equal(loaded, samples)
+
+
+def test_load_pcm_rejects_stereo(tmp_path):
+    path = tmp_path / "stereo.wav"
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(2)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(b"\0" * 16)
+
+    with pytest.raises(ValueError):
+        load_pcm(str(path))
+
+
+def test_stream_pcm_yields_every_sample_in_blocks(tmp_path):
+    samples = (np.arange(16000 * 5) % 3000).astype(np.int16)
+    path = tmp_path / "audio.wav"
+    write_wav(path, samples)
+
+    blocks = list(stream_pcm(str(path), block_seconds=2))
+
+    assert [len(b) for b in blocks] == [32000, 32000, 16000]
+    assert np.array_equal(np.concatenate(blocks), samples)
+
+
+def test_disabled_shared_audio_reads_the_video():
+    audio = SharedAudio("game.mp4", enabled=False)
+    assert audio.path == "game.mp4"
+    audio.cleanup()
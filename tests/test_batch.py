@@ -0,0 +1,45 @@
+import json
+
+from batch import collect_jobs
+
+
+def test_manifest_line_without_video_is_reported(tmp_path):
+    manifest = tmp_path / "jobs.jsonl"
+    manifest.write_text("\n".join([
+        json.dumps({"video": "a.mp4", "output": "out/a"}),
+        json.dumps({"output": "out/b"}),
+        "not json",
+    ]))
+
+    jobs = collect_jobs([str(manifest)], "output")
+
+    assert [job["status"] for job in jobs] == ["pending", "invalid", "invalid"]
+    assert jobs[0]["video"] == "a.mp4"
+    assert jobs[1]["video"] == f"{manifest}:2"
+    assert "video" in jobs[1]["error"]
+
+
+def test_same_named_videos_get_distinct_outputs(tmp_path):
+    for folder in ("a", "b"):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / "game.mp4").write_bytes(b"")
+    (tmp_path / "a" / "other.mp4").write_bytes(b"")
+
+    jobs = collect_jobs([str(tmp_path / "a"), str(tmp_path / "b")], str(tmp_path / "out"))
+    outputs = {job["video"]: job["output"] for job in jobs}
+
+    games = [output for video, output in outputs.items() if video.endswith("game.mp4")]
+    assert len(games) == 2 and games[0] != games[1]
+    other = [output for video, output in outputs.items() if video.endswith("other.mp4")]
+    assert other == [str(tmp_path / "out")]
+
+
+def test_same_stem_in_one_folder_gets_distinct_outputs(tmp_path):
+    (tmp_path / "a").mkdir()
+    for name in ("game.mp4", "game.mkv"):
+        (tmp_path / "a" / name).write_bytes(b"")
+
+    jobs = collect_jobs([str(tmp_path / "a")], str(tmp_path / "out"))
+
+    assert len(jobs) == 2
+    assert jobs[0]["output"] != jobs[1]["output"]
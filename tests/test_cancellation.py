@@ -0,0 +1,100 @@
+import os
+import queue
+import types
+
+import pytest
+
+import ui
+from src import pipeline as pipeline_module
+from src.cancellation import Cancelled, CancelToken
+from src.pipeline import Pipeline
+
+
+def test_abort_callbacks_run_once_and_only_while_registered():
+    token = CancelToken()
+    calls = []
+    with token.on_cancel(lambda: calls.append("finished block")):
+        pass
+    with token.on_cancel(lambda: calls.append("running block")):
+        token.cancel()
+        token.cancel()
+
+    assert calls == ["running block"]
+    with token.on_cancel(lambda: calls.append("after cancel")):
+        pass
+    assert calls == ["running block", "after cancel"]
+    with pytest.raises(Cancelled):
+        token.check()
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "game.mp4"
+    path.write_bytes(b"")
+    return str(path)
+
+
+def test_run_cancelled_before_it_starts_does_nothing(video, tmp_path):
+    token = CancelToken()
+    token.cancel()
+    ran = []
+    pipeline = Pipeline(video, str(tmp_path / "output"), use_cache=False, cancel=token)
+    pipeline.start_background_stages = lambda: ran.append("background")
+    pipeline.steps = [("transcribe", "Speech to Text", lambda p: ran.append("transcribe"))]
+
+    with pytest.raises(Cancelled):
+        pipeline.run()
+    assert ran == []
+    assert not os.path.exists(tmp_path / "output")
+
+
+class CancellingAnalyzer:
+    """The user presses Cancel while the model is answering"""
+
+    def __init__(self, cancel):
+        self.cancel = cancel
+
+    def analyze_highlights(self, text):
+        self.cancel.cancel()
+        return [{"start_time": "00:10", "end_time": "00:20", "score": 8}]
+
+    def filter_by_score(self, highlights, min_score=6):
+        return highlights
+
+
+def test_cancel_during_a_step_ends_the_run_and_cleans_up(video, tmp_path, monkeypatch):
+    token = CancelToken()
+    analyzers = []
+
+    def create_analyzer(model_type=None, cancel=None):
+        analyzers.append(cancel)
+        return CancellingAnalyzer(cancel), "fake", "claude"
+
+    monkeypatch.setattr(pipeline_module, "create_analyzer", create_analyzer)
+    ran = []
+    pipeline = Pipeline(video, str(tmp_path / "output"), use_cache=False, cancel=token)
+    pipeline.metrics_enabled = False
+    pipeline.start_background_stages = lambda: None
+    pipeline.steps = [("transcribe", "Speech to Text", lambda p: setattr(p, "full_text", "[00:10] Goal!")),
+                      ("analyze", "AI Analysis of Highlights", Pipeline.analyze),
+                      ("audio_peaks", "Audio Peak Detection", lambda p: ran.append("audio_peaks"))]
+    cleaned = []
+    monkeypatch.setattr(pipeline_module.SharedAudio, "cleanup", lambda self: cleaned.append(True))
+
+    with pytest.raises(Cancelled):
+        pipeline.run()
+    assert ran == []
+    assert analyzers == [token]
+    assert cleaned
+
+
+def test_queued_gui_job_cancelled_before_it_starts_is_not_processed():
+    token = CancelToken()
+    token.cancel()
+    app = types.SimpleNamespace(events=queue.Queue(),
+                                process_video=lambda job: pytest.fail("a cancelled job was processed"))
+
+    ui.VideoSummarizerUI.run_job(app, {"id": 1, "cancel": token})
+
+    assert app.events.get_nowait() == ("finish", 1, "cancelled", None)
+    assert app.events.empty()
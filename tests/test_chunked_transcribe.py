@@ -0,0 +1,27 @@
+from src.chunked_transcribe import stitch_results
+
+
+def segment(start, end, text):
+    return {"start": start, "end": end, "text": text, "words": [{"word": text, "start": start, "end": end}]}
+
+
+def test_stitch_results_keeps_overlap_segments_once():
+    # Split at 10s with 2s of overlap: chunk 1 starts at 8s of the audio
+    chunks = [
+        {"audio_start": 0.0, "own_start": 0.0, "own_end": 10.0},
+        {"audio_start": 8.0, "own_start": 10.0, "own_end": float("inf")},
+    ]
+    results = [
+        {"segments": [segment(0.0, 4.0, " a"), segment(8.5, 9.5, " b"), segment(9.8, 11.0, " c")], "language": "en"},
+        {"segments": [segment(0.5, 1.5, " b"), segment(1.8, 3.0, " c"), segment(3.0, 6.0, " d")]},
+    ]
+
+    stitched = stitch_results(chunks, results)
+
+    assert stitched["text"] == " a b c d"
+    assert [(s["start"], s["end"]) for s in stitched["segments"]] == [(0.0, 4.0), (8.5, 9.5), (9.8, 11.0), (11.0, 14.0)]
+    assert [s["id"] for s in stitched["segments"]] == [0, 1, 2, 3]
+    assert stitched["segments"][3]["words"][0]["start"] == 11.0
+    assert stitched["language"] == "en"
+    # The input results are not modified
+    assert results[1]["segments"][2]["start"] == 3.0
@@ -0,0 +1,29 @@
+import numpy as np
+
+from src.excitement import ExcitementTrack
+from src.result_cache import ResultCache
+
+
+def test_track_without_peaks_is_cached(tmp_path):
+    quiet = ExcitementTrack(np.full(100, 0.1), np.full(100, 0.5))
+    assert quiet.peaks == [] and len(quiet) == 0
+
+    cache = ResultCache(str(tmp_path), max_size_mb=10)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return quiet
+
+    cache.cached("audio_peaks", compute, video="abc")
+    cached = cache.cached("audio_peaks", compute, video="abc")
+    assert len(calls) == 1
+    assert cached.peaks == [] and len(cached.values) == 100
+
+
+def test_peaks_need_the_threshold_and_the_floor():
+    values = np.zeros(100)
+    values[20:25] = 0.9  # Above both
+    values[60:65] = 0.5  # Above the adaptive threshold but under min_level
+    track = ExcitementTrack(values, np.full(100, 0.3), min_level=0.7)
+    assert len(track) == 1
@@ -0,0 +1,94 @@
+from src import fast_editor
+from src.fast_editor import FastVideoEditor
+
+
+def test_probe_keyframes_are_relative_to_the_start_time(monkeypatch):
+    monkeypatch.setattr(fast_editor, "probe", lambda path, args: {
+        "format": {"start_time": "1.400000"},
+        "packets": [{"pts_time": "3.400000", "flags": "K__"}, {"pts_time": "3.440000", "flags": "___"},
+                    {"pts_time": "1.400000", "flags": "K__"}, {"pts_time": "N/A", "flags": "K__"}]
+    })
+    assert FastVideoEditor.probe_keyframes("game.ts") == [0.0, 2.0]
+
+
+def test_cut_clip_seeks_the_body_at_or_after_the_keyframe(monkeypatch, tmp_path):
+    commands = []
+    monkeypatch.setattr(fast_editor, "run_ffmpeg", lambda args, description, cancel=None: commands.append(args))
+    video = {"codec_name": "h264", "pix_fmt": "yuv420p", "r_frame_rate": "25/1"}
+    keyframe = 3.4 - 1.4  # 1.9999999999999998 after subtracting the start time
+
+    pieces = FastVideoEditor().cut_clip("game.ts", 1.0, 6.0, [0.0, keyframe], str(tmp_path), 0, video, None)
+
+    head, body = commands
+    assert len(pieces) == 2
+    assert head[head.index("-t") + 1] == "1.000"
+    assert body[body.index("-ss") + 1] == "2.000"
+    assert body[body.index("-bsf:v") + 1] == "h264_mp4toannexb"
+
+    commands.clear()
+    FastVideoEditor().cut_clip("game.ts", 1.0, 6.0, [0.0, 2.0004], str(tmp_path), 0, video, None)
+    head, body = commands
+    assert head[head.index("-t") + 1] == "1.000"
+    assert body[body.index("-ss") + 1] == "2.001"
+
+
+def test_merge_intervals():
+    assert fast_editor.merge_intervals([(5, 8), (0, 2), (1, 3), (3, 4)]) == [(0, 4), (5, 8)]
+    assert fast_editor.merge_intervals([(0, 2), (2.5, 3)], gap=0.5) == [(0, 3)]
+    assert fast_editor.merge_intervals([]) == []
+
+
+def test_highlight_windows_merge_after_padding():
+    highlights = [
+        {"start_time": "01:00", "end_time": "01:05"},
+        {"start_time": "00:10", "end_time": "00:20"},
+        {"start_time": "00:25", "end_time": "00:30"},
+        {"description": "no timestamps"},
+    ]
+    windows = FastVideoEditor(buffer_seconds=3).highlight_windows(highlights, duration=66)
+    assert windows == [(7.0, 33.0), (57.0, 66)]
+
+
+def test_renditions_select_string_scores_as_numbers():
+    highlights = [
+        {"start_time": "00:10", "end_time": "00:20", "final_score": "9"},
+        {"start_time": "01:00", "end_time": "01:10", "final_score": "10"},
+        {"start_time": "02:00", "end_time": "02:10", "score": "7"},
+    ]
+    editor = FastVideoEditor(buffer_seconds=0)
+    windows = editor.highlight_windows(highlights)
+
+    # Reel: 00:10-00:20 at 0s, 01:00-01:10 at 10s, 02:00-02:10 at 20s
+    assert editor.rendition_ranges({"top_n": 1}, highlights, windows) == [(10.0, 20.0)]
+    assert editor.rendition_ranges({"min_score": 8}, highlights, windows) == [(0.0, 20.0)]
+
+
+def reel(*highlights):
+    editor = FastVideoEditor(buffer_seconds=0)
+    return editor, list(highlights), editor.highlight_windows(list(highlights))
+
+
+def test_rendition_without_selection_keeps_the_whole_reel():
+    editor, highlights, windows = reel({"start_time": "00:10", "end_time": "00:20", "score": 8})
+    assert editor.rendition_ranges({"suffix": "720p", "height": 720}, highlights, windows) is None
+
+
+def test_rendition_ties_prefer_the_earlier_moment():
+    editor, highlights, windows = reel(
+        {"start_time": "02:00", "end_time": "02:10", "final_score": 8},
+        {"start_time": "00:10", "end_time": "00:20", "final_score": 8},
+        {"start_time": "01:00", "end_time": "01:10", "final_score": "8"},
+    )
+    # Reel: 00:10 at 0s, 01:00 at 10s, 02:00 at 20s
+    assert editor.rendition_ranges({"top_n": 2}, highlights, windows) == [(0.0, 20.0)]
+
+
+def test_rendition_spends_the_duration_budget_on_the_best_moments_in_reel_order():
+    editor, highlights, windows = reel(
+        {"start_time": "00:10", "end_time": "00:20", "final_score": 6},
+        {"start_time": "01:00", "end_time": "01:10", "final_score": 9},
+        {"start_time": "02:00", "end_time": "02:10", "final_score": 7},
+    )
+    # 9 takes 10s, 7 the remaining 5s, nothing is left for 6; ranges come back in reel order
+    assert editor.rendition_ranges({"max_duration": 15}, highlights, windows) == [(10.0, 25.0)]
+    assert editor.rendition_ranges({"max_duration": 10.5}, highlights, windows) == [(10.0, 20.0)]
@@ -0,0 +1,44 @@
+import random
+
+from src.fusion import PeakIndex, fuse_highlights, peak_interval
+
+
+def test_peak_interval_formats():
+    assert peak_interval({"time": 3, "start": 2, "end": 4, "intensity": 0.5}) == (2.0, 4.0, 3.0, 0.5)
+    assert peak_interval({"time": 3, "amplitude": 2}) == (3.0, 3.0, 3.0, 2.0)
+    assert peak_interval((7.5, 0.2)) == (7.5, 7.5, 7.5, 0.2)
+    assert peak_interval(9) == (9.0, 9.0, 9.0, 1.0)
+    assert peak_interval({"intensity": 1}) is None
+
+
+def test_overlapping_matches_a_linear_scan():
+    rng = random.Random(7)
+    peaks = []
+    for _ in range(300):
+        start = rng.uniform(0, 1000)
+        peaks.append({"time": start, "start": start, "end": start + rng.uniform(0, 3)})
+    peaks.append({"time": 100, "start": 100, "end": 900})  # One very long peak
+    index = PeakIndex(peaks)
+
+    for _ in range(200):
+        low = rng.uniform(-10, 1000)
+        high = low + rng.uniform(0, 20)
+        expected = [i for i in index.intervals if i[0] <= high and i[1] >= low]
+        assert index.overlapping(low, high) == expected
+
+
+def test_fuse_highlights_scores_and_evidence():
+    highlights = [
+        {"start_time": "00:10", "end_time": "00:20", "score": "8"},
+        {"start_time": "01:00", "end_time": "01:05", "score": 6},
+        {"description": "untimed", "score": "n/a"},
+    ]
+    peaks = [(14.0, 2.0), (22.0, 1.0), (200.0, 0.5)]
+
+    fused = fuse_highlights(peaks, highlights, tolerance=3, audio_weight=0.5)
+
+    assert fused[0]["audio_score"] == 1.0
+    assert [p["time"] for p in fused[0]["audio_evidence"]] == [14.0, 22.0]
+    assert fused[0]["final_score"] == 9.0
+    assert fused[1]["audio_evidence"] == [] and fused[1]["final_score"] == 3.0
+    assert fused[2]["final_score"] == 0
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from src.excitement import ExcitementTrack
+from src.intermediates import load_intermediates, save_intermediates
+
+HIGHLIGHTS = [{"start_time": "00:10", "end_time": "00:20", "score": 8}]
+
+
+def test_track_peaks_can_be_redetected(tmp_path):
+    values = np.zeros(100)
+    values[20:25] = 0.9
+    values[60:65] = 0.5
+    track = ExcitementTrack(values, np.full(100, 0.3), min_level=0.7)
+    path = save_intermediates(str(tmp_path), "game", "game.mp4", HIGHLIGHTS, audio_peaks=track)
+
+    assert len(load_intermediates(path)["audio_peaks"].peaks) == 1
+    assert len(load_intermediates(path, peak_threshold=0.4)["audio_peaks"].peaks) == 2
+
+
+@pytest.mark.parametrize("audio_peaks", [[{"time": 12.0, "intensity": 0.8}], None])
+def test_peak_threshold_without_a_curve_is_rejected(tmp_path, audio_peaks):
+    path = save_intermediates(str(tmp_path), "game", "game.mp4", HIGHLIGHTS, audio_peaks=audio_peaks)
+
+    assert load_intermediates(path)["highlights"] == HIGHLIGHTS
+    with pytest.raises(ValueError, match="Peak threshold"):
+        load_intermediates(path, peak_threshold=0.5)
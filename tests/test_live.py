@@ -0,0 +1,46 @@
+import contextlib
+
+import live
+from src.pipeline import MIN_SCORE
+
+
+class FakeSource:
+    available_until = 60.0
+
+    def cut(self, start, end, output_path):
+        open(output_path, "wb").close()
+
+
+class FakeTranscriber:
+    def transcribe(self, path, language=None):
+        return {"segments": [{"start": float(i), "end": i + 1.0, "text": " commentary"} for i in range(60)],
+                "language": "en"}
+
+    def format_transcript(self, result):
+        return result["segments"]
+
+    def get_full_text(self, segments):
+        return " ".join(s["text"] for s in segments)
+
+
+class FakeAnalyzer:
+    def analyze_highlights(self, text):
+        return [{"start_time": "00:10", "end_time": "00:20", "description": "goal", "score": "8"},
+                {"start_time": "00:30", "end_time": "00:35", "description": "miss", "score": "4"}]
+
+
+def test_string_scores_are_filtered_as_numbers(tmp_path, monkeypatch):
+    analyzers = []
+    monkeypatch.setattr(live, "create_analyzer",
+                        lambda model_type=None: analyzers.append(model_type) or (FakeAnalyzer(), "fake", "claude"))
+    monkeypatch.setattr(live.model_pool, "lease", lambda model: contextlib.nullcontext(FakeTranscriber()))
+    monkeypatch.setattr(live.config, "LLM_STREAMING", False)
+    chunk = tmp_path / "chunk.wav"
+    chunk.write_bytes(b"")
+
+    summarizer = live.LiveSummarizer(FakeSource(), str(tmp_path), "game", model_type="gpt", settle_seconds=5)
+    summarizer._process_chunks([(str(chunk), 0.0)])
+
+    assert analyzers == ["gpt"]
+    assert summarizer.min_score == MIN_SCORE
+    assert [(h["description"], h["final_score"]) for h in summarizer.confirmed] == [("goal", 8)]
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from benchmarks.fake_llm import FakeLLMServer
+from src.llm_client import LLMClient
+
+TRANSCRIPT = "[00:10 - 00:14] What a goal by the striker\n[00:14 - 00:20] calm build-up\n"
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeLLMServer() as server:
+        yield server
+
+
+@pytest.fixture(scope="module")
+def client():
+    client = LLMClient()
+    yield client
+    client.close()
+
+
+@pytest.mark.parametrize("model_type", ["claude", "gpt", "gemini"])
+def test_complete_and_stream_against_the_fake_server(server, client, model_type):
+    text, usage = client.complete(model_type, TRANSCRIPT, "key", server.url)
+    assert json.loads(text)[0]["start_time"] == "00:10"
+    assert usage["input_tokens"] > 0 and usage["output_tokens"] > 0
+
+    stream_usage = {}
+    streamed = "".join(client.stream(model_type, TRANSCRIPT, "key", server.url, usage=stream_usage))
+    assert streamed == text
+    assert stream_usage == usage
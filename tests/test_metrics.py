@@ -0,0 +1,56 @@
+import threading
+
+from src.metrics import MetricsRecorder, write_prometheus
+
+
+def run_data(video, wall):
+    recorder = MetricsRecorder(video)
+    with recorder.stage("edit"):
+        pass
+    data = recorder.summary()
+    data["wall_seconds"] = wall
+    return data
+
+
+def test_prometheus_file_merges_runs(tmp_path):
+    path = str(tmp_path / "summarizer.prom")
+    write_prometheus(run_data("a", 1.0), path)
+    write_prometheus(run_data("b", 2.0), path)
+    write_prometheus(run_data("a", 3.0), path)  # Replaces the first run
+
+    text = open(path, encoding="utf-8").read()
+    assert 'video_summarizer_run_wall_seconds{video="a"} 3.0' in text
+    assert 'video_summarizer_run_wall_seconds{video="b"} 2.0' in text
+    assert text.count("video_summarizer_run_wall_seconds{") == 2
+    assert text.count("# TYPE video_summarizer_run_wall_seconds gauge") == 1
+    assert 'video_summarizer_stage_cpu_seconds{video="a",stage="edit",scope="process"}' in text
+    assert 'scope="thread"' in text
+    assert sorted(p.name for p in tmp_path.iterdir() if not p.name.endswith(".lock")) == ["summarizer.prom"]
+
+
+def test_concurrent_writers_keep_every_run(tmp_path):
+    path = str(tmp_path / "summarizer.prom")
+    threads = [threading.Thread(target=write_prometheus, args=(run_data(f"v{i}", i), path))
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = open(path, encoding="utf-8").read()
+    assert text.count("video_summarizer_run_wall_seconds{") == 8
+
+
+def test_only_the_latest_runs_are_kept(tmp_path, monkeypatch):
+    path = str(tmp_path / "summarizer.prom")
+    clock = iter(range(1000, 1100))
+    monkeypatch.setattr("src.metrics.time.time", lambda: next(clock))
+    for i in range(5):
+        write_prometheus(run_data(f"job{i}", i), path, max_runs=3)
+    write_prometheus(run_data("job2", 9.0), path, max_runs=3)  # A new run of a kept video
+
+    text = open(path, encoding="utf-8").read()
+    assert [video for video in ("job0", "job1", "job2", "job3", "job4") if f'video="{video}"' in text] == [
+        "job2", "job3", "job4"]
+    assert 'video_summarizer_run_wall_seconds{video="job2"} 9.0' in text
+    assert text.count("video_summarizer_run_wall_seconds{") == 3
@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+from src import model_pool
+from src.model_pool import ModelPool
+
+
+class Loader:
+    """Stub loader: one object per load, remembering which sizes were loaded"""
+
+    def __init__(self):
+        self.loaded = []
+
+    def __call__(self, model_size):
+        self.loaded.append(model_size)
+        return object()
+
+
+def test_released_model_is_reused():
+    loader = Loader()
+    pool = ModelPool(loader=loader)
+
+    with pool.lease("small") as first:
+        pass
+    with pool.lease("small") as second:
+        assert second is first
+    assert loader.loaded == ["small"]
+    assert pool.loaded_models() == {"small": (1, 0)}
+
+
+def test_replica_limit_makes_callers_wait():
+    loader = Loader()
+    pool = ModelPool(max_replicas=1, loader=loader)
+    first = pool.acquire("small")
+    leased = []
+    waiter = threading.Thread(target=lambda: leased.append(pool.acquire("small")))
+    waiter.start()
+
+    waiter.join(timeout=0.2)
+    assert waiter.is_alive() and not leased
+    pool.release(first)
+    waiter.join(timeout=5)
+    assert leased == [first]
+    assert loader.loaded == ["small"]
+
+
+def test_concurrent_leases_load_up_to_max_replicas():
+    loader = Loader()
+    pool = ModelPool(memory_budget_mb=10000, max_replicas=2, loader=loader)
+
+    first, second = pool.acquire("small"), pool.acquire("small")
+
+    assert first is not second
+    assert pool.loaded_models() == {"small": (2, 2)}
+
+
+def test_allow_replicas_wakes_waiting_callers():
+    pool = ModelPool(memory_budget_mb=10000, max_replicas=1, loader=Loader())
+    first = pool.acquire("small")
+    leased = []
+    waiter = threading.Thread(target=lambda: leased.append(pool.acquire("small")))
+    waiter.start()
+    waiter.join(timeout=0.2)
+
+    pool.allow_replicas(2)
+    waiter.join(timeout=5)
+    assert len(leased) == 1 and leased[0] is not first
+
+
+def test_idle_models_are_evicted_least_recently_used_first():
+    loader = Loader()
+    pool = ModelPool(memory_budget_mb=3500, loader=loader)
+    pool.preload("small")  # 1000 MB
+    pool.preload("medium")  # 2500 MB, both fit
+
+    pool.preload("base")  # 450 MB: the least recently used (small) has to go
+
+    assert pool.loaded_models() == {"medium": (1, 0), "base": (1, 0)}
+
+
+def test_model_in_use_is_never_evicted():
+    loader = Loader()
+    pool = ModelPool(memory_budget_mb=3000, loader=loader)
+
+    with pool.lease("medium"):
+        # Over budget, but nothing idle to evict and no replica of this size exists: load anyway
+        with pool.lease("small"):
+            assert pool.loaded_models() == {"medium": (1, 1), "small": (1, 1)}
+    assert pool.evict_idle() == 2
+    assert pool.loaded_models() == {}
+
+
+def test_failed_load_frees_the_slot():
+    calls = []
+
+    def loader(model_size):
+        calls.append(model_size)
+        if len(calls) == 1:
+            raise RuntimeError("out of memory")
+        return object()
+
+    pool = ModelPool(max_replicas=1, loader=loader)
+    with pytest.raises(RuntimeError):
+        pool.acquire("small")
+    with pool.lease("small") as transcriber:
+        assert transcriber is not None
+    assert calls == ["small", "small"]
+
+
+def test_get_pool_only_raises_the_replica_limit(monkeypatch):
+    monkeypatch.setattr(model_pool, "_pool", None)
+    monkeypatch.setattr(model_pool.config, "WHISPER_POOL_REPLICAS", 1)
+
+    assert model_pool.get_pool(max_replicas=3).max_replicas == 3
+    assert model_pool.get_pool(max_replicas=2).max_replicas == 3
+    assert model_pool.get_pool().max_replicas == 3
@@ -0,0 +1,24 @@
+import os
+import time
+
+import pytest
+
+from src.parallel import WorkerPool, terminate_workers
+
+
+def test_worker_pool_runs_tasks_in_spawned_processes():
+    with WorkerPool(max_workers=1) as pool:
+        assert pool.submit(os.getpid).result(timeout=60) != os.getpid()
+
+
+def test_terminate_stops_a_running_task():
+    pool = WorkerPool(max_workers=1)
+    pool.submit(os.getpid).result(timeout=60)  # Worker started and registered
+    future = pool.submit(time.sleep, 60)
+    time.sleep(0.5)
+
+    started = time.time()
+    terminate_workers(pool)
+    with pytest.raises(Exception):
+        future.result(timeout=30)
+    assert time.time() - started < 30
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+import ui
+from src import pipeline as pipeline_module
+from src.pipeline import Pipeline
+
+
+class FakeAnalyzer:
+    def __init__(self, highlights):
+        self.highlights = highlights
+
+    def analyze_highlights(self, text):
+        return [dict(h) for h in self.highlights]
+
+    def filter_by_score(self, highlights, min_score=6):
+        return [h for h in highlights if h["score"] >= min_score]
+
+
+def fake_transcribe(pipeline):
+    pipeline.full_text = "[00:10] What a goal!"
+
+
+@pytest.fixture
+def make_pipeline(tmp_path, monkeypatch):
+    def make(highlights, video="game.mp4"):
+        video_path = str(tmp_path / video)
+        if video == "game.mp4":
+            open(video_path, "wb").close()
+        monkeypatch.setattr(pipeline_module, "create_analyzer",
+                            lambda model_type=None, cancel=None: (FakeAnalyzer(highlights), "fake", "claude"))
+        pipeline = Pipeline(video_path, str(tmp_path / "output"), use_cache=False)
+        pipeline.metrics_enabled = False
+        pipeline.steps = [("transcribe", "Speech to Text", fake_transcribe),
+                          ("analyze", "AI Analysis of Highlights", Pipeline.analyze)]
+        return pipeline
+    return make
+
+
+def test_no_highlight_above_the_minimum_score_stops_the_run(make_pipeline, tmp_path):
+    pipeline = make_pipeline([{"start_time": "00:10", "end_time": "00:20", "score": 3}])
+
+    assert pipeline.run() is None
+    assert pipeline.stopped
+    assert ui.job_status(pipeline) == "empty"
+    # The raw highlights are kept for rescore.py
+    assert os.path.exists(tmp_path / "output" / "game_analysis.json")
+
+
+def test_no_highlight_at_all_stops_the_run(make_pipeline):
+    pipeline = make_pipeline([])
+
+    assert pipeline.run() is None
+    assert ui.job_status(pipeline) == "empty"
+
+
+def test_missing_video_is_a_failure(make_pipeline):
+    pipeline = make_pipeline([{"start_time": "00:10", "end_time": "00:20", "score": 8}], video="missing.mp4")
+
+    assert pipeline.run() is None
+    assert not pipeline.stopped
+    assert ui.job_status(pipeline) == "failed"
+
+
+@pytest.mark.parametrize("reel, status", [(None, "failed"), ("reel.mp4", "done")])
+def test_reel_decides_between_done_and_failed(make_pipeline, reel, status):
+    pipeline = make_pipeline([{"start_time": "00:10", "end_time": "00:20", "score": 8}])
+    pipeline.steps.append(("edit", "Generating Highlight Reel", lambda p: p.outputs.update(highlights_video=reel)))
+
+    assert pipeline.run() is not None
+    assert ui.job_status(pipeline) == status
+
+
+@pytest.mark.parametrize("setting, value", [("HTTP_CLIENT", "other"), ("LLM_WINDOW_OVERLAP_TOKENS", 1),
+                                            ("LLM_STREAMING", "other")])
+def test_analyze_cache_key_covers_the_analyzer_settings(make_pipeline, monkeypatch, setting, value):
+    pipeline = make_pipeline([])
+    pipeline.cache = pipeline_module.ResultCache(enabled=False)
+    pipeline.full_text = "text"
+    monkeypatch.setattr(pipeline_module.config, "USE_HTTP_REQUEST", True)
+    monkeypatch.setattr(pipeline_module.config, "LLM_WINDOWED", True)
+    before = pipeline.analyze_cache_params("model")
+
+    monkeypatch.setattr(pipeline_module.config, setting, value)
+    assert pipeline.analyze_cache_params("model") != before
+
+
+@pytest.mark.parametrize("setting, value", [("WHISPER_CHUNK_SECONDS", 1), ("WHISPER_CHUNK_OVERLAP", 1),
+                                            ("WHISPER_COMPUTE_TYPE", "other"), ("WHISPER_ADAPTIVE_LOGPROB", 1),
+                                            ("WHISPER_ADAPTIVE_MAX_FRACTION", 1)])
+def test_transcribe_cache_key_covers_the_transcription_settings(make_pipeline, monkeypatch, setting, value):
+    pipeline = make_pipeline([])
+    for name, enabled in (("WHISPER_CHUNKED", True), ("WHISPER_ADAPTIVE", True),
+                          ("WHISPER_BACKEND", "faster-whisper")):
+        monkeypatch.setattr(pipeline_module.config, name, enabled)
+    before = pipeline.transcribe_cache_params()
+
+    monkeypatch.setattr(pipeline_module.config, setting, value)
+    assert pipeline.transcribe_cache_params() != before
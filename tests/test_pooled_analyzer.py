@@ -0,0 +1,23 @@
+from src.pooled_analyzer import HighlightStreamParser, extract_json_array
+
+
+def test_stream_parser_returns_objects_as_they_complete():
+    parser = HighlightStreamParser()
+
+    assert parser.feed('Here you go:\n```json\n[{"start_time": "00:10", ') == []
+    # The first object is returned as soon as its closing brace arrives
+    first = parser.feed('"description": "a \\"curly\\" {goal}", "score": 8},\n {"start_time": "01:00", "me')
+    assert first == [{"start_time": "00:10", "description": 'a "curly" {goal}', "score": 8}]
+
+    rest = parser.feed('ta": {"x": 1}, "score": 6}]\n```')
+    assert rest == [{"start_time": "01:00", "meta": {"x": 1}, "score": 6}]
+
+
+def test_stream_parser_ignores_braces_before_the_array():
+    parser = HighlightStreamParser()
+    assert parser.feed('{"note": 1} [ {"score": 5} ]') == [{"score": 5}]
+
+
+def test_extract_json_array():
+    assert extract_json_array('```json\n[{"score": 7}, 3]\n```') == [{"score": 7}]
+    assert extract_json_array("no highlights") == []
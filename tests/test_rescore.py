@@ -0,0 +1,66 @@
+import os
+import sys
+import types
+
+import numpy as np
+
+from rescore import RescorePipeline
+from src.excitement import ExcitementTrack
+from src.fusion import highlight_score
+from src.intermediates import save_intermediates
+
+HIGHLIGHTS = [
+    {"start_time": "00:10", "end_time": "00:20", "score": 7},
+    {"start_time": "01:00", "end_time": "01:10", "score": "9"},
+    {"start_time": "02:00", "end_time": "02:10", "score": 4},
+]
+
+
+def excitement_track():
+    # One second per frame, loud from 14s to 16s
+    values = np.zeros(180)
+    values[14:17] = 1.0
+    return ExcitementTrack(values, np.full(180, 0.3), hop_seconds=1.0, min_level=0.7)
+
+
+def rescore(tmp_path, audio_peaks=None, **options):
+    audio_peaks = excitement_track() if audio_peaks is None else audio_peaks
+    path = save_intermediates(str(tmp_path), "game", "game.mp4", HIGHLIGHTS, audio_peaks=audio_peaks)
+    pipeline = RescorePipeline(path, cut=False, **options)
+    # The summary step needs the summarizer; stop after the fusion
+    pipeline.steps = [step for step in pipeline.steps if step[0] != "summary"]
+    return path, pipeline, pipeline.run()
+
+
+def test_saved_highlights_are_filtered_and_fused(tmp_path):
+    path, pipeline, outputs = rescore(tmp_path, min_score=6, audio_weight=0.5)
+
+    assert [h["start_time"] for h in pipeline.highlights] == ["00:10", "01:00"]
+    assert pipeline.highlights[0]["final_score"] > pipeline.highlights[1]["final_score"]
+    assert outputs["analysis"] == path
+    assert outputs["highlight_count"] == 2
+    assert not os.path.exists(os.path.join(str(tmp_path), "game_metrics.json"))
+
+
+def test_saved_audio_can_be_ignored(tmp_path):
+    _, pipeline, _ = rescore(tmp_path, min_score=0, use_audio_analysis=False)
+
+    assert [h["final_score"] for h in pipeline.highlights] == [9, 7, 4]
+
+
+def test_saved_peak_list_is_fused_by_the_librosa_analyzer(tmp_path, monkeypatch):
+    class AudioAnalyzer:
+        def __init__(self, threshold):
+            pass
+
+        def compare_with_transcript(self, peaks, highlights):
+            calls.append(peaks)
+            return [dict(h, final_score=highlight_score(h)) for h in highlights]
+
+    calls = []
+    monkeypatch.setitem(sys.modules, "src.audio_analyzer", types.SimpleNamespace(AudioAnalyzer=AudioAnalyzer))
+
+    _, pipeline, _ = rescore(tmp_path, audio_peaks=[{"time": 15.0, "intensity": 1.0}], min_score=6)
+
+    assert calls == [[{"time": 15.0, "intensity": 1.0}]]
+    assert [h["final_score"] for h in pipeline.highlights] == [9, 7]
@@ -0,0 +1,78 @@
+import os
+
+from src.result_cache import ResultCache
+
+
+def test_cached_computes_once(tmp_path):
+    cache = ResultCache(str(tmp_path), max_size_mb=10)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"segments": [1, 2, 3]}
+
+    assert cache.cached("transcribe", compute, video="abc", model="tiny") == {"segments": [1, 2, 3]}
+    assert cache.cached("transcribe", compute, video="abc", model="tiny") == {"segments": [1, 2, 3]}
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Any key parameter change is a different entry
+    cache.cached("transcribe", compute, video="abc", model="small")
+    assert len(calls) == 2
+
+
+def test_disabled_cache_always_computes(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), enabled=False)
+    calls = []
+    for _ in range(2):
+        cache.cached("analyze", lambda: calls.append(1) or [1], model="x")
+    assert len(calls) == 2
+    assert not os.path.exists(tmp_path / "cache")
+
+
+def test_empty_results_are_not_stored(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+    for _ in range(2):
+        cache.cached("analyze", lambda: calls.append(1) or [], model="x")
+    assert len(calls) == 2
+
+
+def test_make_key_ignores_parameter_order():
+    assert ResultCache.make_key("s", a=1, b=2) == ResultCache.make_key("s", b=2, a=1)
+    assert ResultCache.make_key("s", a=1) != ResultCache.make_key("t", a=1)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path), max_size_mb=0.25)
+    blob = b"x" * 100 * 1024
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, blob)
+        path = cache._entry_path(key)
+        os.utime(path, (1000 + i, 1000 + i))
+        if key == "b":
+            # Reading "a" makes it more recently used than "b"
+            cache.get("a")
+
+    assert cache.get("a")[0]
+    assert not cache.get("b")[0]
+    assert cache.get("c")[0]
+
+
+def test_file_hash_memo_forgets_deleted_files(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_size_mb=0.001)
+    kept, deleted = tmp_path / "kept.mp4", tmp_path / "deleted.mp4"
+    kept.write_bytes(b"kept")
+    deleted.write_bytes(b"deleted")
+
+    digest = cache.file_hash(str(kept))
+    cache.file_hash(str(deleted))
+    assert cache.file_hash(str(kept)) == digest
+    assert len(cache._load_hash_memo()) == 2
+
+    deleted.unlink()
+    # An entry over the size limit is evicted right away, which prunes the memo
+    cache.put("entry", b"y" * 4096)
+    memo = cache._load_hash_memo()
+    assert len(memo) == 1
+    assert list(memo.values()) == [digest]
@@ -0,0 +1,67 @@
+import pytest
+
+from service import JobService, ServiceError
+
+
+@pytest.fixture
+def service(tmp_path):
+    # Workers are not started, so submitted jobs stay queued
+    return JobService(workers=1, queue_size=1, output_dir=str(tmp_path / "output"),
+                      upload_dir=str(tmp_path / "uploads"), use_cache=False)
+
+
+def test_cancelled_job_frees_its_queue_slot(service, tmp_path):
+    video = tmp_path / "game.mp4"
+    video.write_bytes(b"video")
+    job = service.submit(service.new_job_id(), str(video))
+    with pytest.raises(ServiceError) as error:
+        service.check_capacity()
+    assert error.value.status == 503
+
+    service.cancel(job["id"])
+
+    assert job["status"] == "cancelled"
+    assert job["finished_at"] is not None
+    assert service.health()["queued"] == 0
+    service.check_capacity()
+    assert service.submit(service.new_job_id(), str(video))["status"] == "queued"
+
+
+def test_cancelled_upload_is_deleted(service, tmp_path):
+    upload_dir = tmp_path / "uploads" / "job"
+    upload_dir.mkdir(parents=True)
+    video = upload_dir / "game.mp4"
+    video.write_bytes(b"video")
+    service.submit("job", str(video), upload=True)
+
+    service.cancel("job")
+
+    assert not upload_dir.exists()
+
+
+def test_status_requests_forget_old_finished_jobs(service, tmp_path, monkeypatch):
+    monkeypatch.setattr("config.SERVICE_KEEP_JOBS", 1)
+    service.queue_size = 3
+    video = tmp_path / "game.mp4"
+    video.write_bytes(b"video")
+    jobs = [service.submit(service.new_job_id(), str(video)) for _ in range(3)]
+    service.cancel(jobs[0]["id"])
+    service.cancel(jobs[1]["id"])
+
+    # No new submission: listing the jobs prunes them
+    assert [job["id"] for job in service.all_jobs()] == [jobs[1]["id"], jobs[2]["id"]]
+    with pytest.raises(ServiceError):
+        service.get(jobs[0]["id"])
+
+
+def test_stop_ends_queued_jobs(service, tmp_path):
+    video = tmp_path / "game.mp4"
+    video.write_bytes(b"video")
+    job = service.submit(service.new_job_id(), str(video))
+    service.stop()
+
+    # A worker drains the cancelled job, then exits instead of waiting
+    service._worker()
+
+    assert job["status"] == "cancelled"
+    assert service.health()["queued"] == 0
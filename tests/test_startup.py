@@ -0,0 +1,15 @@
+from benchmarks import startup
+
+
+def test_entry_points_start_within_budget(capsys):
+    failures = startup.check()
+
+    assert failures == 0, capsys.readouterr().out
+
+
+def test_importtime_output_is_parsed():
+    stderr = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       120 |        300 |   encodings.utf_8\n"
+              "import time:       200 |     250000 | config\n")
+
+    assert startup.parse_importtime(stderr) == [("encodings.utf_8", 0.0003, 1), ("config", 0.25, 0)]
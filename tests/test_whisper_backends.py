@@ -0,0 +1,64 @@
+import wave
+
+import numpy as np
+
+from src.audio_extract import write_wav
+from src.whisper_backends import low_confidence_spans, refine_result
+
+
+def segment(start, end, text="", **confidence):
+    return dict({"start": start, "end": end, "text": text, "avg_logprob": -0.2, "no_speech_prob": 0.1,
+                 "compression_ratio": 1.2}, **confidence)
+
+
+def test_low_confidence_segments_are_grouped_into_spans():
+    segments = [
+        segment(0, 2),
+        segment(2, 4, avg_logprob=-1.5),
+        segment(5, 6, no_speech_prob=0.9),  # 1s after the previous span: merged
+        segment(6, 10),
+        segment(12, 13, compression_ratio=3.0),  # 6s later: a span of its own
+    ]
+
+    assert low_confidence_spans(segments, merge_gap=2.0, logprob_threshold=-0.8,
+                                no_speech_threshold=0.6) == [(2, 6), (12, 13)]
+
+
+def test_confident_segments_give_no_spans():
+    assert low_confidence_spans([segment(0, 2), segment(2, 4)], logprob_threshold=-0.8,
+                                no_speech_threshold=0.6) == []
+
+
+class FakeTranscriber:
+    """Answers every span with one segment in the leading context and one covering the span"""
+
+    def __init__(self):
+        self.durations = []
+
+    def transcribe(self, path, language=None):
+        with wave.open(path, "rb") as wf:
+            self.durations.append(wf.getnframes() / wf.getframerate())
+        return {"segments": [{"start": 0.0, "end": 1.0, "text": " context"},
+                             {"start": 1.0, "end": 3.0, "text": " refined"}]}
+
+
+def test_refined_spans_replace_the_original_segments(tmp_path):
+    audio_path = str(tmp_path / "audio.wav")
+    write_wav(audio_path, np.zeros(16000 * 10, dtype=np.int16), 16000)
+    result = {"language": "en", "segments": [
+        dict(segment(0, 4, " a"), id=0),
+        dict(segment(4, 6, " b", avg_logprob=-1.5), id=1),
+        dict(segment(6, 10, " c"), id=2),
+    ]}
+    transcriber = FakeTranscriber()
+
+    refined = refine_result(result, audio_path, transcriber, [(4, 6)], context=1.0)
+
+    # The span is cut with one second of context on both sides
+    assert transcriber.durations == [4.0]
+    assert [(s["start"], s["end"], s["text"]) for s in refined["segments"]] == [
+        (0, 4, " a"), (4.0, 6.0, " refined"), (6, 10, " c")]
+    assert [s["id"] for s in refined["segments"]] == [0, 1, 2]
+    assert refined["segments"][1]["refined"]
+    assert refined["text"] == " a refined c"
+    assert refined["language"] == "en"
@@ -0,0 +1,142 @@
+import pytest
+
+from src.windowed_analysis import (WindowedAnalyzer, _is_superseded, estimate_tokens, is_retryable, merge_highlights,
+                                   split_windows)
+
+
+def transcript(lines):
+    return "\n".join(f"[{i // 60:02d}:{i % 60:02d}] line number {i} of the commentary" for i in range(lines))
+
+
+def test_split_windows_respects_budget_and_overlaps():
+    text = transcript(40)
+    windows = split_windows(text, max_tokens=60, overlap_tokens=15)
+
+    assert len(windows) > 1
+    assert all(sum(estimate_tokens(line) for line in w.splitlines()) <= 60 for w in windows)
+    # Neighbouring windows share their boundary lines, and every line is covered
+    for first, second in zip(windows, windows[1:]):
+        assert first.splitlines()[-1] in second.splitlines()
+    covered = {line for w in windows for line in w.splitlines()}
+    assert covered == set(text.splitlines())
+
+
+def test_split_windows_always_moves_forward():
+    # A single line over the budget still gets its own window
+    windows = split_windows("a" * 400 + "\nb\nc", max_tokens=10, overlap_tokens=10)
+    assert windows[0] == "a" * 400
+    assert windows[-1].endswith("c")
+
+
+def test_merge_highlights_keeps_best_of_duplicates():
+    highlights = [
+        {"start_time": "00:10", "end_time": "00:20", "description": "goal", "score": 6},
+        {"start_time": "00:11", "end_time": "00:19", "description": "goal again", "score": 9},
+        {"start_time": "05:00", "end_time": "05:10", "description": "save", "score": 7},
+        {"description": "no time", "score": 5},
+        {"description": "no time", "score": 4},
+    ]
+    merged = merge_highlights(highlights)
+
+    assert [h["description"] for h in merged] == ["no time", "goal again", "save"]
+    assert merged[0]["score"] == 5
+
+
+def test_string_scores_are_compared_as_numbers():
+    # "10" sorts before "9" as text; a missing or unusable score ranks last
+    goal = {"start_time": "00:10", "end_time": "00:20", "description": "goal", "score": "9"}
+    better = {"start_time": "00:11", "end_time": "00:19", "description": "goal again", "score": "10"}
+    unscored = {"start_time": "00:12", "end_time": "00:18", "description": "goal?", "score": "n/a"}
+
+    assert merge_highlights([goal, unscored, better]) == [better]
+    assert _is_superseded(goal, [], [better])
+    assert not _is_superseded(better, [], [goal, unscored])
+
+
+@pytest.mark.parametrize("message, retryable", [
+    ("HTTP 429: rate limited", True),
+    ("Error code: 529 - overloaded", True),
+    ("503 Service Unavailable", True),
+    ("status code: 500", True),
+    ("HTTP 400: bad request", False),
+    ("prompt is 512 tokens too long", False),
+    ("highlight at 00:05:29 is invalid", False),
+])
+def test_is_retryable_reads_http_status_only(message, retryable):
+    assert is_retryable(RuntimeError(message)) is retryable
+
+
+class FlakyAnalyzer:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def analyze_highlights(self, text):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("HTTP 503: unavailable")
+        return [{"start_time": "00:01", "end_time": "00:02", "description": text, "score": 8}]
+
+
+def test_single_window_is_retried():
+    analyzer = FlakyAnalyzer(failures=2)
+    windowed = WindowedAnalyzer(lambda: analyzer, max_tokens=1000, backoff_seconds=0.01)
+
+    highlights = windowed.analyze_highlights("[00:01] short")
+
+    assert analyzer.calls == 3
+    assert highlights[0]["description"] == "[00:01] short"
+
+
+class WindowAnalyzer:
+    """Reports one highlight per transcript line mentioning a goal (score from the line)"""
+
+    def analyze_highlights(self, text):
+        highlights = []
+        for line in text.splitlines():
+            if "goal" in line:
+                stamp, _, rest = line.partition("] ")
+                highlights.append({"start_time": stamp[1:], "end_time": stamp[1:], "description": rest,
+                                   "score": int(rest.split()[-1])})
+        return highlights
+
+
+def test_iter_highlights_matches_analyze_highlights():
+    lines = [f"[00:{i:02d}] filler commentary line {i}" for i in range(60)]
+    for i in (5, 20, 33, 47):
+        lines[i] = f"[00:{i:02d}] what a goal {i % 10}"
+    text = "\n".join(lines)
+    windowed = WindowedAnalyzer(WindowAnalyzer, max_tokens=60, overlap_tokens=20, max_concurrency=3)
+
+    streamed = list(windowed.iter_highlights(text))
+
+    assert len(split_windows(text, 60, 20)) > 2
+    assert sorted(h["description"] for h in streamed) == sorted(
+        h["description"] for h in windowed.analyze_highlights(text))
+    assert len(streamed) == 4
+
+
+class StreamingAnalyzer:
+    def __init__(self):
+        self.calls = 0
+
+    def iter_highlights(self, text):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("HTTP 429: slow down")
+        yield {"start_time": "00:01", "end_time": "00:02", "description": "first", "score": 7}
+        if self.calls == 2:
+            raise RuntimeError("HTTP 503: stream cut")
+
+
+def test_single_window_streams_and_retries_only_before_the_first_highlight():
+    analyzer = StreamingAnalyzer()
+    windowed = WindowedAnalyzer(lambda: analyzer, max_tokens=1000, backoff_seconds=0.01)
+
+    received = []
+    with pytest.raises(RuntimeError, match="stream cut"):
+        for highlight in windowed.iter_highlights("[00:01] short"):
+            received.append(highlight)
+
+    assert analyzer.calls == 2
+    assert [h["description"] for h in received] == ["first"]
@@ -4,24 +4,63 @@ Using Tkinter (built-in Python library)
 """
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import threading
+import queue
+import time
 import os
 import sys
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Import core modules
-from src.transcribe import VideoTranscriber
-from src.multi_model_analyzer import MultiModelAnalyzer
-from src.audio_analyzer import AudioAnalyzer
-from src.video_editor import VideoEditor
-from src.summarizer import TextSummarizer
+from src import model_pool
+from src.pipeline import Pipeline
+from src.cancellation import CancelToken, Cancelled
 import config
 
+STEP_ICONS = {"transcribe": "📝", "analyze": "🤖", "audio_peaks": "🔊", "edit": "✂", "summary": "📄"}
+POLL_MS = 100  # How often the Tk thread drains the worker's event queue
+MAX_LOG_LINES = 5000  # Older lines are dropped from the log view
+
+JOB_STATUS_LABELS = {
+    "queued": "Queued",
+    "running": "Running",
+    "cancelling": "Cancelling...",
+    "done": "✓ Done",
+    "empty": "○ No Highlights",
+    "failed": "✗ Failed",
+    "cancelled": "⏹ Cancelled"
+}
+
+
+def job_status(pipeline):
+    """
+    Queue status of a pipeline run that ended without an error
+
+    Returns:
+        done (reel written), empty (stopped because no highlight was found or kept)
+        or failed (missing input or video editing failed)
+    """
+    if pipeline.stopped:
+        return "empty"
+    if pipeline.outputs.get("highlights_video"):
+        return "done"
+    return "failed"
+
+
+def format_eta(seconds):
+    """Remaining time as M:SS or H:MM:SS"""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    if hours:
+        return f"{hours}:{rest // 60:02d}:{rest % 60:02d}"
+    return f"{rest // 60}:{rest % 60:02d}"
+
+
 class VideoSummarizerUI:
     def __init__(self, root):
         self.root = root
         self.root.title("🏀 Sports Video AI Summarizer")
-        self.root.geometry("900x700")
+        self.root.geometry("900x850")
         self.root.resizable(True, True)
         
         # Set style
@@ -32,9 +71,23 @@ class VideoSummarizerUI:
         self.video_path = tk.StringVar()
         self.selected_model = tk.StringVar(value=config.SELECTED_MODEL)
         self.use_audio = tk.BooleanVar(value=True)
-        self.processing = False
+        
+        # Job queue: queued videos run on a bounded pool; job id -> job dictionary
+        self.jobs = {}
+        self.next_job_id = 1
+        # Jobs queued since the queue was last idle; the end-of-run summary counts only these
+        self.run_jobs = []
+        self.executor = ThreadPoolExecutor(max_workers=max(1, config.GUI_MAX_JOBS), thread_name_prefix="gui-job")
+        # Allow up to one loaded Whisper model per concurrent job
+        model_pool.get_pool(max_replicas=config.GUI_MAX_JOBS)
+        
+        # Job threads never touch widgets; they post events that poll_events applies
+        self.events = queue.Queue()
+        self.progress_running = False
         
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(POLL_MS, self.poll_events)
     
     def create_widgets(self):
         """Create UI components"""
@@ -147,20 +200,73 @@ class VideoSummarizerUI:
         )
         audio_check.pack(anchor=tk.W)
         
-        # 4. Process button
-        self.process_btn = tk.Button(
+        # 4. Job queue
+        queue_frame = tk.LabelFrame(
             main_frame,
-            text="🚀 Start Processing",
+            text=" 4. Job Queue ",
+            font=("Arial", 12, "bold"),
+            bg="#ecf0f1",
+            fg="#2c3e50"
+        )
+        queue_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        buttons_frame = tk.Frame(queue_frame, bg="#ecf0f1")
+        buttons_frame.pack(fill=tk.X, padx=10, pady=(10, 5))
+        
+        self.process_btn = tk.Button(
+            buttons_frame,
+            text="🚀 Add to Queue",
             command=self.start_processing,
             bg="#27ae60",
             fg="white",
-            font=("Arial", 14, "bold"),
+            font=("Arial", 12, "bold"),
+            cursor="hand2",
+            relief=tk.FLAT,
+            padx=20,
+            pady=8
+        )
+        self.process_btn.pack(side=tk.LEFT)
+        
+        cancel_btn = tk.Button(
+            buttons_frame,
+            text="⏹ Cancel Selected",
+            command=self.cancel_selected,
+            bg="#e74c3c",
+            fg="white",
+            font=("Arial", 10, "bold"),
+            cursor="hand2",
+            relief=tk.FLAT,
+            padx=15,
+            pady=8
+        )
+        cancel_btn.pack(side=tk.LEFT, padx=(10, 0))
+        
+        clear_btn = tk.Button(
+            buttons_frame,
+            text="🧹 Clear Finished",
+            command=self.clear_finished,
+            bg="#95a5a6",
+            fg="white",
+            font=("Arial", 10, "bold"),
             cursor="hand2",
             relief=tk.FLAT,
-            padx=30,
-            pady=15
+            padx=15,
+            pady=8
+        )
+        clear_btn.pack(side=tk.LEFT, padx=(10, 0))
+        
+        self.job_list = ttk.Treeview(
+            queue_frame,
+            columns=("video", "model", "status", "progress"),
+            show="headings",
+            height=5
         )
-        self.process_btn.pack(pady=(0, 15))
+        for column, heading, width in (("video", "Video", 260), ("model", "AI Model", 160),
+                                       ("status", "Status", 240), ("progress", "Progress", 140)):
+            self.job_list.heading(column, text=heading)
+            self.job_list.column(column, width=width, anchor=tk.W)
+        self.job_list.pack(fill=tk.X, padx=10, pady=(5, 10))
+        self.job_list.bind("<<TreeviewSelect>>", lambda event: self.refresh_progress())
         
         # 5. Progress display
         progress_frame = tk.LabelFrame(
@@ -206,171 +312,325 @@ class VideoSummarizerUI:
         self.status_label.pack(fill=tk.X, padx=10, pady=5)
     
     def browse_video(self):
-        """Browse and select video file"""
-        filename = filedialog.askopenfilename(
+        """Browse and select video files (several files are queued directly)"""
+        filenames = filedialog.askopenfilenames(
             title="Select Video File",
             filetypes=[
                 ("Video Files", "*.mp4 *.avi *.mov *.mkv *.flv"),
                 ("All Files", "*.*")
             ]
         )
-        if filename:
-            self.video_path.set(filename)
-            self.log(f"✓ Video selected: {os.path.basename(filename)}")
+        if len(filenames) == 1:
+            self.video_path.set(filenames[0])
+            self.log(f"✓ Video selected: {os.path.basename(filenames[0])}")
+        else:
+            for filename in filenames:
+                self.start_processing(filename)
     
-    def log(self, message):
-        """Output log"""
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.root.update()
+    def log(self, message, job=None):
+        """Output log (safe from any thread)"""
+        self.events.put(("log", job["id"] if job else None, message))
     
     def update_status(self, text):
-        """Update status bar"""
-        self.status_label.config(text=text)
-        self.root.update()
+        """Update status bar (safe from any thread)"""
+        self.events.put(("status", text))
+    
+    def start_stage(self, job, text):
+        """Show a new pipeline step of a job; progress is indeterminate until the step reports any"""
+        self.events.put(("stage", job["id"], text))
     
-    def start_processing(self):
-        """Start processing video"""
-        if self.processing:
-            messagebox.showwarning("Warning", "Processing in progress, please wait!")
+    def report_progress(self, job, done, total):
+        """Progress callback for the running step, e.g. seconds transcribed or clips cut"""
+        self.events.put(("progress", job["id"], done, total))
+    
+    def poll_events(self):
+        """Apply queued worker events on the Tk thread, then reschedule"""
+        lines = []
+        progress = {}
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "log":
+                lines.append(self.format_log(event[1], event[2]))
+            elif event[0] == "progress":
+                # Only the latest progress of a burst is drawn
+                progress[event[1]] = event[2:]
+            else:
+                self.append_log(lines)
+                lines = []
+                for job_id, (done, total) in progress.items():
+                    self.show_progress(job_id, done, total)
+                progress = {}
+                self.handle_event(event)
+        self.append_log(lines)
+        for job_id, (done, total) in progress.items():
+            self.show_progress(job_id, done, total)
+        self.root.after(POLL_MS, self.poll_events)
+    
+    def handle_event(self, event):
+        kind = event[0]
+        if kind == "status":
+            self.status_label.config(text=event[1])
             return
         
-        video_path = self.video_path.get()
+        job = self.jobs.get(event[1])
+        if job is None:
+            return
+        if kind == "started":
+            if job["status"] == "queued":
+                job["status"] = "running"
+        elif kind == "stage":
+            job["stage"] = event[2]
+            job["stage_started"] = time.time()
+            job["fraction"] = None
+        elif kind == "finish":
+            job["status"] = event[2]
+            job["output"] = event[3]
+        self.update_row(job)
+        self.refresh_progress()
+        if kind == "finish" and not self.active_jobs():
+            self.finish_processing()
+    
+    def format_log(self, job_id, message):
+        """Prefix log lines with the video name when several jobs run at once"""
+        job = self.jobs.get(job_id)
+        if job is None or config.GUI_MAX_JOBS <= 1:
+            return message
+        return "\n".join(f"[{job['name']}] {line}" if line else line for line in message.split("\n"))
+    
+    def append_log(self, lines):
+        """Insert a batch of log lines with one widget update"""
+        if not lines:
+            return
+        self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+        line_count = int(self.log_text.index("end-1c").split(".")[0])
+        if line_count > MAX_LOG_LINES:
+            self.log_text.delete("1.0", f"{line_count - MAX_LOG_LINES}.0")
+        self.log_text.see(tk.END)
+    
+    def show_progress(self, job_id, done, total):
+        """Record determinate progress of a job's running step"""
+        job = self.jobs.get(job_id)
+        if job is None or not total or job["stage_started"] is None:
+            return
+        fraction = min(1.0, max(0.0, done / total))
+        if job["fraction"] is not None and fraction < job["fraction"]:
+            # A new pass within the step (e.g. adaptive re-transcription) restarts the ETA
+            job["stage_started"] = time.time()
+        job["fraction"] = fraction
+        self.update_row(job)
+        self.refresh_progress()
+    
+    @staticmethod
+    def progress_text(job):
+        """Percentage and ETA of a job's running step ("" while indeterminate)"""
+        fraction = job["fraction"]
+        if fraction is None or job["status"] not in ("running", "cancelling"):
+            return ""
+        text = f"{fraction:.0%}"
+        elapsed = time.time() - job["stage_started"]
+        if 0 < fraction < 1 and elapsed > 1:
+            text += f" (ETA {format_eta(elapsed * (1 - fraction) / fraction)})"
+        return text
+    
+    def set_progress(self, fraction):
+        """Progress bar value (0-1), or None for the indeterminate animation"""
+        if fraction is None:
+            if not self.progress_running:
+                self.progress.config(mode='indeterminate')
+                self.progress.start()
+                self.progress_running = True
+            return
+        if self.progress_running:
+            self.progress.stop()
+            self.progress_running = False
+        self.progress.config(mode='determinate', maximum=100)
+        self.progress['value'] = fraction * 100
+    
+    def refresh_progress(self):
+        """Show the selected running job (or the oldest running one) in the progress bar and status bar"""
+        running = [job for job in self.jobs.values() if job["status"] in ("running", "cancelling")]
+        if not running:
+            return
+        selected = [self.jobs.get(int(iid)) for iid in self.job_list.selection()]
+        job = next((job for job in selected if job in running), running[0])
+        
+        self.set_progress(job["fraction"])
+        text = f"{job['name']}: {job['stage'] or 'Starting...'} {self.progress_text(job)}".rstrip()
+        if len(running) > 1:
+            text += f"  ({len(running)} jobs running)"
+        self.status_label.config(text=text)
+    
+    def update_row(self, job):
+        if not self.job_list.exists(str(job["id"])):
+            return
+        status = job["stage"] if job["status"] == "running" and job["stage"] else JOB_STATUS_LABELS[job["status"]]
+        model = config.AVAILABLE_MODELS[job["model_type"]]['name']
+        self.job_list.item(str(job["id"]), values=(job["name"], model, status, self.progress_text(job)))
+    
+    def active_jobs(self):
+        return [job for job in self.jobs.values() if job["status"] in ("queued", "running", "cancelling")]
+    
+    def start_processing(self, video_path=None):
+        """Add a video to the job queue"""
+        video_path = video_path or self.video_path.get()
         if not video_path or not os.path.exists(video_path):
             messagebox.showerror("Error", "Please select a valid video file!")
             return
         
-        # Disable button
-        self.processing = True
-        self.process_btn.config(state=tk.DISABLED, bg="#95a5a6")
-        self.progress.start()
-        
-        # Clear log
-        self.log_text.delete(1.0, tk.END)
-        
-        # Process in new thread
-        thread = threading.Thread(
-            target=self.process_video,
-            args=(video_path,),
-            daemon=True
-        )
-        thread.start()
+        job = {
+            "id": self.next_job_id,
+            "video": video_path,
+            "name": Path(video_path).stem,
+            "model_type": self.selected_model.get(),
+            "use_audio": self.use_audio.get(),
+            "status": "queued",
+            "stage": "",
+            "stage_started": None,
+            "fraction": None,
+            "output": None,
+            "cancel": CancelToken()
+        }
+        self.next_job_id += 1
+        if not self.active_jobs():
+            self.run_jobs = []
+        self.run_jobs.append(job)
+        self.jobs[job["id"]] = job
+        self.job_list.insert("", tk.END, iid=str(job["id"]))
+        self.update_row(job)
+        self.log(f"➕ Queued: {os.path.basename(video_path)}")
+        job["future"] = self.executor.submit(self.run_job, job)
     
-    def process_video(self, video_path):
-        """Process video (runs in background thread)"""
+    def run_job(self, job):
+        """Run one queued job (job pool thread)"""
+        if job["cancel"].cancelled:
+            self.events.put(("finish", job["id"], "cancelled", None))
+            return
+        self.events.put(("started", job["id"]))
+        status, output_path = "failed", None
         try:
-            self.log("=" * 60)
-            self.log("🎬 Start Processing Video")
-            self.log("=" * 60)
-            
-            output_dir = "output"
-            os.makedirs(output_dir, exist_ok=True)
-            
-            video_name = Path(video_path).stem
-            
-            # Step 1: Speech to text
-            self.update_status("Step 1/5: Speech to Text...")
-            self.log("\n📝 Step 1/5: Speech to Text")
-            self.log(f"Using model: {config.WHISPER_MODEL}")
-            
-            transcriber = VideoTranscriber(model_size=config.WHISPER_MODEL)
-            result = transcriber.transcribe(video_path, language=config.WHISPER_LANGUAGE)
-            formatted_transcript = transcriber.format_transcript(result)
-            
-            transcript_path = os.path.join(output_dir, f"{video_name}_transcript.json")
-            transcriber.save_transcript(formatted_transcript, transcript_path)
-            
-            full_text = transcriber.get_full_text(formatted_transcript)
-            self.log(f"✓ Transcription completed, {len(formatted_transcript)} segments")
-            
-            # Step 2: AI Analysis
-            self.update_status("Step 2/5: AI Analysis of Highlights...")
-            self.log("\n🤖 Step 2/5: AI Analysis of Highlights")
-            
-            model_name = config.AVAILABLE_MODELS[self.selected_model.get()]['name']
-            self.log(f"Using model: {model_name}")
-            
-            analyzer = MultiModelAnalyzer(
-                api_key=config.API_KEY,
-                model_type=self.selected_model.get(),
-                api_base=config.API_BASE.replace("https://", "").replace("http://", "")
-            )
-            
-            highlights = analyzer.analyze_highlights(full_text)
-            
-            if not highlights:
-                self.log("⚠ No highlights detected")
-                self.finish_processing(False)
-                return
-            
-            highlights = analyzer.filter_by_score(highlights, min_score=6)
-            self.log(f"✓ Detected {len(highlights)} highlights")
-            
-            # Step 3: Audio analysis (optional)
-            if self.use_audio.get():
-                self.update_status("Step 3/5: Audio Peak Detection...")
-                self.log("\n🔊 Step 3/5: Audio Peak Detection")
-                
-                audio_analyzer = AudioAnalyzer(threshold=config.AUDIO_PEAK_THRESHOLD)
-                audio_peaks = audio_analyzer.detect_peaks(video_path)
-                highlights = audio_analyzer.compare_with_transcript(audio_peaks, highlights)
-                self.log(f"✓ Audio analysis completed")
-            else:
-                self.log("\n⏭ Step 3/5: Skip audio analysis")
-                for h in highlights:
-                    h['final_score'] = h.get('score', 5)
-            
-            highlights = sorted(highlights, key=lambda x: x.get('final_score', 0), reverse=True)
-            
-            # Step 4: Video editing
-            self.update_status("Step 4/5: Generating Highlight Reel...")
-            self.log("\n✂ Step 4/5: Generating Highlight Reel")
-            
-            editor = VideoEditor(buffer_seconds=config.HIGHLIGHT_BUFFER)
-            highlight_video_path = os.path.join(output_dir, f"{video_name}_highlights.mp4")
-            
-            success = editor.create_highlights_video(video_path, highlights, highlight_video_path)
-            
-            if success:
-                self.log(f"✓ Highlight reel generated: {highlight_video_path}")
-            else:
-                self.log("⚠ Video editing failed")
-            
-            # Step 5: Generate summary
-            self.update_status("Step 5/5: Generating Text Summary...")
-            self.log("\n📄 Step 5/5: Generating Text Summary")
-            
-            summarizer = TextSummarizer()
-            summary_path = os.path.join(output_dir, f"{video_name}_summary.txt")
-            summarizer.generate_summary(highlights, summary_path)
-            
-            self.log(f"✓ Text summary generated: {summary_path}")
-            
-            # Complete
-            self.log("\n" + "=" * 60)
-            self.log("✅ Processing Complete!")
-            self.log("=" * 60)
-            self.log(f"\n📁 Output Files:")
-            self.log(f"   - Highlight Reel: {highlight_video_path}")
-            self.log(f"   - Text Summary: {summary_path}")
-            self.log(f"   - Transcript: {transcript_path}")
-            
-            self.finish_processing(True, highlight_video_path)
-            
+            pipeline = self.process_video(job)
+            status = job_status(pipeline)
+            if status == "done":
+                output_path = pipeline.outputs["highlights_video"]
+        except Cancelled:
+            self.log("\n⏹ Processing cancelled", job)
+            status = "cancelled"
         except Exception as e:
-            self.log(f"\n❌ Processing Error: {str(e)}")
+            self.log(f"\n❌ Processing Error: {str(e)}", job)
             import traceback
-            self.log(traceback.format_exc())
-            self.finish_processing(False)
+            self.log(traceback.format_exc(), job)
+        self.events.put(("finish", job["id"], status, output_path))
     
-    def finish_processing(self, success, output_path=None):
-        """Processing complete"""
-        self.processing = False
-        self.progress.stop()
-        self.process_btn.config(state=tk.NORMAL, bg="#27ae60")
-        
-        if success:
-            self.update_status("✓ Processing Complete")
+    def cancel_selected(self):
+        """Cancel the selected jobs: queued jobs are dropped, running jobs aborted"""
+        selection = self.job_list.selection()
+        if not selection:
+            messagebox.showinfo("Cancel", "Select one or more jobs in the queue first.")
+            return
+        for iid in selection:
+            job = self.jobs.get(int(iid))
+            if job is None or job["status"] not in ("queued", "running"):
+                continue
+            # Kills FFmpeg / worker processes and aborts HTTP requests of the job right away
+            job["cancel"].cancel()
+            job["status"] = "cancelled" if job["future"].cancel() else "cancelling"
+            self.update_row(job)
+        self.refresh_progress()
+        if not self.active_jobs():
+            self.finish_processing()
+    
+    def clear_finished(self):
+        """Remove ended jobs from the list"""
+        for job_id, job in list(self.jobs.items()):
+            if job["status"] in ("done", "empty", "failed", "cancelled"):
+                self.job_list.delete(str(job_id))
+                del self.jobs[job_id]
+    
+    def on_close(self):
+        """Cancel queued and running jobs, then close the window"""
+        active = self.active_jobs()
+        if active and not messagebox.askyesno(
+            "Quit", f"{len(active)} job(s) are still queued or running.\n\nCancel them and quit?"
+        ):
+            return
+        for job in active:
+            job["cancel"].cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+    
+    def process_video(self, job):
+        """
+        Process one queued video (runs on a job pool thread)
+        
+        Returns:
+            The finished Pipeline (see job_status)
+        """
+        self.log("=" * 60, job)
+        self.log(f"🎬 Start Processing Video: {os.path.basename(job['video'])}", job)
+        self.log("=" * 60, job)
+        
+        pipeline = Pipeline(
+            job["video"],
+            "output",
+            use_audio_analysis=job["use_audio"],
+            model_type=job["model_type"],
+            on_event=lambda kind, data: self.pipeline_event(job, kind, data),
+            cancel=job["cancel"]
+        )
+        outputs = pipeline.run()
+        if outputs is None:
+            return pipeline
+        
+        # Complete
+        self.log("\n" + "=" * 60, job)
+        self.log("✅ Processing Complete!", job)
+        self.log("=" * 60, job)
+        self.log(f"\n📁 Output Files:", job)
+        self.log(f"   - Highlight Reel: {outputs['highlights_video']}", job)
+        self.log(f"   - Text Summary: {outputs['summary']}", job)
+        self.log(f"   - Transcript: {outputs['transcript']}", job)
+        if outputs['metrics']:
+            self.log(f"   - Metrics: {outputs['metrics']}", job)
+        
+        return pipeline
+    
+    def pipeline_event(self, job, kind, data):
+        """Render a pipeline event of a job (job pool thread)"""
+        if kind == "log":
+            message = data["message"]
+            if message.startswith("[WARNING] "):
+                message = "⚠ " + message[len("[WARNING] "):]
+            elif message.startswith("[ERROR] "):
+                message = "❌ " + message[len("[ERROR] "):]
+            elif not message.startswith("Using model"):
+                message = "✓ " + message
+            self.log(message, job)
+        elif kind == "stage":
+            step = f"Step {data['index']}/{data['total']}: {data['title']}"
+            self.start_stage(job, step + "...")
+            self.log(f"\n{STEP_ICONS.get(data['name'], '▶')} {step}", job)
+        elif kind == "progress":
+            self.report_progress(job, data["done"], data["total"])
+    
+    def finish_processing(self):
+        """Every queued job has ended (runs on the Tk thread via the event queue)"""
+        self.set_progress(0)
+        counts = {}
+        for job in self.run_jobs:
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        done, failed, cancelled = counts.get("done", 0), counts.get("failed", 0), counts.get("cancelled", 0)
+        empty = counts.get("empty", 0)
+        summary = f"{done} done, {empty} without highlights, {failed} failed, {cancelled} cancelled"
+        
+        if failed:
+            self.status_label.config(text=f"✗ Processing Failed ({summary})")
+            messagebox.showerror("Error", f"{failed} video(s) failed. Check logs for details.")
+        elif done:
+            self.set_progress(1)
+            self.status_label.config(text=f"✓ Processing Complete ({summary})")
             
             # Show completion dialog
             result = messagebox.askquestion(
@@ -382,9 +642,11 @@ class VideoSummarizerUI:
             if result == 'yes':
                 output_dir = os.path.abspath("output")
                 os.startfile(output_dir)
+        elif empty:
+            self.status_label.config(text=f"○ No Highlights Found ({summary})")
+            messagebox.showinfo("No Highlights", f"No highlights scored high enough in {empty} video(s).")
         else:
-            self.update_status("✗ Processing Failed")
-            messagebox.showerror("Error", "Video processing failed. Check logs for details.")
+            self.status_label.config(text=f"⏹ Cancelled ({summary})")
 
 
 def main():